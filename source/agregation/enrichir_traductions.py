@@ -5,6 +5,7 @@ import json
 from openai import OpenAI
 from dotenv import load_dotenv
 from tqdm import tqdm  # Pour la barre de progression
+from memoire_traduction import MemoireTraduction, normaliser
 
 class RAGTranslationEnricher:
     """
@@ -252,6 +253,14 @@ class RAGTranslationEnricher:
         else:
             print(f"Reprise du traitement à partir de la paire {last_pair_index + 1}")
 
+        # Mémoire des paires déjà enrichies : une paire identique (à la ponctuation,
+        # la casse et aux accents près, texte source et texte cible) reprend ses tags et
+        # son contexte sans appel à GPT-4
+        memoire = MemoireTraduction(distance_max=0)
+        for entry in results:
+            memoire.ajouter(entry["source_lang"], entry["target_lang"], entry["source_text"], entry["target_text"],
+                            tags=entry.get("tags", []), context=entry.get("context", ""))
+
         print(f"Nombre de paires déjà traitées : {len(results)}")
         print(f"Total de paires à traiter : {len(all_pairs)}")
 
@@ -269,7 +278,15 @@ class RAGTranslationEnricher:
                     continue
 
                 # Générer les tags et le contexte une seule fois par paire
-                gen_result = self.generate_tags_and_context_gpt4(source_text, target_text)
+                # Une autre traduction de la même phrase peut changer de registre ou de sens
+                cible = normaliser(target_text)
+                deja_enrichies = [e for e in memoire.rechercher_exact(source_text, source_lang)
+                                  if e["target_lang"] == target_lang and e["tags"]
+                                  and normaliser(e["target_text"]) == cible]
+                if deja_enrichies:
+                    gen_result = {"tags": deja_enrichies[0]["tags"], "context": deja_enrichies[0]["context"]}
+                else:
+                    gen_result = self.generate_tags_and_context_gpt4(source_text, target_text)
 
                 # Paire originale
                 original_entry = {
@@ -294,6 +311,9 @@ class RAGTranslationEnricher:
                     "context": gen_result.get("context", "")  # Même contexte
                 }
                 results.append(inverse_entry)
+                for entry in (original_entry, inverse_entry):
+                    memoire.ajouter(entry["source_lang"], entry["target_lang"], entry["source_text"],
+                                    entry["target_text"], tags=entry["tags"], context=entry["context"])
 
                 # Sauvegarde intermédiaire toutes les 50 paires
                 if i % 50 == 0:
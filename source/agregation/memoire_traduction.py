@@ -0,0 +1,243 @@
+'''Mémoire de traduction : retrouve les paires déjà connues (scraping, dataset SFT,
+paires enrichies) avant de lancer un scraping ou un enrichissement coûteux.'''
+
+import os
+import re
+import json
+import unicodedata
+from itertools import combinations
+
+
+def normaliser(texte: str) -> str:
+    """
+    Normalise un texte pour la comparaison : minuscules, accents et signes diacritiques
+    retirés, ponctuation supprimée, espaces réduits.
+
+    Exemple : "Où est la gare ?" -> "ou est la gare"
+    """
+    texte = unicodedata.normalize("NFKD", texte.lower())
+    texte = "".join(c for c in texte if not unicodedata.combining(c))
+    texte = re.sub(r"[^\w\s]", " ", texte)
+    return " ".join(texte.split())
+
+
+def distance_mots(a: tuple, b: tuple, distance_max: int) -> int:
+    """
+    Distance d'édition (Levenshtein) entre deux suites de mots, interrompue dès
+    que la distance minimale possible dépasse distance_max.
+
+    Retourne distance_max + 1 si la distance dépasse la borne.
+    """
+    if abs(len(a) - len(b)) > distance_max:
+        return distance_max + 1
+    precedente = list(range(len(b) + 1))
+    for i, mot_a in enumerate(a, start=1):
+        courante = [i]
+        for j, mot_b in enumerate(b, start=1):
+            courante.append(min(
+                precedente[j] + 1,
+                courante[j - 1] + 1,
+                precedente[j - 1] + (mot_a != mot_b),
+            ))
+        if min(courante) > distance_max:
+            return distance_max + 1
+        precedente = courante
+    return precedente[-1]
+
+
+class MemoireTraduction:
+    """
+    Index en mémoire de toutes les paires de traduction connues.
+
+    - Recherche exacte sur le texte normalisé (ponctuation, casse, accents ignorés).
+    - Recherche approchée à distance d'édition bornée, comptée en mots : l'index
+      « par suppression » (principe de SymSpell) enregistre chaque phrase privée de
+      0 à distance_max mots. Une phrase à moins de k modifications d'une requête
+      partage forcément l'une de ces variantes, ce qui limite la recherche à
+      quelques accès dictionnaire, indépendamment du nombre de paires indexées.
+      Entre deux textes d'un seul mot, la distance est comptée en caractères.
+    """
+
+    def __init__(self, distance_max: int = 1):
+        self.distance_max = distance_max
+        self.entrees = []
+        self._mots = []
+        # (source_lang, texte normalisé) -> identifiants des entrées
+        self.index_exact = {}
+        # hash((source_lang, variante)) -> identifiant ou liste d'identifiants
+        self.index_suppressions = {}
+
+    def __len__(self):
+        return len(self.entrees)
+
+    def _variantes(self, mots: tuple, distance_max: int):
+        """
+        Génère les variantes d'une suite de mots privée de 0 à distance_max mots.
+
+        Un texte d'un seul mot est décliné au niveau des caractères (mot privé de 0 à
+        distance_max lettres) : retirer le mot lui-même donnerait une variante vide
+        commune à tous les textes d'un mot.
+        """
+        if len(mots) == 1:
+            mot = mots[0]
+            for k in range(min(distance_max, len(mot) - 1) + 1):
+                for positions in combinations(range(len(mot)), k):
+                    yield ("".join(c for i, c in enumerate(mot) if i not in positions),)
+            return
+        for k in range(min(distance_max, len(mots) - 1) + 1):
+            for positions in combinations(range(len(mots)), k):
+                yield tuple(m for i, m in enumerate(mots) if i not in positions)
+
+    def _distance(self, mots: tuple, autres: tuple, distance_max: int) -> int:
+        """Distance en mots, ou en caractères entre deux textes d'un seul mot."""
+        if len(mots) == 1 and len(autres) == 1:
+            return distance_mots(mots[0], autres[0], distance_max)
+        return distance_mots(mots, autres, distance_max)
+
+    def ajouter(self, source_lang: str, target_lang: str, source_text: str, target_text: str, **meta) -> int:
+        """
+        Ajoute une paire à la mémoire.
+
+        Les métadonnées supplémentaires (tags, context, origine...) sont conservées
+        dans l'entrée retournée par les recherches.
+
+        Retourne l'identifiant de l'entrée.
+        """
+        identifiant = len(self.entrees)
+        cle = normaliser(source_text)
+        mots = tuple(cle.split())
+        self.entrees.append({
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "source_text": source_text,
+            "target_text": target_text,
+            **meta
+        })
+        self._mots.append(mots)
+        self.index_exact.setdefault((source_lang, cle), []).append(identifiant)
+
+        for variante in set(self._variantes(mots, self.distance_max)):
+            h = hash((source_lang, variante))
+            existant = self.index_suppressions.get(h)
+            if existant is None:
+                self.index_suppressions[h] = identifiant
+            elif isinstance(existant, list):
+                existant.append(identifiant)
+            else:
+                self.index_suppressions[h] = [existant, identifiant]
+        return identifiant
+
+    def rechercher_exact(self, texte: str, source_lang: str) -> list:
+        """Retourne les entrées dont le texte source normalisé est identique."""
+        return [self.entrees[i] for i in self.index_exact.get((source_lang, normaliser(texte)), [])]
+
+    def rechercher(self, texte: str, source_lang: str, distance_max: int = None, limite: int = 5) -> list:
+        """
+        Recherche les paires dont le texte source est à au plus distance_max mots
+        de modification du texte donné (après normalisation).
+
+        Retourne une liste triée de dictionnaires {"entree": ..., "distance": ...}.
+        Une distance de 0 correspond à une correspondance exacte normalisée.
+        """
+        if distance_max is None or distance_max > self.distance_max:
+            distance_max = self.distance_max
+        mots = tuple(normaliser(texte).split())
+
+        candidats = set()
+        for variante in set(self._variantes(mots, distance_max)):
+            trouve = self.index_suppressions.get(hash((source_lang, variante)))
+            if trouve is None:
+                continue
+            if isinstance(trouve, list):
+                candidats.update(trouve)
+            else:
+                candidats.add(trouve)
+
+        resultats = []
+        for identifiant in candidats:
+            # Vérification : élimine les collisions de hash et les variantes trop éloignées
+            if self.entrees[identifiant]["source_lang"] != source_lang:
+                continue
+            distance = self._distance(mots, self._mots[identifiant], distance_max)
+            if distance <= distance_max:
+                resultats.append({"entree": self.entrees[identifiant], "distance": distance})
+        resultats.sort(key=lambda r: (r["distance"], r["entree"]["source_text"]))
+        return resultats[:limite]
+
+    def charger_fichier(self, filepath: str) -> int:
+        """
+        Charge un fichier de traductions dans la mémoire. Formats reconnus :
+        - 'translations.json' du scraping ({"translations": [{source, target, ...}]})
+          et son stockage append-only 'translations.jsonl' ;
+        - 'traductions_processed.json' ([{direction, pairs: [{texte_cible, traduction}]}]) ;
+        - 'translations_with_tags.json' ([{source_lang, target_lang, source_text, target_text, tags, context}]).
+
+        Retourne le nombre de paires ajoutées.
+        """
+        if not os.path.isfile(filepath):
+            print(f"Fichier introuvable: {filepath}")
+            return 0
+
+        origine = os.path.basename(filepath)
+        with open(filepath, "r", encoding="utf-8") as f:
+            if filepath.endswith(".jsonl"):
+                data = {"translations": [json.loads(ligne) for ligne in f if ligne.strip()]}
+            else:
+                data = json.load(f)
+
+        avant = len(self)
+        if isinstance(data, dict):
+            # Format du scraping
+            for t in data.get("translations", []):
+                target_lang = t.get("target_lang", "")
+                if target_lang.lower() == "darija":
+                    target_lang = "dr"
+                # Les reprises de la mémoire (origine 'memoire') y sont déjà sous leur source
+                if t.get("source") and t.get("target") and t.get("origine") != "memoire":
+                    self.ajouter(t.get("source_lang", ""), target_lang, t["source"], t["target"], origine=origine)
+        else:
+            for entry in data:
+                if "pairs" in entry:
+                    # Format direction + pairs
+                    direction = entry.get("direction", "")
+                    source_lang, target_lang = direction.split("_", 1) if "_" in direction else ("unknown", "unknown")
+                    for p in entry.get("pairs", []):
+                        if p.get("texte_cible") and p.get("traduction"):
+                            self.ajouter(source_lang, target_lang, p["texte_cible"], p["traduction"], origine=origine)
+                elif entry.get("source_text") and entry.get("target_text"):
+                    # Format enrichi
+                    self.ajouter(
+                        entry.get("source_lang", ""), entry.get("target_lang", ""),
+                        entry["source_text"], entry["target_text"],
+                        tags=entry.get("tags", []), context=entry.get("context", ""), origine=origine
+                    )
+        return len(self) - avant
+
+
+def construire_memoire_projet(distance_max: int = 1) -> MemoireTraduction:
+    """
+    Construit la mémoire de traduction à partir de toutes les sources du projet :
+    scraping, dataset Darija-SFT-Mixture et paires enrichies.
+    """
+    dossier = os.path.dirname(os.path.abspath(__file__))
+    scrapping_jsonl = os.path.join(dossier, "../traductordarija_scrapping/translations.jsonl")
+    sources = [
+        scrapping_jsonl if os.path.isfile(scrapping_jsonl)
+        else os.path.join(dossier, "../traductordarija_scrapping/translations.json"),
+        os.path.join(dossier, "../data_Darija-SFT-Mixture/darija_data/traductions_processed.json"),
+        os.path.join(dossier, "translations_with_tags.json"),
+        os.path.join(dossier, "data/translations_with_tags.json"),
+    ]
+    memoire = MemoireTraduction(distance_max)
+    for source in sources:
+        if os.path.isfile(source):
+            print(f"{memoire.charger_fichier(source)} paires chargées depuis {os.path.normpath(source)}")
+    return memoire
+
+
+if __name__ == "__main__":
+    memoire = construire_memoire_projet()
+    print(f"Mémoire de traduction : {len(memoire)} paires")
+    for phrase in ["où est la gare", "Tu connais un bon restaurant marocain dans le quartier ?"]:
+        for r in memoire.rechercher(phrase, "fr"):
+            print(f"[{r['distance']}] {r['entree']['source_text']} -> {r['entree']['target_text']}")
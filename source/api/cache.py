@@ -0,0 +1,186 @@
+'''Cache des réponses de traduction : LRU borné, expiration (TTL) et requêtes fusionnées.'''
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+from index_phrases import normaliser
+
+
+def make_key(text, source_lang, target_lang=None, **options):
+    """Clé de cache : texte normalisé, direction et options triées"""
+    return (normaliser(text), source_lang, target_lang or '', tuple(sorted(options.items())))
+
+
+class _Flight:
+    """Calcul en cours pour une clé, partagé par les appelants concurrents"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResponseCache:
+    """
+    Cache LRU en mémoire avec durée de vie des entrées.
+
+    - max_size : nombre maximum d'entrées, la moins récemment utilisée est évincée
+    - ttl : durée de vie d'une entrée en secondes
+    - Fusion des échecs concurrents (single-flight) : si plusieurs requêtes identiques
+      manquent le cache en même temps, une seule calcule la valeur, les autres l'attendent.
+    """
+
+    def __init__(self, max_size=10000, ttl=3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._async_flights = {}
+        # Incrémentée par clear() : un calcul commencé avant n'est pas mis en cache
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def generation(self):
+        """Génération courante, à relever avant un calcul puis à passer à set()"""
+        return self._generation
+
+    def get(self, key):
+        """Retourne (trouvé, valeur) en marquant l'entrée comme récemment utilisée"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value, generation=None):
+        """
+        Met la valeur en cache. Avec generation (relevée avant le calcul), la valeur est
+        ignorée si clear() a été appelé entre-temps : elle a été calculée sur l'état précédent.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Vide le cache (rechargement de l'index). Les calculs en cours ne sont plus partagés
+        avec les nouveaux appelants et leur résultat ne sera pas mis en cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._flights.clear()
+            self._async_flights.clear()
+
+    def get_or_compute(self, key, compute):
+        """
+        Retourne la valeur en cache ou la calcule avec compute() (fonction sans argument).
+        Les appels concurrents sur la même clé attendent le calcul en cours.
+        Une erreur de calcul est propagée à tous les appelants et n'est pas mise en cache.
+        """
+        found, value = self.get(key)
+        if found:
+            return value
+
+        with self._lock:
+            # La valeur a pu être mise en cache entre-temps par un calcul qui vient de finir
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                generation = self._generation
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+            self.set(key, flight.value, generation)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                # clear() a pu retirer ce calcul, et un autre l'a peut-être remplacé
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.event.set()
+
+    async def aget_or_compute(self, key, compute):
+        """
+        Équivalent asynchrone de get_or_compute() : compute est une fonction sans argument
+        retournant une coroutine (appel au LLM, à la base...). À utiliser depuis une seule
+        boucle d'événements.
+
+        Le calcul tourne dans sa propre tâche, attendue derrière asyncio.shield() : l'annulation
+        d'un appelant (client déconnecté, délai dépassé), y compris celui qui a lancé le
+        calcul, n'interrompt pas les autres, et la valeur est mise en cache à la fin.
+        """
+        found, value = self.get(key)
+        if found:
+            return value
+
+        task = self._async_flights.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._acompute(key, compute, self._generation))
+            # Erreur lue même si tous les appelants ont été annulés entre-temps
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._async_flights[key] = task
+        return await asyncio.shield(task)
+
+    async def _acompute(self, key, compute, generation):
+        try:
+            value = await compute()
+            self.set(key, value, generation)
+            return value
+        finally:
+            if self._async_flights.get(key) is asyncio.current_task():
+                del self._async_flights[key]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'coalesced': self.coalesced,
+        }
@@ -0,0 +1,129 @@
+'''Index en mémoire des traductions connues, servi par l'API de consultation.'''
+
+import os
+import sys
+import json
+import threading
+import time
+
+# Même normalisation que la mémoire de traduction et le snapshot SQLite
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../agregation'))
+from memoire_traduction import normaliser
+# Chargement depuis la base (source/database), importé seulement pour API_INDEX_SOURCE=db
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../database'))
+
+
+class PhraseIndex:
+    """
+    Index immuable : (source_lang, texte normalisé) -> traductions, toutes directions
+    cibles confondues. Les réponses sont préparées à la construction, une consultation
+    n'est qu'un accès dictionnaire.
+    """
+
+    def __init__(self, translations, version=None):
+        self.version = version
+        self.built_at = time.time()
+        entries = {}
+        count = 0
+        for t in translations:
+            source_text, target_text = t.get('source_text'), t.get('target_text')
+            if not source_text or not target_text:
+                continue
+            key = (t['source_lang'], normaliser(source_text))
+            entries.setdefault(key, []).append({
+                'source_lang': t['source_lang'],
+                'target_lang': t['target_lang'],
+                'source_text': source_text,
+                'target_text': target_text,
+                'tags': list(t.get('tags') or []),
+                'context': t.get('context') or '',
+            })
+            count += 1
+        self._entries = {key: tuple(values) for key, values in entries.items()}
+        self.size = count
+
+    def lookup(self, text, source_lang, target_lang=None):
+        """Retourne les traductions du texte (correspondance exacte après normalisation)"""
+        results = self._entries.get((source_lang, normaliser(text)), ())
+        if target_lang:
+            return [r for r in results if r['target_lang'] == target_lang]
+        return list(results)
+
+    def stats(self):
+        return {
+            'version': self.version,
+            'translations': self.size,
+            'keys': len(self._entries),
+            'built_at': self.built_at,
+        }
+
+
+def _file_signature(filepath):
+    """Identifie une version du fichier source sans le relire (date de modification, taille)"""
+    stat = os.stat(filepath)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def load_translations_file(filepath):
+    """Charge translations_with_tags.json"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_translations_db():
+    """Charge les traductions depuis la table translations (DATABASE_URL)"""
+    from export_sqlite import load_from_database
+    return load_from_database()
+
+
+class IndexManager:
+    """
+    Détient l'index courant et le remplace lorsque la source change.
+
+    Le nouvel index est entièrement construit à côté de l'ancien, puis la référence est
+    remplacée en une affectation : les requêtes en cours continuent sur l'ancien index,
+    les suivantes voient le nouveau, sans interruption de service.
+    """
+
+    def __init__(self, source='file', filepath=None):
+        self.source = source
+        self.filepath = filepath
+        self.index = None
+        self.reloads = 0
+        # Fonctions appelées après chaque remplacement de l'index (invalidation des caches)
+        self.on_reload = []
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def load(self, force=False):
+        """
+        Construit un nouvel index si la source a changé (ou si force est vrai).
+
+        Retourne : True si l'index a été remplacé
+        """
+        with self._lock:
+            if self.source == 'db':
+                translations, signature = load_translations_db(), None
+            else:
+                signature = _file_signature(self.filepath)
+                if not force and signature == self._signature:
+                    return False
+                translations = load_translations_file(self.filepath)
+            index = PhraseIndex(translations, version=signature)
+            self.index = index
+            self._signature = signature
+            self.reloads += 1
+            print(f"Index chargé: {index.size} traductions ({self.source})")
+        for callback in self.on_reload:
+            callback()
+        return True
+
+    def reload_if_changed(self):
+        """Recharge l'index si le fichier source a été modifié ; une erreur garde l'ancien index"""
+        if self.source == 'db':
+            return False
+        try:
+            return self.load()
+        except (OSError, ValueError) as e:
+            print(f"Rechargement de l'index ignoré: {e}")
+            return False
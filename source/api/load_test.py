@@ -0,0 +1,365 @@
+'''Test de charge local de l'API de traduction, sans réseau ni clé API.
+
+Rejoue des phrases tirées des traductions du scraping (translations.json) et des questions
+générées (data_synthetique/questions_*.xlsx) selon une loi de Zipf : quelques phrases très
+demandées, une longue traîne de phrases rares. La base de données et le LLM sont remplacés
+par des backends factices à latence configurable, l'index en mémoire ne contient qu'une
+partie du corpus pour que toutes les étapes (cache, index, db, llm) soient sollicitées.
+
+Deux modèles d'arrivée :
+- closed : LOAD_CONCURRENCY clients envoient chacun une requête dès la précédente terminée
+- open : arrivées de Poisson à LOAD_RATE requêtes/s, indépendantes des réponses ; la latence
+  est mesurée depuis l'instant d'arrivée prévu (pas d'omission coordonnée)
+
+Lancement depuis source/api : python load_test.py
+Variables : LOAD_SCENARIO, LOAD_MODE (inprocess ou uvicorn), LOAD_DURATION, LOAD_CONCURRENCY,
+LOAD_RATE, LOAD_MIX, LOAD_BATCH_SIZE, LOAD_LLM_LATENCY, LOAD_DB_LATENCY, LOAD_SEED,
+LOAD_BASELINES, LOAD_SAVE_BASELINE, LOAD_TOLERANCE.'''
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import tempfile
+from bisect import bisect_left
+from itertools import accumulate
+
+DOSSIER_API = os.path.dirname(os.path.abspath(__file__))
+TRANSLATIONS_FILE = os.path.join(DOSSIER_API, '../traductordarija_scrapping/translations.json')
+QUESTIONS_FILES = {
+    'fr': os.path.join(DOSSIER_API, '../agregation/data_synthetique/questions_fr.xlsx'),
+    'en': os.path.join(DOSSIER_API, '../agregation/data_synthetique/questions_en.xlsx'),
+}
+BASELINES_FILE = os.path.join(DOSSIER_API, 'load_test_baselines.json')
+
+# Scénarios prédéfinis, chaque valeur peut être remplacée par la variable LOAD_<NOM>
+SCENARIOS = {
+    'closed': {'arrival': 'closed', 'duration': 20.0, 'concurrency': 32, 'rate': 0.0,
+               'mix': 'translate:0.7,lookup:0.2,batch:0.1', 'batch_size': 20},
+    'open': {'arrival': 'open', 'duration': 20.0, 'concurrency': 0, 'rate': 200.0,
+             'mix': 'translate:0.7,lookup:0.2,batch:0.1', 'batch_size': 20},
+    'batch': {'arrival': 'closed', 'duration': 20.0, 'concurrency': 8, 'rate': 0.0,
+              'mix': 'batch:1', 'batch_size': 100},
+}
+
+
+def load_workload(zipf_s=1.1, index_ratio=0.8, seed=0):
+    """
+    Prépare le corpus du test.
+
+    Retourne :
+        - requests : liste de (phrase, source_lang, target_lang) classée par popularité
+        - weights : poids de Zipf cumulés pour le tirage
+        - indexed : traductions chargées dans l'index en mémoire
+        - stored : traductions connues de la base factice seulement
+    """
+    with open(TRANSLATIONS_FILE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    translations = []
+    for t in data.get("translations", []):
+        target_lang = t.get("target_lang", "")
+        # Uniformisation : remplacer "darija" par "dr"
+        if target_lang.lower() == "darija":
+            target_lang = "dr"
+        if t.get("source") and t.get("target"):
+            translations.append({
+                "source_lang": t.get("source_lang", ""),
+                "target_lang": target_lang,
+                "source_text": t["source"],
+                "target_text": t["target"],
+            })
+
+    phrases = {(t["source_text"], t["source_lang"], t["target_lang"]) for t in translations}
+    try:
+        import pandas as pd
+        for lang, filepath in QUESTIONS_FILES.items():
+            if os.path.exists(filepath):
+                df = pd.read_excel(filepath)
+                phrases.update((str(q), lang, 'dr') for q in df.iloc[:, 0].dropna())
+    except ImportError:
+        print("pandas non installé : questions générées ignorées")
+
+    rng = random.Random(seed)
+    requests = sorted(phrases)
+    rng.shuffle(requests)
+    weights = list(accumulate(1.0 / (rank + 1) ** zipf_s for rank in range(len(requests))))
+
+    rng.shuffle(translations)
+    cut = int(len(translations) * index_ratio)
+    return requests, weights, translations[:cut], translations[cut:]
+
+
+class StubLLM:
+    """LLM factice : un appel par lot, latence fixe plus un terme par phrase"""
+
+    def __init__(self, latency=0.4, per_item=0.002):
+        self.latency = latency
+        self.per_item = per_item
+        self.calls = 0
+
+    async def translate(self, items, source_lang, target_lang):
+        self.calls += 1
+        await asyncio.sleep(self.latency + self.per_item * len(items) + random.uniform(0, self.latency / 4))
+        return [f"[{target_lang}] {item['text']}" for item in items]
+
+
+class StubDB:
+    """Base factice : correspondance exacte sur les traductions retirées de l'index"""
+
+    def __init__(self, translations, latency=0.005):
+        self.latency = latency
+        self.calls = 0
+        self.rows = {}
+        for t in translations:
+            self.rows.setdefault((t["source_text"], t["source_lang"], t["target_lang"]), []).append(t)
+
+    def __call__(self, texts, source_lang, target_lang):
+        # Appelé dans un thread (asyncio.to_thread), comme la vraie requête
+        self.calls += 1
+        time.sleep(self.latency)
+        return {
+            text: self.rows[(text, source_lang, target_lang)]
+            for text in texts if (text, source_lang, target_lang) in self.rows
+        }
+
+
+def parse_mix(mix):
+    """'translate:0.7,lookup:0.3' -> ([noms], [poids cumulés])"""
+    names, weights = [], []
+    for part in mix.split(','):
+        name, weight = part.split(':')
+        names.append(name.strip())
+        weights.append(float(weight))
+    return names, list(accumulate(weights))
+
+
+class LoadGenerator:
+    """Génère les requêtes et enregistre (endpoint, latence, statut) pour chacune."""
+
+    def __init__(self, client, requests, weights, mix, batch_size, seed=0):
+        self.client = client
+        self.requests = requests
+        self.weights = weights
+        self.endpoints, self.mix_weights = parse_mix(mix)
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.results = []
+
+    def _pick(self, cumulative):
+        return bisect_left(cumulative, self.rng.random() * cumulative[-1])
+
+    def _phrase(self):
+        return self.requests[min(self._pick(self.weights), len(self.requests) - 1)]
+
+    async def request(self, scheduled=None):
+        endpoint = self.endpoints[self._pick(self.mix_weights)]
+        start = scheduled if scheduled is not None else time.perf_counter()
+        try:
+            if endpoint == 'batch':
+                phrases = [self._phrase() for _ in range(self.batch_size)]
+                source_lang, target_lang = phrases[0][1], phrases[0][2]
+                response = await self.client.post('/translate/batch', json={
+                    "phrases": [p for p, s, t in phrases if (s, t) == (source_lang, target_lang)],
+                    "source_lang": source_lang, "target_lang": target_lang,
+                })
+            else:
+                text, source_lang, target_lang = self._phrase()
+                response = await self.client.get(f"/{endpoint}", params={
+                    "text": text, "source_lang": source_lang, "target_lang": target_lang,
+                })
+            status = response.status_code
+        except Exception as e:
+            status = type(e).__name__
+        self.results.append((endpoint, time.perf_counter() - start, status))
+
+    async def run_closed(self, duration, concurrency, think_time=0.0):
+        deadline = time.perf_counter() + duration
+
+        async def client_loop():
+            while time.perf_counter() < deadline:
+                await self.request()
+                if think_time:
+                    await asyncio.sleep(think_time)
+
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+
+    async def run_open(self, duration, rate):
+        tasks = []
+        start = time.perf_counter()
+        next_arrival = start
+        while next_arrival < start + duration:
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(self.request(scheduled=next_arrival)))
+            next_arrival += self.rng.expovariate(rate)
+        await asyncio.gather(*tasks)
+
+
+def percentile(sorted_values, q):
+    """Percentile par rang le plus proche sur une liste triée"""
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, max(0, round(q * len(sorted_values)) - 1))]
+
+
+def summarize(results, elapsed):
+    """Débit, erreurs et latences (ms) par endpoint et au total"""
+    groups = {'total': results}
+    for endpoint, latency, status in results:
+        groups.setdefault(endpoint, []).append((endpoint, latency, status))
+    report = {}
+    for name, rows in groups.items():
+        latencies = sorted(latency * 1000 for _, latency, _ in rows)
+        # 404 est une réponse normale (phrase inconnue) ; erreurs : autres statuts et exceptions
+        errors = sum(1 for _, _, status in rows if status not in (200, 404))
+        report[name] = {
+            'requests': len(rows),
+            'rps': round(len(rows) / elapsed, 1) if elapsed else 0.0,
+            'error_rate': round(errors / len(rows), 4) if rows else 0.0,
+            'p50_ms': round(percentile(latencies, 0.50), 2) if rows else None,
+            'p95_ms': round(percentile(latencies, 0.95), 2) if rows else None,
+            'p99_ms': round(percentile(latencies, 0.99), 2) if rows else None,
+        }
+    return report
+
+
+def compare_to_baseline(report, baseline, tolerance=0.15):
+    """Liste des régressions par rapport à la référence (débit, p99, taux d'erreurs)"""
+    regressions = []
+    for name, current in report.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        if current['rps'] < reference['rps'] * (1 - tolerance):
+            regressions.append(f"{name}: débit {current['rps']} req/s < référence {reference['rps']}")
+        if reference.get('p99_ms') and current['p99_ms'] > reference['p99_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {current['p99_ms']} ms > référence {reference['p99_ms']}")
+        if current['error_rate'] > reference['error_rate'] + 0.01:
+            regressions.append(f"{name}: erreurs {current['error_rate']:.2%} > référence {reference['error_rate']:.2%}")
+    return regressions
+
+
+def print_report(scenario, config, report):
+    print(f"\n=== Scénario {scenario} ({config['arrival']}, {config['mode']}, {config['duration']} s) ===")
+    print(f"{'endpoint':<10} {'requêtes':>9} {'req/s':>8} {'erreurs':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, r in sorted(report.items(), key=lambda item: item[0] != 'total'):
+        print(f"{name:<10} {r['requests']:>9} {r['rps']:>8} {r['error_rate']:>8.2%} "
+              f"{r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8}")
+
+
+def scenario_config(name):
+    config = dict(SCENARIOS[name])
+    for key, default in list(config.items()):
+        value = os.getenv(f"LOAD_{key.upper()}")
+        if value is not None:
+            config[key] = type(default)(value) if not isinstance(default, str) else value
+    config['mode'] = os.getenv('LOAD_MODE', 'inprocess')
+    return config
+
+
+async def run_scenario(main, requests, weights, config, seed):
+    import httpx
+
+    if config['mode'] == 'uvicorn':
+        # Vrai serveur HTTP dans le même processus : les backends factices restent injectés
+        import uvicorn
+        port = int(os.getenv('LOAD_PORT', '8765'))
+        server = uvicorn.Server(uvicorn.Config(main.app, host='127.0.0.1', port=port, log_level='warning'))
+        serve_task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.05)
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=30,
+                                   limits=httpx.Limits(max_connections=None))
+    else:
+        # Appels ASGI directs : mesure le service sans la pile HTTP ; lifespan lancé à la main
+        server = None
+        lifespan = main.lifespan(main.app)
+        await lifespan.__aenter__()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://load-test", timeout=30)
+
+    generator = LoadGenerator(client, requests, weights, config['mix'], config['batch_size'], seed)
+    try:
+        # Préchauffage : index et cache dans l'état d'un service déjà en production
+        await generator.run_closed(1, 4)
+        generator.results = []
+        start = time.perf_counter()
+        if config['arrival'] == 'open':
+            await generator.run_open(config['duration'], config['rate'])
+        else:
+            await generator.run_closed(config['duration'], config['concurrency'])
+        elapsed = time.perf_counter() - start
+    finally:
+        await client.aclose()
+        if server is not None:
+            server.should_exit = True
+            await serve_task
+        else:
+            await lifespan.__aexit__(None, None, None)
+    return summarize(generator.results, elapsed)
+
+
+async def main_async():
+    scenario = os.getenv('LOAD_SCENARIO', 'closed')
+    config = scenario_config(scenario)
+    seed = int(os.getenv('LOAD_SEED', '0'))
+    requests, weights, indexed, stored = load_workload(
+        zipf_s=float(os.getenv('LOAD_ZIPF_S', '1.1')),
+        index_ratio=float(os.getenv('LOAD_INDEX_RATIO', '0.8')),
+        seed=seed,
+    )
+
+    # Service configuré avant import : index partiel, pas de vraie base ni de vrai LLM
+    index_file = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8')
+    json.dump(indexed, index_file, ensure_ascii=False)
+    index_file.close()
+    os.environ.update({
+        'API_INDEX_SOURCE': 'file', 'API_TRANSLATIONS_FILE': index_file.name, 'API_RELOAD_INTERVAL': '0',
+        'API_DB_LOOKUP': '0', 'OPENAI_API_KEY': '', 'TRACE_SAMPLE_RATE': '0',
+    })
+    sys.path.insert(0, DOSSIER_API)
+    import main
+
+    llm = StubLLM(latency=float(os.getenv('LOAD_LLM_LATENCY', '0.4')))
+    db = StubDB(stored, latency=float(os.getenv('LOAD_DB_LATENCY', '0.005')))
+    main.translator.llm = llm
+    main.translator.db_lookup = db
+
+    print(f"Corpus: {len(requests)} phrases, {len(indexed)} dans l'index, {len(stored)} en base factice")
+    try:
+        report = await run_scenario(main, requests, weights, config, seed)
+    finally:
+        os.unlink(index_file.name)
+
+    print_report(scenario, config, report)
+    print(f"Appels LLM: {llm.calls}, requêtes base: {db.calls}, cache: {main.response_cache.stats()['hit_ratio']:.1%} de succès")
+
+    baselines_file = os.getenv('LOAD_BASELINES', BASELINES_FILE)
+    baselines = {}
+    if os.path.exists(baselines_file):
+        with open(baselines_file, 'r', encoding='utf-8') as f:
+            baselines = json.load(f)
+    key = f"{scenario}-{config['mode']}"
+
+    if os.getenv('LOAD_SAVE_BASELINE') == '1':
+        baselines[key] = {'config': config, 'report': report, 'saved_at': time.strftime('%Y-%m-%dT%H:%M:%S')}
+        with open(baselines_file, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, ensure_ascii=False, indent=2)
+        print(f"Référence {key} enregistrée dans {baselines_file}")
+        return 0
+    if key not in baselines:
+        print(f"Pas de référence pour {key} (LOAD_SAVE_BASELINE=1 pour l'enregistrer)")
+        return 0
+
+    regressions = compare_to_baseline(report, baselines[key]['report'], float(os.getenv('LOAD_TOLERANCE', '0.15')))
+    for regression in regressions:
+        print(f"Régression: {regression}")
+    if not regressions:
+        print(f"Aucune régression par rapport à la référence {key} ({baselines[key]['saved_at']})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main_async()))
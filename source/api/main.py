@@ -0,0 +1,233 @@
+'''Service de consultation des traductions (FastAPI).
+
+Lancement : python main.py, ou uvicorn main:app depuis source/api.'''
+
+import os
+import sys
+import hmac
+import time
+import asyncio
+from datetime import datetime
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from index_phrases import IndexManager
+from cache import ResponseCache, make_key
+from metrics import registry, tracer
+from translator import BatchTranslator, MicroBatcher, OpenAIBatchLLM, load_retriever, make_db_lookup
+
+# Export en flux depuis la base (source/database)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../database'))
+import export_stream
+
+load_dotenv()
+
+# API_INDEX_SOURCE : file (translations_with_tags.json, défaut) ou db (table translations)
+INDEX_SOURCE = os.getenv('API_INDEX_SOURCE', 'file')
+TRANSLATIONS_FILE = os.getenv(
+    'API_TRANSLATIONS_FILE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '../agregation/translations_with_tags.json')
+)
+# Intervalle de vérification du fichier source, en secondes (0 pour désactiver)
+RELOAD_INTERVAL = float(os.getenv('API_RELOAD_INTERVAL', '5'))
+# Jeton des routes /admin (en-tête X-Admin-Token) ; sans jeton, réservées aux appels locaux
+ADMIN_TOKEN = os.getenv('API_ADMIN_TOKEN')
+LOCAL_HOSTS = {'127.0.0.1', '::1', 'localhost'}
+
+index_manager = IndexManager(INDEX_SOURCE, TRANSLATIONS_FILE)
+# Cache des réponses : les phrases les plus demandées ne repassent ni par l'index, ni par le LLM
+response_cache = ResponseCache(
+    max_size=int(os.getenv('API_CACHE_SIZE', '10000')),
+    ttl=float(os.getenv('API_CACHE_TTL', '3600')),
+)
+index_manager.on_reload.append(response_cache.clear)
+registry.add_collector('response_cache', response_cache.stats, help_texts={
+    'size': "Entrées présentes dans le cache des réponses",
+    'max_size': "Nombre maximum d'entrées du cache des réponses",
+    'ttl': "Durée de vie des entrées du cache des réponses, en secondes",
+    'hits': "Consultations du cache des réponses servies depuis le cache",
+    'misses': "Consultations du cache des réponses sans entrée valide",
+    'hit_ratio': "Part des consultations du cache des réponses servies depuis le cache",
+    'evictions': "Entrées évincées du cache des réponses (taille maximale atteinte)",
+    'expirations': "Entrées du cache des réponses expirées (durée de vie dépassée)",
+    'coalesced': "Requêtes qui ont attendu un calcul identique déjà en cours",
+}, counters=('hits', 'misses', 'evictions', 'expirations', 'coalesced'))
+
+# Traduction : recherche en base (API_DB_LOOKUP=1), exemples du RAG (API_RAG_INDEX) et LLM
+# (OPENAI_API_KEY) sont optionnels ; sans eux seules les phrases connues sont traduites
+translator = BatchTranslator(
+    index_manager,
+    response_cache,
+    db_lookup=make_db_lookup() if os.getenv('API_DB_LOOKUP') == '1' else None,
+    llm=OpenAIBatchLLM() if os.getenv('OPENAI_API_KEY') else None,
+)
+# Les requêtes unitaires reçues dans la même fenêtre (secondes) sont traitées en un lot
+micro_batcher = MicroBatcher(
+    translator.translate_batch,
+    window=float(os.getenv('API_BATCH_WINDOW', '0.01')),
+    max_batch=int(os.getenv('API_BATCH_SIZE', '64')),
+)
+MAX_BATCH_PHRASES = 500
+
+
+async def watch_source(manager, interval):
+    """Surveille le fichier source et reconstruit l'index hors de la boucle d'événements"""
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(manager.reload_if_changed)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await asyncio.to_thread(index_manager.load, True)
+    translator.retriever = await asyncio.to_thread(load_retriever, os.getenv('API_RAG_INDEX'))
+    watcher = None
+    if INDEX_SOURCE == 'file' and RELOAD_INTERVAL > 0:
+        watcher = asyncio.create_task(watch_source(index_manager, RELOAD_INTERVAL))
+    yield
+    if watcher:
+        watcher.cancel()
+
+
+app = FastAPI(title="Darija App", lifespan=lifespan)
+
+
+@app.middleware("http")
+async def instrument(request: Request, call_next):
+    """Durée et statut de chaque requête par route ; trace échantillonnée (TRACE_SAMPLE_RATE)"""
+    start = time.perf_counter()
+    status = 500
+    with tracer.trace(request.url.path, method=request.method) as trace:
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # Route déclarée (et non le chemin) pour borner le nombre de séries
+            route = request.scope.get('route')
+            path = route.path if route else 'unmatched'
+            registry.observe('http_request_duration_seconds', time.perf_counter() - start, route=path)
+            registry.increment('http_requests_total', route=path, status=str(status))
+            if trace is not None:
+                trace.attributes['status'] = status
+
+
+@app.get("/health")
+def health():
+    return {
+        "status": "ok",
+        "index": index_manager.index.stats() if index_manager.index else None,
+        "cache": response_cache.stats(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Métriques au format texte Prometheus"""
+    return PlainTextResponse(registry.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/lookup")
+def lookup(
+    text: str = Query(..., min_length=1),
+    source_lang: str = Query(..., min_length=2, max_length=10),
+    target_lang: str = Query(None, min_length=2, max_length=10),
+):
+    """Traductions connues d'une phrase (correspondance exacte normalisée), sans accès à la base"""
+    index = index_manager.index
+    if index is None:
+        raise HTTPException(status_code=503, detail="Index en cours de chargement")
+    results = response_cache.get_or_compute(
+        make_key(text, source_lang, target_lang, kind='lookup'),
+        lambda: index.lookup(text, source_lang, target_lang)
+    )
+    if not results:
+        raise HTTPException(status_code=404, detail="Aucune traduction connue")
+    return {"query": text, "results": results}
+
+
+class BatchRequest(BaseModel):
+    phrases: list[str] = Field(..., min_length=1, max_length=MAX_BATCH_PHRASES)
+    source_lang: str = Field(..., min_length=2, max_length=10)
+    target_lang: str = Field(..., min_length=2, max_length=10)
+
+
+@app.post("/translate/batch")
+async def translate_batch(request: BatchRequest):
+    """Traduit une liste de phrases : une requête en base et un appel au LLM au plus par lot"""
+    if index_manager.index is None:
+        raise HTTPException(status_code=503, detail="Index en cours de chargement")
+    results = await translator.translate_batch(request.phrases, request.source_lang, request.target_lang)
+    return {"results": results}
+
+
+@app.get("/translate")
+async def translate(
+    text: str = Query(..., min_length=1),
+    source_lang: str = Query(..., min_length=2, max_length=10),
+    target_lang: str = Query(..., min_length=2, max_length=10),
+):
+    """Traduit une phrase ; les requêtes concurrentes sont regroupées en micro-lots"""
+    if index_manager.index is None:
+        raise HTTPException(status_code=503, detail="Index en cours de chargement")
+    result = await micro_batcher.submit(text, source_lang, target_lang)
+    if result["translation"] is None:
+        raise HTTPException(status_code=404, detail="Aucune traduction trouvée")
+    return result
+
+
+@app.get("/export")
+def export(
+    request: Request,
+    format: str = Query('ndjson', pattern='^(ndjson|parquet)$'),
+    source_lang: str = Query(None, min_length=2, max_length=10),
+    target_lang: str = Query(None, min_length=2, max_length=10),
+    tags: list[str] = Query(None),
+    any_tags: list[str] = Query(None),
+    updated_since: datetime = Query(None),
+):
+    """
+    Export complet du corpus en flux depuis la base (curseur côté serveur), lot par lot.
+    Le NDJSON est compressé à la volée si le client accepte gzip (Accept-Encoding).
+    """
+    if format == 'parquet' and export_stream.pa is None:
+        raise HTTPException(status_code=501, detail="Export Parquet indisponible (pyarrow non installé)")
+    use_gzip = format == 'ndjson' and 'gzip' in request.headers.get('accept-encoding', '')
+    chunks = export_stream.stream_export(
+        format=format, gzip=use_gzip, source_lang=source_lang, target_lang=target_lang,
+        all_tags=tags, any_tags=any_tags, updated_since=updated_since,
+    )
+    extension = 'ndjson' if format == 'ndjson' else 'parquet'
+    headers = {"Content-Disposition": f'attachment; filename="translations.{extension}"'}
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+    media_type = "application/x-ndjson" if format == 'ndjson' else "application/vnd.apache.parquet"
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+
+def check_admin(request, token):
+    """
+    Autorise une route d'administration : jeton API_ADMIN_TOKEN exigé s'il est défini,
+    sinon seuls les appels depuis la machine elle-même sont acceptés
+    """
+    if ADMIN_TOKEN:
+        if not token or not hmac.compare_digest(token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8')):
+            raise HTTPException(status_code=403, detail="Jeton d'administration invalide")
+    elif request.client is None or request.client.host not in LOCAL_HOSTS:
+        raise HTTPException(status_code=403, detail="Route d'administration réservée aux appels locaux")
+
+
+@app.post("/admin/reload")
+async def reload_index(request: Request, x_admin_token: str = Header(None)):
+    """Force la reconstruction de l'index (nécessaire en mode db) ; voir check_admin"""
+    check_admin(request, x_admin_token)
+    await asyncio.to_thread(index_manager.load, True)
+    return index_manager.index.stats()
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host=os.getenv('API_HOST', '127.0.0.1'), port=int(os.getenv('API_PORT', '8000')))
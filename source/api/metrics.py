@@ -0,0 +1,272 @@
+'''Instrumentation légère : compteurs, histogrammes de durées et traces échantillonnées.
+
+Les durées sont mesurées avec time.perf_counter() et rangées dans des histogrammes à
+intervalles logarithmiques (façon HDR : erreur relative bornée quelle que soit la durée),
+exposés au format texte Prometheus par GET /metrics. Les mêmes fonctions sont utilisées
+par le service (étapes cache, index, db, retrieval, llm) et par le pipeline de données
+(DarijaPipeline.execute_module), pour des métriques identiques en ligne et en batch.'''
+
+import os
+import json
+import math
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+def log_buckets(minimum=1e-5, maximum=100.0, per_doubling=4):
+    """Bornes supérieures des intervalles : facteur 2**(1/per_doubling) entre deux bornes (~19 % pour 4)"""
+    count = math.ceil(math.log2(maximum / minimum) * per_doubling)
+    return tuple(float(f"{minimum * 2 ** (i / per_doubling):.6g}") for i in range(count + 1))
+
+
+DEFAULT_BUCKETS = log_buckets()
+
+
+class Histogram:
+    """Histogramme d'une série (nom + labels) : comptes par intervalle, somme et nombre"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Dernier intervalle : au-delà de la borne max
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q):
+        """Estimation du quantile q (0 à 1) : borne supérieure de l'intervalle qui le contient"""
+        with self._lock:
+            counts, total = list(self.counts), self.count
+        if not total:
+            return None
+        rank, seen = q * total, 0
+        for i, n in enumerate(counts):
+            seen += n
+            if seen >= rank and n:
+                return self.buckets[i] if i < len(self.buckets) else math.inf
+        return math.inf
+
+
+class MetricsRegistry:
+    """Ensemble des compteurs et histogrammes, indexés par (nom, labels triés)."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def describe(self, name, help_text):
+        self._help[name] = help_text
+
+    def add_collector(self, prefix, collect, help_texts=None, counters=()):
+        """
+        Séries calculées à chaque exposition : collect() retourne {nom: valeur numérique}.
+        Les noms listés dans counters sont des compteurs (valeurs croissantes depuis le
+        démarrage), les autres des jauges ; help_texts donne la description de chaque nom.
+        """
+        self._collectors.append((prefix, collect, help_texts or {}, frozenset(counters)))
+
+    def increment(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def histogram(self, name, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram(self.buckets))
+        return histogram
+
+    def observe(self, name, value, **labels):
+        self.histogram(name, **labels).observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """
+        Mesure la durée du bloc dans l'histogramme name (en secondes) et l'ajoute à la
+        trace de la requête en cours si elle est échantillonnée.
+        Une exception est comptée dans <préfixe>_errors_total (stage_duration_seconds ->
+        stage_errors_total) puis propagée.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            prefix = name[:-len('_duration_seconds')] if name.endswith('_duration_seconds') else name
+            self._help.setdefault(f"{prefix}_errors_total", f"Erreurs mesurées par {name}")
+            self.increment(f"{prefix}_errors_total", **labels)
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            self.observe(name, duration, **labels)
+            trace = current_trace.get()
+            if trace is not None:
+                trace.add_span(labels.get('stage', name), duration)
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def summary(self, name, quantiles=(0.5, 0.95, 0.99)):
+        """{labels: {count, sum, p50, p95, p99}} pour un histogramme (journaux, rapports)"""
+        result = {}
+        for (metric, labels), histogram in list(self._histograms.items()):
+            if metric == name:
+                result[labels] = {
+                    'count': histogram.count,
+                    'sum': round(histogram.sum, 6),
+                    **{f"p{round(q * 100)}": histogram.quantile(q) for q in quantiles},
+                }
+        return result
+
+    def render_prometheus(self):
+        """Exposition au format texte Prometheus (version 0.0.4)"""
+        lines = []
+        # Séries regroupées par nom : une seule ligne TYPE par métrique
+        by_name = {}
+        for (name, labels), value in sorted(self._counters.items()):
+            by_name.setdefault(('counter', name), []).append((labels, value))
+        for (name, labels), histogram in sorted(self._histograms.items(), key=lambda item: item[0]):
+            by_name.setdefault(('histogram', name), []).append((labels, histogram))
+
+        for (kind, name), series in by_name.items():
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in series:
+                if kind == 'counter':
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+                    continue
+                with value._lock:
+                    counts, total, count = list(value.counts), value.sum, value.count
+                cumulative = 0
+                for bound, n in zip(value.buckets, counts):
+                    cumulative += n
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', repr(bound)),))} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        for prefix, collect, help_texts, counters in self._collectors:
+            for key, value in collect().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    if key in help_texts:
+                        lines.append(f"# HELP {prefix}_{key} {help_texts[key]}")
+                    lines.append(f"# TYPE {prefix}_{key} {'counter' if key in counters else 'gauge'}")
+                    lines.append(f"{prefix}_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """Écrit l'exposition dans un fichier (collecteur textfile de node_exporter, pipelines batch)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, path)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        f'{k}="' + str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for k, v in labels
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class Trace:
+    """Durées des étapes d'une requête, écrites dans le journal des traces à la fin"""
+
+    def __init__(self, name, **attributes):
+        self.name = name
+        self.attributes = attributes
+        self.spans = []
+        self.start = time.perf_counter()
+
+    def add_span(self, stage, duration):
+        self.spans.append((stage, round(duration * 1000, 3)))
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'duration_ms': round((time.perf_counter() - self.start) * 1000, 3),
+            'spans': [{'stage': stage, 'duration_ms': ms} for stage, ms in self.spans],
+            **self.attributes,
+        }
+
+
+current_trace = ContextVar('current_trace', default=None)
+
+
+class Tracer:
+    """
+    Traces par requête échantillonnées : une requête sur 1/sample_rate est tracée et
+    écrite en JSON (une ligne par requête) dans path. Désactivé si sample_rate vaut 0.
+    """
+
+    def __init__(self, sample_rate=0.0, path=None):
+        self.sample_rate = sample_rate
+        self.path = path
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def trace(self, name, **attributes):
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            yield None
+            return
+        trace = Trace(name, **attributes)
+        token = current_trace.set(trace)
+        try:
+            yield trace
+        finally:
+            current_trace.reset(token)
+            self.write(trace)
+
+    def write(self, trace):
+        line = json.dumps(trace.to_dict(), ensure_ascii=False)
+        if not self.path:
+            print(line)
+            return
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+
+
+# Registre et traceur partagés par le service et le pipeline
+registry = MetricsRegistry()
+registry.describe('stage_duration_seconds', "Durée d'une étape de traitement (cache, index, db, retrieval, llm)")
+registry.describe('http_request_duration_seconds', "Durée des requêtes HTTP par route")
+registry.describe('http_requests_total', "Requêtes HTTP par route et code de statut")
+registry.describe('translations_resolved_total', "Phrases traduites par origine (cache, index, db, llm, none)")
+registry.describe('micro_batches_total', "Lots formés par le regroupement des requêtes unitaires")
+registry.describe('micro_batch_phrases_total', "Phrases traitées dans les lots du regroupement des requêtes unitaires")
+registry.describe('stage_errors_total', "Erreurs d'une étape de traitement (cache, index, db, retrieval, llm)")
+registry.describe('pipeline_module_duration_seconds', "Durée d'exécution d'un module du pipeline de données")
+registry.describe('pipeline_module_runs_total', "Exécutions d'un module du pipeline par résultat")
+registry.describe('pipeline_module_errors_total', "Erreurs levées par un module du pipeline de données")
+
+tracer = Tracer(
+    sample_rate=float(os.getenv('TRACE_SAMPLE_RATE', '0')),
+    path=os.getenv('TRACE_LOG_FILE'),
+)
+
+
+def stage(name, **labels):
+    """Chronomètre d'une étape : with stage('llm'): ..."""
+    return registry.timer('stage_duration_seconds', stage=name, **labels)
@@ -0,0 +1,236 @@
+'''Traduction par lots : cache, index en mémoire, base de données, puis un seul appel au
+LLM pour les phrases inconnues, avec les paires proches (RAG) comme exemples.'''
+
+import os
+import sys
+import json
+import asyncio
+
+from cache import make_key
+from metrics import registry, stage
+
+DOSSIER_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Recherche exacte en base (source/database) et index TF-IDF du RAG (source/rag)
+sys.path.append(os.path.join(DOSSIER_SOURCE, 'database'))
+sys.path.append(os.path.join(DOSSIER_SOURCE, 'rag'))
+from models import session_scope
+from search import find_exact_translations
+from index_tfidf import IndexTfidf
+
+
+class OpenAIBatchLLM:
+    """Traduit une liste de phrases en un seul appel au modèle de chat OpenAI."""
+
+    def __init__(self, model=None):
+        from openai import AsyncOpenAI
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("La clé API OpenAI n'est pas définie dans les variables d'environnement (.env).")
+        self.client = AsyncOpenAI(api_key=api_key)
+        self.model = model or os.getenv('API_LLM_MODEL', 'gpt-4o-mini')
+
+    async def translate(self, items, source_lang, target_lang):
+        """
+        items : liste de {"text": ..., "examples": [{source_text, target_text, context}]}
+        Retourne : liste de traductions (None si absente), dans l'ordre des items
+        """
+        system_message = {
+            "role": "system",
+            "content": (
+                f"Tu es un traducteur expert du darija (arabe marocain). Traduis chaque phrase de la langue "
+                f"'{source_lang}' vers la langue '{target_lang}'. Des exemples de paires proches, avec leur "
+                "contexte, sont fournis pour certaines phrases : inspire-toi de leur vocabulaire et de leur registre. "
+                "Retourne un objet JSON valide {\"translations\": [...]} contenant exactement une traduction "
+                "par phrase, dans le même ordre, sans autre commentaire."
+            )
+        }
+        user_message = {
+            "role": "user",
+            "content": json.dumps([
+                {"id": i, "phrase": item["text"], "exemples": item.get("examples", [])}
+                for i, item in enumerate(items)
+            ], ensure_ascii=False)
+        }
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[system_message, user_message],
+            response_format={"type": "json_object"},
+            temperature=0.0,
+        )
+        translations = json.loads(response.choices[0].message.content).get("translations", [])
+        if len(translations) != len(items):
+            print(f"Réponse du LLM incomplète: {len(translations)} traductions pour {len(items)} phrases")
+        return [translations[i] if i < len(translations) else None for i in range(len(items))]
+
+
+def load_retriever(dossier=None):
+    """Charge l'index TF-IDF du RAG (source/rag) s'il a été construit, sinon None"""
+    dossier = dossier or os.path.join(DOSSIER_SOURCE, 'rag', 'index_tfidf')
+    if not os.path.isfile(os.path.join(dossier, 'manifeste.json')):
+        return None
+    return IndexTfidf(dossier)
+
+
+def make_db_lookup():
+    """Recherche exacte en base, une requête par lot (source_text = ANY(...))"""
+    def db_lookup(texts, source_lang, target_lang):
+        with session_scope() as session:
+            found = find_exact_translations(session, texts, source_lang, target_lang)
+            return {
+                text: [{
+                    'source_lang': t.source_lang, 'target_lang': t.target_lang,
+                    'source_text': t.source_text, 'target_text': t.target_text,
+                    'tags': list(t.tags or []), 'context': t.context or '',
+                } for t in translations]
+                for text, translations in found.items()
+            }
+    return db_lookup
+
+
+class BatchTranslator:
+    """
+    Résout une liste de phrases par étapes, chacune traitant toutes les phrases restantes
+    d'un coup : cache, index en mémoire, base (une requête), recherche des exemples (un
+    passage vectorisé) puis LLM (un appel). Les phrases identiques après normalisation ne
+    sont résolues qu'une fois.
+    """
+
+    def __init__(self, index_manager, cache, db_lookup=None, retriever=None, llm=None, examples=3):
+        self.index_manager = index_manager
+        self.cache = cache
+        self.db_lookup = db_lookup
+        self.retriever = retriever
+        self.llm = llm
+        self.examples = examples
+
+    async def translate_batch(self, phrases, source_lang, target_lang):
+        """
+        Retourne une liste alignée sur phrases de
+        {"phrase", "translation", "origin"} où origin vaut cache, index, db, llm ou None.
+        """
+        # Relevée avant les recherches : un résultat calculé avant un clear() (rechargement
+        # de l'index) n'est pas mis en cache
+        generation = self.cache.generation
+        # Dédoublonnage : clé normalisée -> première phrase rencontrée
+        keys = [make_key(p, source_lang, target_lang, kind='translate') for p in phrases]
+        pending = {}
+        for key, phrase in zip(keys, phrases):
+            pending.setdefault(key, phrase)
+
+        resolved = {}
+        with stage('cache'):
+            for key in list(pending):
+                found, value = self.cache.get(key)
+                if found:
+                    resolved[key] = dict(value, origin='cache')
+                    del pending[key]
+
+        index = self.index_manager.index
+        if pending and index is not None:
+            with stage('index'):
+                for key, phrase in list(pending.items()):
+                    matches = index.lookup(phrase, source_lang, target_lang)
+                    if matches:
+                        resolved[key] = self._store(key, matches[0]['target_text'], 'index', generation)
+                        del pending[key]
+
+        if pending and self.db_lookup:
+            with stage('db'):
+                found = await asyncio.to_thread(self.db_lookup, list(pending.values()), source_lang, target_lang)
+            for key, phrase in list(pending.items()):
+                if found.get(phrase):
+                    resolved[key] = self._store(key, found[phrase][0]['target_text'], 'db', generation)
+                    del pending[key]
+
+        if pending and self.llm:
+            texts = list(pending.values())
+            examples = [[] for _ in texts]
+            if self.retriever is not None:
+                with stage('retrieval'):
+                    hits = await asyncio.to_thread(
+                        self.retriever.rechercher, texts, self.examples, f"{source_lang}_{target_lang}", 'source'
+                    )
+                examples = [[{
+                    'source_text': h['paire']['source_text'],
+                    'target_text': h['paire']['target_text'],
+                    'context': h['paire'].get('context', ''),
+                } for h in hits_text] for hits_text in hits]
+            try:
+                with stage('llm'):
+                    translations = await self.llm.translate(
+                        [{"text": t, "examples": e} for t, e in zip(texts, examples)], source_lang, target_lang
+                    )
+            except Exception as e:
+                # Les phrases déjà résolues sont retournées, les autres restent sans traduction
+                print(f"Erreur du LLM, {len(texts)} phrases non traduites: {e}")
+                translations = []
+            for key, translation in zip(list(pending), translations):
+                if translation:
+                    resolved[key] = self._store(key, translation, 'llm', generation)
+                    del pending[key]
+
+        for value in resolved.values():
+            registry.increment('translations_resolved_total', origin=value['origin'])
+        registry.increment('translations_resolved_total', value=len(pending), origin='none')
+
+        return [
+            {"phrase": phrase, **resolved.get(key, {"translation": None, "origin": None})}
+            for key, phrase in zip(keys, phrases)
+        ]
+
+    def _store(self, key, translation, origin, generation):
+        self.cache.set(key, {"translation": translation}, generation=generation)
+        return {"translation": translation, "origin": origin}
+
+
+class MicroBatcher:
+    """
+    Regroupe les requêtes unitaires concurrentes : les phrases reçues pendant `window`
+    secondes pour une même direction sont traitées en un seul appel à handler
+    (max_batch phrases au plus par appel).
+    """
+
+    def __init__(self, handler, window=0.01, max_batch=64):
+        self.handler = handler
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = {}
+        # Lots en cours : la boucle d'événements ne garde qu'une référence faible aux tâches
+        self._tasks = set()
+        self.batches = 0
+
+    async def submit(self, phrase, source_lang, target_lang):
+        group = (source_lang, target_lang)
+        future = asyncio.get_running_loop().create_future()
+        batch = self._pending.setdefault(group, [])
+        batch.append((phrase, future))
+        if len(batch) == 1:
+            asyncio.get_running_loop().call_later(self.window, self._flush, group, batch)
+        elif len(batch) >= self.max_batch:
+            self._flush(group, batch)
+        return await future
+
+    def _flush(self, group, batch):
+        # Le lot a pu être déjà envoyé parce qu'il était plein
+        if self._pending.get(group) is not batch:
+            return
+        del self._pending[group]
+        task = asyncio.create_task(self._run(group, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, group, batch):
+        self.batches += 1
+        registry.increment('micro_batches_total')
+        registry.increment('micro_batch_phrases_total', len(batch))
+        try:
+            results = await self.handler([phrase for phrase, _ in batch], *group)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
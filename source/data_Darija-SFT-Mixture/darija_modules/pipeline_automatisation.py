@@ -3,6 +3,11 @@ import logging           # Pour les logs d'exécution
 from pathlib import Path # Pour manipuler les chemins
 import time             # Pour mesurer le temps d'exécution
 import os              # Pour les chemins absolus
+import sys             # Pour importer l'instrumentation partagée avec l'API
+
+# Métriques communes avec le service de traduction (source/api/metrics.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../api'))
+from metrics import registry
 
 # Importation de nos modules personnalisés
 from dataset_statistics import DarijaStatsAPI        # Module des statistiques
@@ -78,11 +83,13 @@ class DarijaPipeline:
         """
         # Annoncer le début du module
         self.logger.info(f"=== Module {name} ===")
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        # Exécuter le module
-        success = module.run()
-        duration = time.time() - start_time
+        # Exécuter le module (durée dans l'histogramme pipeline_module_duration_seconds)
+        with registry.timer('pipeline_module_duration_seconds', module=name):
+            success = module.run()
+        duration = time.perf_counter() - start_time
+        registry.increment('pipeline_module_runs_total', module=name, result='success' if success else 'failure')
         
         # Logger le résultat
         if success:
@@ -105,19 +112,31 @@ class DarijaPipeline:
         stats_module = DarijaStatsAPI(self.paths["stats"])
         if not self.execute_module("statistiques", stats_module):
             self.logger.error("Pipeline arrêté : échec des statistiques")
+            self.write_metrics()
             return False
         
         # 2. Module de téléchargement
         download_module = DarijaParquetDownloader(self.paths["parquet"], self.paths["csv"])
         if not self.execute_module("téléchargement", download_module):
             self.logger.error("Pipeline arrêté : échec du téléchargement")
+            self.write_metrics()
             return False
         
         # Calculer et logger le temps total
         duration = time.time() - start_time
         self.logger.info(f"=== Pipeline terminé en {duration:.2f} secondes ===")
+        self.write_metrics()
         return True
 
+    def write_metrics(self):
+        """
+        Écrit les métriques du pipeline au format Prometheus dans le dossier des logs
+        (pipeline.prom), lisible par le collecteur textfile de node_exporter.
+        """
+        metrics_file = self.paths["logs"] / "pipeline.prom"
+        registry.write_textfile(metrics_file)
+        self.logger.info(f"Métriques écrites dans {metrics_file}")
+
 # Point d'entrée du programme
 if __name__ == "__main__":
     # Créer et exécuter le pipeline
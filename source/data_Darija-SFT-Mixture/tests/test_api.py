@@ -0,0 +1,43 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+
+# Service de consultation (source/api/main.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../api'))
+from fastapi.testclient import TestClient
+import main
+
+class TestAdminReload(unittest.TestCase):
+    """Tests de la protection de POST /admin/reload"""
+
+    def setUp(self):
+        handle, self.filepath = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(handle, 'w', encoding='utf-8') as f:
+            json.dump([{"source_lang": "dr", "target_lang": "fr", "source_text": "Salam", "target_text": "Bonjour"}], f)
+        self.previous = (main.ADMIN_TOKEN, main.index_manager.filepath)
+        main.index_manager.filepath = self.filepath
+        # Sans lifespan : ni chargement au démarrage, ni surveillance du fichier
+        self.client = TestClient(main.app)
+
+    def tearDown(self):
+        main.ADMIN_TOKEN, main.index_manager.filepath = self.previous
+        os.remove(self.filepath)
+
+    def test_remote_call_without_token_refused(self):
+        """Test sans API_ADMIN_TOKEN : seuls les appels locaux sont acceptés (client de test distant)"""
+        main.ADMIN_TOKEN = None
+        self.assertEqual(self.client.post("/admin/reload").status_code, 403)
+
+    def test_token_required(self):
+        """Test avec API_ADMIN_TOKEN : jeton absent ou faux refusé, bon jeton accepté"""
+        main.ADMIN_TOKEN = "s3cret"
+        self.assertEqual(self.client.post("/admin/reload").status_code, 403)
+        self.assertEqual(self.client.post("/admin/reload", headers={"X-Admin-Token": "faux"}).status_code, 403)
+        response = self.client.post("/admin/reload", headers={"X-Admin-Token": "s3cret"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["translations"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+import os
+import sys
+import asyncio
+import threading
+import time
+
+# Cache des réponses de l'API (source/api/cache.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../api'))
+from cache import ResponseCache, make_key
+
+class TestResponseCache(unittest.TestCase):
+    """Tests unitaires du cache LRU à durée de vie et du calcul partagé (single-flight)"""
+
+    def test_lru_eviction(self):
+        """Test de l'éviction de l'entrée la moins récemment utilisée"""
+        cache = ResponseCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), (True, 1))
+        cache.set('c', 3)
+        self.assertEqual(cache.get('b'), (False, None))
+        self.assertEqual(cache.get('a'), (True, 1))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_ttl_expiration(self):
+        """Test de l'expiration des entrées"""
+        cache = ResponseCache(ttl=0)
+        cache.set('a', 1)
+        self.assertEqual(cache.get('a'), (False, None))
+        self.assertEqual(cache.stats()['expirations'], 1)
+        self.assertEqual(len(cache), 0)
+
+    def test_make_key_normalizes_text(self):
+        """Test de la clé de cache : texte normalisé et options triées"""
+        self.assertEqual(make_key("Où est la gare ?", 'fr', kind='translate', limit=3),
+                         make_key("ou est la gare", 'fr', limit=3, kind='translate'))
+        self.assertNotEqual(make_key("gare", 'fr', 'dr'), make_key("gare", 'fr', 'en'))
+
+    def test_single_flight_threads(self):
+        """Test du calcul partagé entre threads : une seule exécution pour des appels simultanés"""
+        cache = ResponseCache()
+        calls = []
+        barrier = threading.Barrier(8)
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return 'valeur'
+
+        def worker(results):
+            barrier.wait()
+            results.append(cache.get_or_compute('clé', compute))
+
+        results = []
+        threads = [threading.Thread(target=worker, args=(results,)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['valeur'] * 8)
+
+    def test_compute_error_not_cached(self):
+        """Test d'une erreur de calcul : propagée et non mise en cache"""
+        cache = ResponseCache()
+
+        def compute():
+            raise RuntimeError("échec")
+
+        with self.assertRaises(RuntimeError):
+            cache.get_or_compute('clé', compute)
+        self.assertEqual(cache.get_or_compute('clé', lambda: 'valeur'), 'valeur')
+
+    def test_async_single_flight(self):
+        """Test du calcul partagé asynchrone : une seule coroutine pour des appels simultanés"""
+        cache = ResponseCache()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 'valeur'
+
+        async def scenario():
+            return await asyncio.gather(*(cache.aget_or_compute('clé', compute) for _ in range(5)))
+
+        self.assertEqual(asyncio.run(scenario()), ['valeur'] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats()['coalesced'], 4)
+        self.assertEqual(cache.get('clé'), (True, 'valeur'))
+
+    def test_async_leader_cancelled(self):
+        """Test de l'annulation de l'appelant qui a lancé le calcul : les autres obtiennent la valeur"""
+        cache = ResponseCache()
+        started = None
+
+        async def compute():
+            started.set()
+            await asyncio.sleep(0.02)
+            return 'valeur'
+
+        async def scenario():
+            nonlocal started
+            started = asyncio.Event()
+            leader = asyncio.create_task(cache.aget_or_compute('clé', compute))
+            await started.wait()
+            follower = asyncio.create_task(cache.aget_or_compute('clé', compute))
+            await asyncio.sleep(0)
+            leader.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await leader
+            return await follower
+
+        self.assertEqual(asyncio.run(scenario()), 'valeur')
+        self.assertEqual(cache.get('clé'), (True, 'valeur'))
+
+    def test_clear_during_compute(self):
+        """Test de clear() pendant un calcul : la valeur calculée avant n'est pas mise en cache"""
+        cache = ResponseCache()
+
+        async def compute():
+            await asyncio.sleep(0.01)
+            return 'ancienne'
+
+        async def scenario():
+            task = asyncio.create_task(cache.aget_or_compute('clé', compute))
+            await asyncio.sleep(0)
+            cache.clear()
+            return await task
+
+        self.assertEqual(asyncio.run(scenario()), 'ancienne')
+        self.assertEqual(cache.get('clé'), (False, None))
+
+        def compute_sync():
+            cache.clear()
+            return 'ancienne'
+
+        self.assertEqual(cache.get_or_compute('clé', compute_sync), 'ancienne')
+        self.assertEqual(cache.get('clé'), (False, None))
+
+if __name__ == '__main__':
+    unittest.main()
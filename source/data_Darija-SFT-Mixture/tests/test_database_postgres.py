@@ -0,0 +1,378 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+from datetime import datetime
+
+# Schéma PostgreSQL (source/database), testé sur une vraie base
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../database'))
+
+# Base jetable (PostgreSQL avec l'extension pg_trgm), par exemple
+# TEST_DATABASE_URL=postgresql://postgres@localhost/darija_test
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+
+if TEST_DATABASE_URL:
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.engine import make_url
+    import models
+    import migration
+    import partitions
+    from repository import TranslationRepository
+    from search import search_translations
+
+@unittest.skipUnless(TEST_DATABASE_URL, "TEST_DATABASE_URL non définie : tests PostgreSQL ignorés")
+class PostgresTestCase(unittest.TestCase):
+    """Crée un schéma dédié pour la classe de tests et y dirige models.py (search_path)"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.schema = f"test_{cls.__name__.lower()}_{os.getpid()}"
+        cls.admin = create_engine(TEST_DATABASE_URL)
+        with cls.admin.begin() as conn:
+            conn.execute(text(f"CREATE SCHEMA {cls.schema}"))
+        url = make_url(TEST_DATABASE_URL).update_query_dict({'options': f"-csearch_path={cls.schema},public"})
+        cls.previous_url = os.environ.get('DATABASE_URL')
+        os.environ['DATABASE_URL'] = url.render_as_string(hide_password=False)
+        models.dispose_engines()
+        models.init_db()
+
+    @classmethod
+    def tearDownClass(cls):
+        models.dispose_engines()
+        if cls.previous_url is None:
+            os.environ.pop('DATABASE_URL', None)
+        else:
+            os.environ['DATABASE_URL'] = cls.previous_url
+        with cls.admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA {cls.schema} CASCADE"))
+        cls.admin.dispose()
+
+    def query(self, sql, **params):
+        with models.get_engine().connect() as conn:
+            return conn.execute(text(sql), params).fetchall()
+
+class TestDedup(PostgresTestCase):
+    """Tests de la règle de dédoublonnage (models.DEDUP_KEY) et de upsert_translations"""
+
+    def setUp(self):
+        with models.get_engine().begin() as conn:
+            conn.execute(text("DELETE FROM translations"))
+
+    def upsert(self, rows):
+        with models.session_scope() as session:
+            return models.upsert_translations(session, rows)
+
+    def row(self, id, source_text, target_text, source_lang='fr', target_lang='dr'):
+        return {"id": id, "source_lang": source_lang, "target_lang": target_lang,
+                "source_text": source_text, "target_text": target_text, "tags": ["test"], "context": ""}
+
+    def test_pair_hash_matches_python(self):
+        """Test de la colonne générée pair_hash : même empreinte que models.pair_hash()"""
+        self.upsert([self.row("pair_1", "Ça va ?", "Labas ?")])
+        stored = bytes(self.query("SELECT pair_hash FROM translations WHERE id = 'pair_1'")[0][0])
+        self.assertEqual(stored, models.pair_hash("Ça va ?", "Labas ?"))
+        self.assertEqual(len(stored), 32)
+
+    def test_upsert_ignores_duplicates(self):
+        """Test de upsert_translations : une paire déjà présente dans la direction est ignorée"""
+        self.assertEqual(self.upsert([self.row("pair_1", "Bonjour", "Salam")]), 1)
+        # Même textes, même direction, autre id : doublon, y compris dans un même lot
+        self.assertEqual(self.upsert([
+            self.row("pair_2", "Bonjour", "Salam"),
+            self.row("pair_3", "Merci", "Choukran"),
+            self.row("pair_4", "Merci", "Choukran"),
+        ]), 1)
+        self.assertEqual(self.query("SELECT id FROM translations ORDER BY id"), [("pair_1",), ("pair_3",)])
+
+    def test_dedup_semantics(self):
+        """Test de la règle : direction comprise, textes comparés sans normalisation"""
+        inserted = self.upsert([
+            self.row("pair_1", "Bonjour", "Salam"),
+            # Même paire de textes dans une autre direction : traduction distincte
+            self.row("pair_2", "Bonjour", "Salam", source_lang='en'),
+            # Casse et espaces différents : traductions distinctes
+            self.row("pair_3", "bonjour", "Salam"),
+            self.row("pair_4", "Bonjour ", "Salam"),
+            # Séparateur : ("a b", "c") et ("a", "b c") ne se confondent pas
+            self.row("pair_5", "Bon", "jour Salam"),
+        ])
+        self.assertEqual(inserted, 5)
+        self.assertNotEqual(models.dedup_key(self.row("x", "Bonjour", "Salam")),
+                            models.dedup_key(self.row("y", "Bonjour", "Salam", source_lang='en')))
+
+    def test_migrate_pair_hash_is_idempotent(self):
+        """Test de migrate_pair_hash sur une base déjà à jour"""
+        self.upsert([self.row("pair_1", "Bonjour", "Salam")])
+        with models.get_engine().begin() as conn:
+            models.migrate_pair_hash(conn)
+        self.assertEqual(self.upsert([self.row("pair_2", "Bonjour", "Salam")]), 0)
+
+class TestMigration(PostgresTestCase):
+    """Tests du migrateur sur le schéma créé par models.init_db()"""
+
+    translations = [
+        {"id": "pair_1", "source_lang": "fr", "target_lang": "dr", "source_text": "Bonjour",
+         "target_text": "Salam", "tags": ["salutation", "politesse"], "context": "Accueil"},
+        {"id": "pair_2", "source_lang": "fr", "target_lang": "dr", "source_text": "Merci",
+         "target_text": "Choukran", "tags": ["politesse"], "context": ""},
+        # Même paire de textes et même direction que pair_1 : doublon
+        {"id": "pair_3", "source_lang": "fr", "target_lang": "dr", "source_text": "Bonjour",
+         "target_text": "Salam", "tags": ["salutation"], "context": "Doublon"},
+        {"id": "pair_inverse_1", "source_lang": "dr", "target_lang": "fr", "source_text": "Salam",
+         "target_text": "Bonjour", "tags": ["salutation"], "context": ""},
+        # Direction sans partition par défaut : créée par prepare_partitions
+        {"id": "pair_4", "source_lang": "es", "target_lang": "dr", "source_text": "Gracias",
+         "target_text": "Choukran", "tags": [], "context": ""},
+    ]
+
+    def setUp(self):
+        """Fichier source temporaire et table vide pour chaque test"""
+        with models.get_engine().begin() as conn:
+            conn.execute(text("DELETE FROM translations"))
+        handle, self.filepath = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(handle, 'w', encoding='utf-8') as f:
+            json.dump(self.translations, f, ensure_ascii=False)
+        self.previous_file = migration.TRANSLATIONS_FILE
+        migration.TRANSLATIONS_FILE = self.filepath
+
+    def tearDown(self):
+        migration.TRANSLATIONS_FILE = self.previous_file
+        os.remove(self.filepath)
+
+    def assert_migrated(self):
+        rows = self.query("SELECT id, source_lang, target_lang, tags FROM translations ORDER BY id")
+        self.assertEqual([r[0] for r in rows], ["pair_1", "pair_2", "pair_4", "pair_inverse_1"])
+        self.assertEqual(rows[0][3], ["politesse", "salutation"])
+        # Chaque direction est rangée dans sa partition
+        self.assertEqual(self.query("SELECT id FROM translations_fr_dr ORDER BY id"), [("pair_1",), ("pair_2",)])
+        self.assertEqual(self.query("SELECT id FROM translations_es_dr"), [("pair_4",)])
+        # Compteurs de tags tenus à jour par les triggers
+        counts = dict(((r[0], r[1], r[2]), r[3]) for r in self.query(
+            "SELECT tag, source_lang, target_lang, count FROM tag_counts"))
+        self.assertEqual(counts[("politesse", "fr", "dr")], 2)
+        self.assertEqual(counts[("salutation", "fr", "dr")], 1)
+        self.assertIsNotNone(self.query("SELECT created_at FROM translations WHERE id = 'pair_1'")[0][0])
+
+    def test_init_db_then_migrate_bulk(self):
+        """Test de init_db() suivi de migrate_bulk (COPY), rejoué sans créer de doublons"""
+        migration.PostgreSQLMigrator().migrate_bulk(batch_size=2)
+        self.assert_migrated()
+        migration.PostgreSQLMigrator().migrate_bulk(batch_size=2)
+        self.assert_migrated()
+
+    def test_migrate_batched(self):
+        """Test de la migration par lots execute_values"""
+        migration.PostgreSQLMigrator().migrate_batched(batch_size=2)
+        self.assert_migrated()
+
+    def test_migrate_standard(self):
+        """Test de la migration ligne par ligne"""
+        migration.PostgreSQLMigrator().migrate()
+        self.assert_migrated()
+
+    def test_migrate_resumable(self):
+        """Test de la migration reprenable : upsert sur DEDUP_KEY, reprise au dernier lot validé"""
+        migration.PostgreSQLMigrator().migrate_resumable(batch_size=2)
+        rows = self.query("SELECT id, tags, context FROM translations ORDER BY id")
+        self.assertEqual([r[0] for r in rows], ["pair_1", "pair_2", "pair_4", "pair_inverse_1"])
+        # Le doublon pair_3 (lot suivant) met à jour la ligne de pair_1
+        self.assertEqual(tuple(rows[0][1:]), (["salutation"], "Doublon"))
+        self.assertEqual(self.query(
+            "SELECT count(*) FROM information_schema.columns "
+            "WHERE table_name = 'translations' AND column_name = 'content_hash'")[0][0], 0)
+
+        # Interruption simulée après le deuxième lot : seul le dernier lot est rejoué
+        with models.get_engine().begin() as conn:
+            conn.execute(text("DELETE FROM translations WHERE id IN ('pair_2', 'pair_4')"))
+            conn.execute(text("UPDATE migration_checkpoints SET last_offset = 4, completed = FALSE"))
+        migration.PostgreSQLMigrator().migrate_resumable(batch_size=2)
+        ids = [r[0] for r in self.query("SELECT id FROM translations ORDER BY id")]
+        self.assertEqual(ids, ["pair_1", "pair_4", "pair_inverse_1"])
+        self.assertEqual(self.query("SELECT completed FROM migration_checkpoints"), [(True,)])
+
+    def test_migrate_resumable_edited_file(self):
+        """Test d'un fichier modifié entre deux passages : un id positionnel désigne une autre paire"""
+        migration.PostgreSQLMigrator().migrate_resumable(batch_size=2)
+        edited = [dict(t) for t in self.translations]
+        edited[1].update(source_text="Merci beaucoup", target_text="Choukran bzaf")
+        with open(self.filepath, 'w', encoding='utf-8') as f:
+            json.dump(edited, f, ensure_ascii=False)
+        migration.PostgreSQLMigrator().migrate_resumable(batch_size=2)
+
+        rows = dict(self.query("SELECT source_text, id FROM translations WHERE source_lang = 'fr'"))
+        # La ligne déjà migrée garde son id, la nouvelle paire prend l'id de son empreinte
+        self.assertEqual(rows["Merci"], "pair_2")
+        self.assertEqual(rows["Merci beaucoup"], migration.hash_id("Merci beaucoup", "Choukran bzaf"))
+        self.assertEqual(self.query("SELECT completed FROM migration_checkpoints WHERE source_file = :f",
+                                    f=self.filepath), [(True,)])
+
+class TestPartitions(PostgresTestCase):
+    """Tests de la création des partitions (partitions.ensure_partitions)"""
+
+    def test_ensure_partitions_moves_default_rows(self):
+        """Test de ensure_partitions sur des directions dont les lignes sont dans translations_default"""
+        rows = [{"id": f"pair_{i}", "source_lang": "it", "target_lang": target_lang,
+                 "source_text": f"Frase {i}", "target_text": f"Jomla {i}", "tags": [], "context": ""}
+                for i, target_lang in enumerate(["dr", "dr", "en"])]
+        with models.session_scope() as session:
+            models.upsert_translations(session, rows)
+        self.assertEqual(len(self.query("SELECT id FROM translations_default")), 3)
+
+        with models.get_engine().begin() as conn:
+            partitions.ensure_partitions(conn.connection.cursor(), [("it", "dr")])
+
+        # Aucune ligne perdue, chacune rangée dans sa partition
+        self.assertEqual(len(self.query("SELECT id FROM translations WHERE source_lang = 'it'")), 3)
+        self.assertEqual(self.query("SELECT id FROM translations_default"), [])
+        self.assertEqual(self.query("SELECT id FROM translations_it_dr ORDER BY id"), [("pair_0",), ("pair_1",)])
+        self.assertEqual(self.query("SELECT id FROM translations_it_default"), [("pair_2",)])
+
+class TestInitDb(PostgresTestCase):
+    """Tests de init_db() sur une table translations créée par une version antérieure"""
+
+    def test_init_db_adds_search_columns_and_indexes(self):
+        """Test de l'ajout des colonnes tsvector et des index manquants sur une table existante"""
+        with models.get_engine().begin() as conn:
+            # Les index sur ces colonnes disparaissent avec elles
+            conn.execute(text("ALTER TABLE translations DROP COLUMN source_tsv, DROP COLUMN target_tsv"))
+            conn.execute(text("DROP INDEX ix_translations_tags"))
+            # Pagination d'avant : created_at facultatif, index sur (created_at, id)
+            conn.execute(text("ALTER TABLE translations ALTER COLUMN created_at DROP NOT NULL, "
+                              "ALTER COLUMN created_at DROP DEFAULT"))
+            conn.execute(text("DROP INDEX ix_translations_created_id"))
+            conn.execute(text("CREATE INDEX ix_translations_created_id ON translations (created_at, id)"))
+            conn.execute(text(
+                "INSERT INTO translations (id, source_lang, target_lang, source_text, target_text) "
+                "VALUES ('pair_1', 'fr', 'dr', 'Les enfants jouent', 'Drari kayl3bo')"))
+        models.init_db()
+
+        indexes = {r[0] for r in self.query("SELECT indexname FROM pg_indexes WHERE tablename = 'translations'")}
+        self.assertLessEqual({i.name for i in models.Translation.__table__.indexes}, indexes)
+        # Colonne générée recalculée pour les lignes existantes (configuration 'french')
+        self.assertEqual(self.query(
+            "SELECT id FROM translations WHERE source_tsv @@ to_tsquery('french', 'enfant')"), [("pair_1",)])
+        # Dates manquantes posées, index de pagination recréé sur la clé primaire complète
+        self.assertIsNotNone(self.query("SELECT created_at FROM translations WHERE id = 'pair_1'")[0][0])
+        definition = self.query("SELECT indexdef FROM pg_indexes WHERE indexname = 'ix_translations_created_id'")
+        self.assertIn("source_lang", definition[0][0])
+        # init_db() est rejouable sur une base à jour
+        models.init_db()
+
+    def test_init_db_rebuilds_target_tsv(self):
+        """Test du recalcul de target_tsv générée avec la configuration de la langue cible"""
+        with models.get_engine().begin() as conn:
+            conn.execute(text("DELETE FROM translations"))
+            conn.execute(text("ALTER TABLE translations DROP COLUMN target_tsv"))
+            conn.execute(text(
+                "ALTER TABLE translations ADD COLUMN target_tsv TSVECTOR GENERATED ALWAYS AS "
+                f"({models._tsvector_expression('target_lang', 'target_text')}) STORED"))
+            conn.execute(text(
+                "INSERT INTO translations (id, source_lang, target_lang, source_text, target_text) "
+                "VALUES ('pair_1', 'fr', 'fr', 'Drari mchaw l lmdrassa', 'Les enfants vont à l''école')"))
+        models.init_db()
+
+        generation = self.query(
+            "SELECT generation_expression FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = 'translations' AND column_name = 'target_tsv'")
+        self.assertEqual(generation, [(models.TARGET_TSV_EXPRESSION,)])
+        # Mots non racinisés, index GIN recréé avec la colonne
+        self.assertEqual(self.query(
+            "SELECT id FROM translations WHERE target_tsv @@ to_tsquery('simple', 'enfants')"), [("pair_1",)])
+        indexes = {r[0] for r in self.query("SELECT indexname FROM pg_indexes WHERE tablename = 'translations'")}
+        self.assertIn("ix_translations_target_tsv", indexes)
+        models.init_db()
+        self.assertEqual(self.query("SELECT count(*) FROM translations"), [(1,)])
+
+class TestSearch(PostgresTestCase):
+    """Tests de la recherche plein texte (search_translations, sans trigrammes)"""
+
+    def setUp(self):
+        with models.get_engine().begin() as conn:
+            conn.execute(text("DELETE FROM translations"))
+        rows = [
+            {"id": "pair_1", "source_lang": "fr", "target_lang": "dr", "source_text": "Les enfants vont à l'école",
+             "target_text": "Drari mchaw l lmdrassa", "tags": [], "context": ""},
+            {"id": "pair_2", "source_lang": "fr", "target_lang": "dr", "source_text": "Je veux du thé",
+             "target_text": "بغيت أتاي", "tags": [], "context": ""},
+        ]
+        with models.session_scope() as session:
+            models.upsert_translations(session, rows)
+
+    def ids(self, query, **filters):
+        with models.session_scope() as session:
+            return [t.id for t, _ in search_translations(session, query, fuzzy=False, **filters)]
+
+    def test_target_text_not_stemmed(self):
+        """Test du texte cible (darija) : trouvé tel quel, même avec le filtre sur la langue source"""
+        self.assertEqual(self.ids("Drari", source_lang="fr"), ["pair_1"])
+        self.assertEqual(self.ids("lmdrassa"), ["pair_1"])
+        self.assertEqual(self.ids("أتاي", source_lang="fr"), ["pair_2"])
+
+    def test_source_text_stemmed(self):
+        """Test du texte source : configuration de sa langue ('enfant' trouve 'enfants')"""
+        self.assertEqual(self.ids("enfant", source_lang="fr"), ["pair_1"])
+
+class TestRepository(PostgresTestCase):
+    """Tests de la pagination par curseur (keyset) de TranslationRepository.list_page"""
+
+    def setUp(self):
+        with models.get_engine().begin() as conn:
+            conn.execute(text("DELETE FROM translations"))
+        # Deux lignes à la même date : l'ordre est départagé par l'id
+        dates = [datetime(2024, 1, 1), datetime(2024, 1, 2), datetime(2024, 1, 2), datetime(2024, 1, 3), datetime(2024, 1, 4)]
+        rows = [{"id": f"pair_{i}", "source_lang": "fr", "target_lang": "dr" if i != 3 else "en",
+                 "source_text": f"Phrase {i}", "target_text": f"Jomla {i}", "tags": [], "context": "",
+                 "created_at": created_at}
+                for i, created_at in enumerate(dates)]
+        with models.session_scope() as session:
+            models.upsert_translations(session, rows)
+
+    def page_ids(self, limit, **filters):
+        """Parcourt les pages et retourne les (id, source_lang, target_lang) lus, et le nombre de pages"""
+        ids, cursor, pages = [], None, 0
+        with models.session_scope() as session:
+            repository = TranslationRepository(session)
+            while True:
+                page = repository.list_page(limit=limit, cursor=cursor, **filters)
+                ids += [(t.id, t.source_lang, t.target_lang) for t in page["items"]]
+                pages += 1
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    return ids, pages
+
+    def test_list_pages(self):
+        """Test du parcours page par page : ordre (created_at, id), sans doublon ni oubli"""
+        ids, pages = self.page_ids(2)
+        self.assertEqual([i[0] for i in ids], ["pair_0", "pair_1", "pair_2", "pair_3", "pair_4"])
+        self.assertEqual(pages, 3)
+        with models.session_scope() as session:
+            filtered = [t.id for t in TranslationRepository(session).iter_all(
+                page_size=1, source_lang="fr", target_lang="dr")]
+        self.assertEqual(filtered, ["pair_0", "pair_1", "pair_2", "pair_4"])
+
+    def test_same_id_in_several_directions(self):
+        """Test d'un même id dans plusieurs directions à la même date, coupé par une fin de page"""
+        created_at = datetime(2024, 1, 2)
+        rows = [{"id": "pair_1", "source_lang": source_lang, "target_lang": target_lang,
+                 "source_text": f"Phrase {source_lang}", "target_text": f"Jomla {target_lang}",
+                 "tags": [], "context": "", "created_at": created_at}
+                for source_lang, target_lang in [("dr", "fr"), ("en", "dr"), ("dr", "en")]]
+        with models.session_scope() as session:
+            models.upsert_translations(session, rows)
+        for limit in (1, 2, 3):
+            ids, _ = self.page_ids(limit)
+            self.assertEqual(len(ids), 8, limit)
+            self.assertEqual(len(set(ids)), 8, limit)
+
+    def test_created_at_set_by_server(self):
+        """Test d'une ligne insérée en SQL brut sans created_at : date posée par le serveur"""
+        with models.get_engine().begin() as conn:
+            conn.execute(text(
+                "INSERT INTO translations (id, source_lang, target_lang, source_text, target_text) "
+                "VALUES ('pair_sql', 'fr', 'dr', 'Sans date', 'Bla tarikh')"))
+        ids, _ = self.page_ids(2)
+        self.assertEqual(ids[-1], ("pair_sql", "fr", "dr"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Snapshot SQLite des traductions (source/database/export_sqlite.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../database'))
+from export_sqlite import build_snapshot, open_snapshot, lookup, find_by_tag
+
+class TestExportSqlite(unittest.TestCase):
+    """Tests unitaires du snapshot SQLite en lecture seule (recherche exacte et FTS5)"""
+
+    translations = [
+        {"source_lang": "fr", "target_lang": "dr", "source_text": "Où est la gare ?",
+         "target_text": "Fin kayna lagar?", "tags": ["voyage", "question"], "context": "Gare"},
+        {"source_lang": "fr", "target_lang": "dr", "source_text": "Le train part à quelle heure ?",
+         "target_text": "Fo9ach ghadi ykhroj tran?", "tags": ["voyage"], "context": ""},
+        {"source_lang": "fr", "target_lang": "en", "source_text": "Où est la gare ?",
+         "target_text": "Where is the station?", "tags": ["voyage"], "context": ""},
+        # Doublon exact : exporté une seule fois
+        {"source_lang": "fr", "target_lang": "dr", "source_text": "Où est la gare ?",
+         "target_text": "Fin kayna lagar?", "tags": ["voyage"], "context": "Doublon"},
+    ]
+
+    def setUp(self):
+        """Snapshot construit dans un dossier temporaire"""
+        self.dossier = tempfile.TemporaryDirectory()
+        self.path = build_snapshot(self.translations, self.dossier.name)
+        self.conn = open_snapshot(self.path)
+
+    def tearDown(self):
+        self.conn.close()
+        self.dossier.cleanup()
+
+    def test_snapshot_content_addressed(self):
+        """Test du nom du fichier : même contenu, même snapshot (non reconstruit)"""
+        # Ordre différent (le premier doublon rencontré reste celui exporté)
+        reordered = [self.translations[i] for i in (1, 0, 3, 2)]
+        self.assertEqual(build_snapshot(reordered, self.dossier.name), self.path)
+        metadata = dict(self.conn.execute("SELECT key, value FROM metadata"))
+        self.assertEqual(metadata["translation_count"], "3")
+        self.assertIn(metadata["content_hash"][:16], os.path.basename(self.path))
+        other = build_snapshot(self.translations[:2], self.dossier.name)
+        self.assertNotEqual(other, self.path)
+
+    def test_lookup_exact_normalized(self):
+        """Test de la recherche exacte sur le texte normalisé (casse, accents, ponctuation)"""
+        results = lookup(self.conn, "ou est la GARE", "fr", "dr")
+        self.assertEqual([r["target_text"] for r in results], ["Fin kayna lagar?"])
+        self.assertEqual(len(lookup(self.conn, "Où est la gare ?", "fr")), 2)
+
+    def test_lookup_fts_fallback(self):
+        """Test du repli plein texte FTS5, insensible aux accents et à la syntaxe FTS5 de la saisie"""
+        results = lookup(self.conn, "train quelle", "fr")
+        self.assertEqual([r["target_text"] for r in results], ["Fo9ach ghadi ykhroj tran?"])
+        self.assertEqual(len(lookup(self.conn, "gare", "fr", "en")), 1)
+        self.assertEqual(lookup(self.conn, 'gare" OR NEAR(train', "fr"), [])
+        self.assertEqual(lookup(self.conn, "gare", "en"), [])
+
+    def test_find_by_tag(self):
+        """Test de la recherche par tag"""
+        self.assertEqual(len(find_by_tag(self.conn, "voyage")), 3)
+        self.assertEqual([r["target_lang"] for r in find_by_tag(self.conn, "question")], ["dr"])
+
+    def test_snapshot_read_only(self):
+        """Test de l'ouverture en lecture seule"""
+        with self.assertRaises(Exception):
+            self.conn.execute("DELETE FROM translations")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+import threading
+
+# Index en mémoire de l'API de consultation (source/api/index_phrases.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../api'))
+from index_phrases import PhraseIndex, IndexManager
+
+TRANSLATIONS = [
+    {"source_lang": "fr", "target_lang": "dr", "source_text": "Où est la gare ?", "target_text": "Fin kayna lagar ?",
+     "tags": ["voyage"], "context": "Gare"},
+    {"source_lang": "fr", "target_lang": "en", "source_text": "Où est la gare ?", "target_text": "Where is the station?"},
+    {"source_lang": "dr", "target_lang": "fr", "source_text": "Salam", "target_text": "Bonjour"},
+    # Paire incomplète : ignorée
+    {"source_lang": "fr", "target_lang": "dr", "source_text": "Merci", "target_text": ""},
+]
+
+class TestPhraseIndex(unittest.TestCase):
+    """Tests unitaires de la consultation de l'index en mémoire"""
+
+    def setUp(self):
+        self.index = PhraseIndex(TRANSLATIONS, version="v1")
+
+    def test_lookup_normalized(self):
+        """Test de la correspondance exacte après normalisation (casse, accents, ponctuation)"""
+        results = self.index.lookup("ou est la GARE", "fr")
+        self.assertEqual([r["target_text"] for r in results], ["Fin kayna lagar ?", "Where is the station?"])
+        self.assertEqual(results[0]["tags"], ["voyage"])
+        self.assertEqual(results[1]["context"], "")
+
+    def test_lookup_filters(self):
+        """Test des filtres : langue source obligatoire, langue cible facultative"""
+        self.assertEqual([r["target_text"] for r in self.index.lookup("Où est la gare ?", "fr", "en")],
+                         ["Where is the station?"])
+        self.assertEqual(self.index.lookup("Où est la gare ?", "dr"), [])
+        self.assertEqual(self.index.lookup("Merci", "fr"), [])
+
+    def test_stats(self):
+        """Test des statistiques : paires incomplètes non comptées"""
+        stats = self.index.stats()
+        self.assertEqual((stats["version"], stats["translations"], stats["keys"]), ("v1", 3, 2))
+
+    def test_results_are_copies(self):
+        """Test de l'immuabilité : modifier une réponse ne modifie pas l'index"""
+        self.index.lookup("Salam", "dr").clear()
+        self.assertEqual(len(self.index.lookup("Salam", "dr")), 1)
+
+class TestIndexManager(unittest.TestCase):
+    """Tests unitaires du remplacement de l'index à chaud"""
+
+    def setUp(self):
+        handle, self.filepath = tempfile.mkstemp(suffix='.json')
+        os.close(handle)
+        self.write(TRANSLATIONS)
+        self.manager = IndexManager('file', self.filepath)
+
+    def tearDown(self):
+        os.remove(self.filepath)
+
+    def write(self, translations):
+        with open(self.filepath, 'w', encoding='utf-8') as f:
+            json.dump(translations, f, ensure_ascii=False)
+
+    def test_reload_only_when_changed(self):
+        """Test du rechargement : seulement si le fichier a changé, callbacks appelés"""
+        calls = []
+        self.manager.on_reload.append(lambda: calls.append(1))
+        self.assertTrue(self.manager.load())
+        self.assertFalse(self.manager.reload_if_changed())
+        self.write(TRANSLATIONS + [{"source_lang": "fr", "target_lang": "dr",
+                                    "source_text": "Merci beaucoup", "target_text": "Choukran bzaf"}])
+        self.assertTrue(self.manager.reload_if_changed())
+        self.assertEqual(len(self.manager.index.lookup("merci beaucoup", "fr")), 1)
+        self.assertEqual((self.manager.reloads, len(calls)), (2, 2))
+
+    def test_swap_keeps_old_index(self):
+        """Test du remplacement : l'ancien index reste utilisable, une erreur le garde en place"""
+        self.manager.load()
+        old = self.manager.index
+        self.write([{"source_lang": "dr", "target_lang": "fr", "source_text": "Bslama", "target_text": "Au revoir"}])
+        self.manager.load()
+        self.assertIsNot(self.manager.index, old)
+        # Une requête en cours sur l'ancien index n'est pas affectée
+        self.assertEqual(len(old.lookup("Salam", "dr")), 1)
+        self.assertEqual(self.manager.index.lookup("Salam", "dr"), [])
+
+        current = self.manager.index
+        with open(self.filepath, 'w', encoding='utf-8') as f:
+            f.write("{ fichier tronqué")
+        self.assertFalse(self.manager.reload_if_changed())
+        self.assertIs(self.manager.index, current)
+
+    def test_concurrent_readers_see_complete_index(self):
+        """Test des lectures pendant les rechargements : toujours un index complet, ancien ou nouveau"""
+        self.manager.load()
+        big = [{"source_lang": "fr", "target_lang": "dr", "source_text": f"Phrase {i}", "target_text": f"Jomla {i}"}
+               for i in range(2000)]
+        sizes, stop = set(), threading.Event()
+
+        def read():
+            while not stop.is_set():
+                sizes.add(self.manager.index.stats()["translations"])
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for t in readers:
+            t.start()
+        for translations in (big, TRANSLATIONS, big):
+            self.write(translations)
+            self.manager.load(force=True)
+        stop.set()
+        for t in readers:
+            t.join()
+        self.assertLessEqual(sizes, {3, 2000})
+
+if __name__ == '__main__':
+    unittest.main()
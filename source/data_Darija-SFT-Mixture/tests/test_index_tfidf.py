@@ -0,0 +1,78 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Index TF-IDF du RAG (source/rag/index_tfidf.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../rag'))
+from index_tfidf import compter_ngrammes, construire_index, IndexTfidf
+
+class TestCompterNgrammes(unittest.TestCase):
+    """Tests unitaires du comptage vectorisé des n-grammes de caractères"""
+
+    def test_counts(self):
+        """Test du nombre de n-grammes : ' abc ' a 3 trigrammes et 2 quadrigrammes"""
+        comptes = compter_ngrammes(["abc"], 3, 4, 2 ** 20)
+        self.assertEqual(comptes.shape, (1, 2 ** 20))
+        self.assertEqual(comptes.sum(), 5)
+
+    def test_normalization(self):
+        """Test de la normalisation : casse, accents et ponctuation ignorés"""
+        comptes = compter_ngrammes(["Où est la gare ?", "ou est la gare"])
+        self.assertEqual((comptes[0] != comptes[1]).nnz, 0)
+
+    def test_no_ngram_across_texts(self):
+        """Test de la concaténation : aucun n-gramme à cheval sur deux textes"""
+        ensemble = compter_ngrammes(["salam", "", "labas"])
+        separes = [compter_ngrammes([t]) for t in ["salam", "", "labas"]]
+        for i, seul in enumerate(separes):
+            self.assertEqual((ensemble[i] != seul).nnz, 0)
+        self.assertEqual(ensemble[1].sum(), 0)
+
+class TestIndexTfidf(unittest.TestCase):
+    """Tests de la recherche dans un index construit sur quelques paires"""
+
+    paires = [
+        {"source_lang": "fr", "target_lang": "dr", "source_text": "Combien ça coûte ?",
+         "target_text": "Chhal hada?", "tags": ["achat"], "context": "Marché"},
+        {"source_lang": "fr", "target_lang": "dr", "source_text": "Où est la gare ?",
+         "target_text": "Fin kayna lagar?", "tags": [], "context": ""},
+        {"source_lang": "dr", "target_lang": "fr", "source_text": "Chhal hada?",
+         "target_text": "Combien ça coûte ?", "tags": ["achat"], "context": ""},
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dossier = tempfile.TemporaryDirectory()
+        construire_index(cls.paires, os.path.join(cls.dossier.name, "index"))
+        cls.index = IndexTfidf(os.path.join(cls.dossier.name, "index"))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.index.close()
+        cls.dossier.cleanup()
+
+    def test_rechercher_approximate(self):
+        """Test d'une recherche malgré l'orthographe approximative"""
+        resultats = self.index.rechercher("chhal hadi", k=1, direction="fr_dr")
+        self.assertEqual(len(resultats), 1)
+        self.assertEqual(resultats[0]["paire"]["source_text"], "Combien ça coûte ?")
+        self.assertEqual(resultats[0]["colonne"], "target")
+        self.assertEqual(resultats[0]["paire"]["context"], "Marché")
+
+    def test_rechercher_batch_and_filters(self):
+        """Test d'une recherche par lot, filtrée par direction et par colonne"""
+        resultats = self.index.rechercher(["combien ca coute", "la gare"], k=2, direction="fr_dr", colonne="source")
+        self.assertEqual(len(resultats), 2)
+        self.assertEqual(resultats[0][0]["paire"]["target_text"], "Chhal hada?")
+        self.assertEqual(resultats[1][0]["paire"]["target_text"], "Fin kayna lagar?")
+        self.assertTrue(all(r["colonne"] == "source" for liste in resultats for r in liste))
+        self.assertGreaterEqual(resultats[0][0]["score"], resultats[0][-1]["score"])
+        # Toutes directions : chaque paire n'apparaît qu'une fois
+        tous = self.index.rechercher("Chhal hada?", k=5)
+        self.assertEqual(len(tous), len({(r["paire"]["source_lang"], r["paire"]["source_text"]) for r in tous}))
+        self.assertEqual(self.index.rechercher("salam", direction="en_dr"), [])
+        self.assertEqual(self.index.rechercher(["salam"], direction="en_dr"), [[]])
+
+if __name__ == '__main__':
+    unittest.main()
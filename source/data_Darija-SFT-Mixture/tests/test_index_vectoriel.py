@@ -0,0 +1,158 @@
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+import threading
+import numpy as np
+
+# Index vectoriel du RAG (source/rag/index_vectoriel.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../rag'))
+import index_vectoriel
+from index_vectoriel import construire_index, IndexVectoriel, LecteurPaires
+
+class EncodeurTest:
+    """Encodeur de test : un vecteur aléatoire normalisé, fixe pour chaque texte"""
+
+    nom = "test-16"
+    dimension = 16
+
+    def __init__(self):
+        self.vecteurs = {}
+        self.generateur = np.random.default_rng(0)
+
+    def encoder(self, textes):
+        for texte in textes:
+            if texte not in self.vecteurs:
+                vecteur = self.generateur.standard_normal(self.dimension).astype(np.float32)
+                self.vecteurs[texte] = vecteur / np.linalg.norm(vecteur)
+        return np.array([self.vecteurs[t] for t in textes], dtype=np.float32)
+
+class TestIndexVectoriel(unittest.TestCase):
+    """Tests unitaires de la recherche top-k sur les vecteurs ouverts en mémoire partagée"""
+
+    def setUp(self):
+        self.dossier = tempfile.mkdtemp()
+        self.encodeur = EncodeurTest()
+        self.paires = [{
+            "source_lang": "fr" if i % 3 else "dr",
+            "target_lang": "dr" if i % 3 else "fr",
+            "source_text": f"Phrase numéro {i}",
+            "target_text": f"Jomla {i} ✓",
+            "tags": (["nourriture"] if i % 2 else []) + (["voyage"] if i % 5 == 0 else []),
+            "context": f"Contexte {i}",
+        } for i in range(40)]
+        self.requetes = self.encodeur.encoder([f"Requête {i}" for i in range(4)])
+        # Blocs de 7 lignes : la fusion du top-k traverse plusieurs blocs
+        self.taille_bloc = index_vectoriel.TAILLE_BLOC
+        index_vectoriel.TAILLE_BLOC = 7
+
+    def tearDown(self):
+        index_vectoriel.TAILLE_BLOC = self.taille_bloc
+        shutil.rmtree(self.dossier, ignore_errors=True)
+
+    def ouvrir(self, type_vecteurs='float16'):
+        dossier = os.path.join(self.dossier, type_vecteurs)
+        construire_index(self.paires, dossier, encodeur=self.encodeur, type_vecteurs=type_vecteurs)
+        index = IndexVectoriel(dossier, encodeur=self.encodeur)
+        self.addCleanup(index.close)
+        return index
+
+    def top_k_exact(self, index, lignes, k):
+        """Top-k calculé sur toute la matrice d'un coup, restreint aux lignes données"""
+        vecteurs = np.asarray(index.vecteurs, dtype=np.float32)[lignes]
+        scores = self.requetes @ vecteurs.T
+        ordre = np.argsort(-scores, axis=1, kind='stable')[:, :k]
+        return np.asarray(lignes)[ordre], np.take_along_axis(scores, ordre, axis=1)
+
+    def test_top_k_across_blocks(self):
+        """Test de la fusion du top-k bloc par bloc : même résultat qu'un calcul en une fois"""
+        index = self.ouvrir()
+        lignes, scores = index.rechercher_vecteurs(self.requetes, k=5)
+        attendues, scores_attendus = self.top_k_exact(index, np.arange(len(self.paires)), 5)
+        np.testing.assert_array_equal(lignes, attendues)
+        np.testing.assert_allclose(scores, scores_attendus, rtol=1e-6)
+        # Scores décroissants, k borné au nombre de lignes
+        self.assertTrue(np.all(np.diff(scores, axis=1) <= 0))
+        self.assertEqual(index.rechercher_vecteurs(self.requetes, k=100)[0].shape, (4, 40))
+
+    def test_prefilters(self):
+        """Test des pré-filtres sur la direction et les tags (tous requis)"""
+        index = self.ouvrir()
+        candidates = [i for i, p in enumerate(self.paires)
+                      if p["source_lang"] == "fr" and {"nourriture", "voyage"} <= set(p["tags"])]
+        lignes, _ = index.rechercher_vecteurs(self.requetes, k=3, direction="fr_dr", tags=["nourriture", "voyage"])
+        attendues, _ = self.top_k_exact(index, candidates, 3)
+        np.testing.assert_array_equal(lignes, attendues)
+
+        lignes, _ = index.rechercher_vecteurs(self.requetes, k=50, direction="dr_fr")
+        self.assertEqual(sorted(lignes[0]), [i for i, p in enumerate(self.paires) if p["source_lang"] == "dr"])
+        # Direction ou tag inconnus : aucun résultat
+        self.assertEqual(index.rechercher_vecteurs(self.requetes, direction="en_dr")[0].shape, (4, 0))
+        self.assertEqual(index.rechercher_vecteurs(self.requetes, tags=["inconnu"])[0].shape, (4, 0))
+
+    def test_int8_quantization(self):
+        """Test de la quantification int8 : scores proches de ceux en float16, mêmes paires trouvées"""
+        index_float16 = self.ouvrir('float16')
+        index_int8 = self.ouvrir('int8')
+        self.assertEqual(index_int8.vecteurs.dtype, np.int8)
+        self.assertEqual(int(np.abs(np.asarray(index_int8.vecteurs)).max()), 127)
+
+        tous = np.arange(len(self.paires))
+        scores_float16 = index_float16._scores(index_float16.vecteurs[tous], self.requetes)
+        scores_int8 = index_int8._scores(index_int8.vecteurs[tous], self.requetes, index_int8.echelles[tous])
+        np.testing.assert_allclose(scores_int8, scores_float16, atol=0.02)
+
+        # Une phrase de l'index est retrouvée en premier
+        resultat = index_int8.rechercher("Phrase numéro 12", k=2)
+        self.assertEqual(resultat[0]["paire"]["source_text"], "Phrase numéro 12")
+        self.assertAlmostEqual(resultat[0]["score"], 1.0, delta=0.02)
+
+    def test_rechercher_returns_pairs(self):
+        """Test de rechercher() : paires complètes, une liste par texte"""
+        index = self.ouvrir()
+        resultats = index.rechercher(["Phrase numéro 4", "Phrase numéro 7"], k=1, direction="fr_dr")
+        self.assertEqual([r[0]["paire"] for r in resultats], [self.paires[4], self.paires[7]])
+        # Un texte seul : une seule liste de résultats
+        resultat = index.rechercher("Phrase numéro 3", k=2)
+        self.assertEqual(len(resultat), 2)
+        self.assertEqual(resultat[0]["paire"], self.paires[3])
+
+class TestLecteurPaires(unittest.TestCase):
+    """Tests unitaires de la lecture des paires par numéro de ligne"""
+
+    def setUp(self):
+        self.dossier = tempfile.mkdtemp()
+        self.paires = [{"source_lang": "fr", "target_lang": "dr", "source_text": f"Phrase {i} « é »",
+                        "target_text": "ج" * i, "tags": [f"tag{i}"], "context": ""} for i in range(50)]
+        index_vectoriel.ecrire_paires(self.dossier, self.paires)
+        self.lecteur = LecteurPaires(self.dossier)
+
+    def tearDown(self):
+        self.lecteur.close()
+        shutil.rmtree(self.dossier, ignore_errors=True)
+
+    def test_read_lines(self):
+        """Test de la lecture de chaque ligne, y compris la dernière (jusqu'à la fin du fichier)"""
+        self.assertEqual([self.lecteur[i] for i in range(len(self.paires))], self.paires)
+        self.assertEqual(self.lecteur[len(self.paires) - 1], self.paires[-1])
+
+    def test_concurrent_reads(self):
+        """Test des lectures depuis plusieurs threads : chaque thread lit les bonnes lignes"""
+        erreurs = []
+
+        def lire(decalage):
+            for n in range(200):
+                ligne = (n * 7 + decalage) % len(self.paires)
+                if self.lecteur[ligne] != self.paires[ligne]:
+                    erreurs.append(ligne)
+
+        threads = [threading.Thread(target=lire, args=(d,)) for d in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(erreurs, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+
+# Mémoire de traduction (source/agregation) et sa consultation par le scraper (source/traductordarija_scrapping)
+dossier_tests = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(dossier_tests, '../../agregation'))
+sys.path.append(os.path.join(dossier_tests, '../../traductordarija_scrapping'))
+from memoire_traduction import MemoireTraduction, normaliser, distance_mots
+from scrapping import consulter_memoire, sauvegarder_traduction
+from stockage_traductions import StockageTraductions
+
+PAIRES = [
+    ("fr", "dr", "Où est la gare ?", "فين كاينة لاكار؟"),
+    ("fr", "dr", "Tu connais un bon restaurant marocain ?", "كتعرف شي ريسطو مغربي مزيان؟"),
+    ("fr", "dr", "Bonjour", "السلام"),
+    ("fr", "dr", "Merci", "شكرا"),
+    ("fr", "en", "Merci", "Thank you"),
+    ("en", "dr", "Where is the station?", "فين كاينة لاكار؟"),
+]
+
+class TestDistance(unittest.TestCase):
+    """Tests unitaires de la normalisation et de la distance d'édition bornée"""
+
+    def test_normaliser(self):
+        """Test de la normalisation : casse, accents et ponctuation ignorés"""
+        self.assertEqual(normaliser("  Où est   la GARE ?! "), "ou est la gare")
+
+    def test_distance_bornee(self):
+        """Test de la distance en mots ou en caractères, interrompue au-delà de la borne"""
+        self.assertEqual(distance_mots(("ou", "est", "la", "gare"), ("ou", "est", "gare"), 2), 1)
+        self.assertEqual(distance_mots("bonjour", "bonjoru", 2), 2)
+        self.assertEqual(distance_mots(("a", "b", "c", "d"), ("a",), 1), 2)
+
+class TestMemoireTraduction(unittest.TestCase):
+    """Tests unitaires des recherches exacte et approchée de la mémoire"""
+
+    def setUp(self):
+        self.memoire = MemoireTraduction(distance_max=1)
+        for paire in PAIRES:
+            self.memoire.ajouter(*paire, origine="test")
+
+    def sources(self, resultats):
+        return [(r["entree"]["source_text"], r["distance"]) for r in resultats]
+
+    def test_exact_match(self):
+        """Test de la recherche exacte après normalisation, filtrée par langue source"""
+        self.assertEqual([e["target_text"] for e in self.memoire.rechercher_exact("ou est la gare", "fr")],
+                         ["فين كاينة لاكار؟"])
+        self.assertEqual(self.memoire.rechercher_exact("ou est la gare", "en"), [])
+        self.assertEqual(self.memoire.rechercher("OÙ EST LA GARE", "fr")[0]["distance"], 0)
+        self.assertEqual(self.memoire.rechercher_exact("Merci", "fr")[0]["origine"], "test")
+
+    def test_single_word_character_level(self):
+        """Test d'un texte d'un seul mot : distance comptée en caractères"""
+        self.assertEqual(self.sources(self.memoire.rechercher("Bonjor", "fr")), [("Bonjour", 1)])
+        self.assertEqual(self.sources(self.memoire.rechercher("Bonjourr", "fr")), [("Bonjour", 1)])
+        self.assertEqual(self.sources(self.memoire.rechercher("Bonsoir", "fr")), [])
+        # Deux mots d'une lettre différents ne sont pas confondus par une variante vide
+        self.memoire.ajouter("fr", "dr", "a", "x")
+        self.assertEqual(self.sources(self.memoire.rechercher("b", "fr")), [])
+
+    def test_multi_word_deletion_neighbourhood(self):
+        """Test de plusieurs mots : un mot ajouté, retiré ou remplacé"""
+        self.assertEqual(self.sources(self.memoire.rechercher("Où est la gare routière ?", "fr")),
+                         [("Où est la gare ?", 1)])
+        self.assertEqual(self.sources(self.memoire.rechercher("Où est gare", "fr")), [("Où est la gare ?", 1)])
+        self.assertEqual(self.sources(self.memoire.rechercher("Où est la plage ?", "fr")), [("Où est la gare ?", 1)])
+        self.assertEqual(self.sources(self.memoire.rechercher("Tu connais un bon restaurant italien ?", "fr")),
+                         [("Tu connais un bon restaurant marocain ?", 1)])
+        # Même phrase dans une autre langue source : ignorée
+        self.assertEqual(self.memoire.rechercher("Where is the station", "fr"), [])
+
+    def test_threshold(self):
+        """Test du seuil : au-delà de distance_max, rien n'est retourné ; le seuil est borné par l'index"""
+        self.assertEqual(self.memoire.rechercher("Où est donc la grande gare ?", "fr"), [])
+        self.assertEqual(self.memoire.rechercher("Où est la plage ?", "fr", distance_max=0), [])
+        # Un seuil plus grand que celui de l'index est ramené à distance_max
+        self.assertEqual(self.memoire.rechercher("Où est donc la grande gare ?", "fr", distance_max=3), [])
+
+        memoire = MemoireTraduction(distance_max=2)
+        for paire in PAIRES:
+            memoire.ajouter(*paire)
+        self.assertEqual(self.sources(memoire.rechercher("Où est donc la grande gare ?", "fr")),
+                         [("Où est la gare ?", 2)])
+        self.assertEqual(self.sources(memoire.rechercher("Bnjor", "fr")), [("Bonjour", 2)])
+        self.assertEqual(memoire.rechercher("Où est donc la grande gare ?", "fr", distance_max=1), [])
+
+    def test_results_sorted_and_limited(self):
+        """Test du tri par distance puis par texte, et de la limite"""
+        for phrase in ["Merci bien", "Merci beaucoup", "Mercii"]:
+            self.memoire.ajouter("fr", "dr", phrase, "شكرا")
+        resultats = self.memoire.rechercher("Merci", "fr", limite=10)
+        self.assertEqual([(r["entree"]["source_text"], r["distance"]) for r in resultats][:2],
+                         [("Merci", 0), ("Merci", 0)])
+        self.assertEqual([r["distance"] for r in resultats], sorted(r["distance"] for r in resultats))
+        self.assertEqual(len(self.memoire.rechercher("Merci", "fr", limite=1)), 1)
+
+class TestReprisesMemoire(unittest.TestCase):
+    """Tests de la consultation de la mémoire par le scraper et du marquage des reprises"""
+
+    def setUp(self):
+        self.dossier = tempfile.TemporaryDirectory()
+        self.fichier_jsonl = os.path.join(self.dossier.name, "translations.jsonl")
+        self.memoire = MemoireTraduction(distance_max=1)
+        for paire in PAIRES:
+            self.memoire.ajouter(*paire)
+
+    def tearDown(self):
+        self.dossier.cleanup()
+
+    def test_consulter_memoire(self):
+        """Test de la consultation : reprise si exacte, paires proches signalées sinon"""
+        self.assertEqual(consulter_memoire(self.memoire, "où est la gare", "fr"), ("فين كاينة لاكار؟", []))
+        traduction, proches = consulter_memoire(self.memoire, "Où est la plage ?", "fr")
+        self.assertIsNone(traduction)
+        self.assertEqual([r["entree"]["source_text"] for r in proches], ["Où est la gare ?"])
+        # Seules les traductions vers la darija sont reprises
+        self.assertEqual(consulter_memoire(self.memoire, "Thank you", "en"), (None, []))
+
+    def test_hits_marked_as_memory(self):
+        """Test du marquage des reprises (origine 'memoire'), ignorées au rechargement de la mémoire"""
+        stockage = StockageTraductions(self.fichier_jsonl)
+        traduction, _ = consulter_memoire(self.memoire, "OÙ EST LA GARE", "fr")
+        sauvegarder_traduction(stockage, "OÙ EST LA GARE", traduction, "fr", origine="memoire")
+        sauvegarder_traduction(stockage, "Bonne nuit", "تصبح على خير", "fr")
+        with open(self.fichier_jsonl, "r", encoding="utf-8") as f:
+            lignes = [json.loads(ligne) for ligne in f]
+        self.assertEqual([l.get("origine") for l in lignes], ["memoire", None])
+
+        memoire = MemoireTraduction()
+        self.assertEqual(memoire.charger_fichier(self.fichier_jsonl), 1)
+        self.assertEqual(memoire.entrees[0]["source_text"], "Bonne nuit")
+        self.assertEqual(memoire.entrees[0]["target_lang"], "dr")
+        self.assertEqual(memoire.entrees[0]["origine"], "translations.jsonl")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Instrumentation partagée avec l'API (source/api/metrics.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../api'))
+from metrics import MetricsRegistry, Histogram, Tracer, log_buckets, registry
+
+class TestMetrics(unittest.TestCase):
+    """Tests unitaires de l'instrumentation utilisée par DarijaPipeline.execute_module"""
+
+    def setUp(self):
+        """Configuration initiale pour chaque test"""
+        self.registry = MetricsRegistry()
+
+    def test_log_buckets(self):
+        """Test des bornes logarithmiques des histogrammes"""
+        buckets = log_buckets(1e-3, 1.0, per_doubling=2)
+        self.assertEqual(buckets[0], 1e-3)
+        self.assertGreaterEqual(buckets[-1], 1.0)
+        self.assertEqual(list(buckets), sorted(buckets))
+
+    def test_histogram_quantile(self):
+        """Test de l'estimation des quantiles : erreur relative bornée par l'intervalle"""
+        histogram = Histogram()
+        for i in range(1, 101):
+            histogram.observe(i / 1000)
+        self.assertEqual(histogram.count, 100)
+        self.assertAlmostEqual(histogram.quantile(0.5), 0.05, delta=0.05 * 0.2)
+        self.assertAlmostEqual(histogram.quantile(0.99), 0.099, delta=0.099 * 0.2)
+        self.assertIsNone(Histogram().quantile(0.5))
+
+    def test_timer_counts_errors(self):
+        """Test du chronomètre : durée enregistrée et erreur comptée puis propagée"""
+        with self.registry.timer('pipeline_module_duration_seconds', module='statistiques'):
+            pass
+        with self.assertRaises(RuntimeError):
+            with self.registry.timer('pipeline_module_duration_seconds', module='téléchargement'):
+                raise RuntimeError("échec")
+
+        summary = self.registry.summary('pipeline_module_duration_seconds')
+        self.assertEqual(summary[(('module', 'statistiques'),)]['count'], 1)
+        self.assertIn('pipeline_module_errors_total{module="téléchargement"} 1', self.registry.render_prometheus())
+
+    def test_render_prometheus(self):
+        """Test du format texte Prometheus"""
+        self.registry.describe('http_requests_total', "Requêtes HTTP")
+        self.registry.increment('http_requests_total', route='/lookup', status='200')
+        self.registry.increment('http_requests_total', route='/lookup', status='200')
+        self.registry.observe('stage_duration_seconds', 0.002, stage='cache')
+        self.registry.add_collector('response_cache', lambda: {'hits': 3, 'hit_ratio': 0.5},
+                                    help_texts={'hits': "Succès", 'hit_ratio': "Taux de succès"}, counters=('hits',))
+
+        text = self.registry.render_prometheus()
+        self.assertIn('# HELP http_requests_total Requêtes HTTP', text)
+        self.assertIn('# TYPE http_requests_total counter', text)
+        self.assertIn('http_requests_total{route="/lookup",status="200"} 2', text)
+        self.assertIn('# TYPE stage_duration_seconds histogram', text)
+        self.assertIn('stage_duration_seconds_bucket{stage="cache",le="+Inf"} 1', text)
+        self.assertIn('stage_duration_seconds_count{stage="cache"} 1', text)
+        self.assertIn('response_cache_hits 3', text)
+        # Compteurs et jauges des collecteurs, chacun décrit
+        self.assertIn('# HELP response_cache_hits Succès\n# TYPE response_cache_hits counter\n', text)
+        self.assertIn('# HELP response_cache_hit_ratio Taux de succès\n# TYPE response_cache_hit_ratio gauge\n', text)
+
+    def test_every_series_described(self):
+        """Test des descriptions : chaque série produite par le service a sa ligne HELP"""
+        # Descriptions du registre partagé par le service et le pipeline
+        self.registry._help.update(registry._help)
+        self.registry.observe('http_request_duration_seconds', 0.01, route='/lookup')
+        self.registry.increment('micro_batches_total')
+        with self.assertRaises(RuntimeError):
+            with self.registry.timer('stage_duration_seconds', stage='llm'):
+                raise RuntimeError("échec")
+        self.registry.increment('micro_batch_phrases_total', 3)
+        lines = self.registry.render_prometheus().splitlines()
+        for line in lines:
+            if line.startswith('# TYPE'):
+                name = line.split()[2]
+                self.assertIn(f"# HELP {name}", "\n".join(lines), name)
+
+    def test_write_textfile_and_trace(self):
+        """Test de l'écriture du fichier de métriques et des traces échantillonnées"""
+        with tempfile.TemporaryDirectory() as tmp:
+            metrics_file = Path(tmp) / "pipeline.prom"
+            trace_file = Path(tmp) / "traces.jsonl"
+            tracer = Tracer(sample_rate=1.0, path=str(trace_file))
+            with tracer.trace('/translate/batch'):
+                with self.registry.timer('stage_duration_seconds', stage='llm'):
+                    pass
+            self.registry.write_textfile(metrics_file)
+
+            self.assertIn('stage_duration_seconds_count{stage="llm"} 1', metrics_file.read_text(encoding='utf-8'))
+            self.assertIn('"stage": "llm"', trace_file.read_text(encoding='utf-8'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+import os
+import sys
+from datetime import datetime
+
+# Pagination par curseur (source/database/repository.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../database'))
+from repository import encode_cursor, decode_cursor, InvalidCursorError
+
+class TestCursor(unittest.TestCase):
+    """Tests unitaires du curseur de pagination (keyset)"""
+
+    def test_round_trip(self):
+        """Test de l'encodage puis du décodage de la position (created_at, id, source_lang, target_lang)"""
+        created_at = datetime(2024, 2, 19, 10, 30, 5, 123456)
+        cursor = encode_cursor(created_at, "pair_inverse_42", "dr", "fr")
+        self.assertEqual(decode_cursor(cursor), (created_at, "pair_inverse_42", "dr", "fr"))
+        # Utilisable tel quel dans une URL
+        self.assertNotIn("=", cursor)
+        self.assertRegex(cursor, r"^[A-Za-z0-9_-]+$")
+
+    def test_invalid_cursor(self):
+        """Test des curseurs illisibles ou altérés"""
+        valid = encode_cursor(datetime(2024, 2, 19), "pair_1", "fr", "dr")
+        for cursor in ["", "pas un curseur", valid[:-3], "W10", "WzFd", "é",
+                       # Ancien format (created_at, id), sans la direction
+                       "WyIyMDI0LTAyLTE5VDAwOjAwOjAwIiwicGFpcl8xIl0"]:
+            with self.assertRaises(InvalidCursorError, msg=cursor):
+                decode_cursor(cursor)
+
+if __name__ == '__main__':
+    unittest.main()
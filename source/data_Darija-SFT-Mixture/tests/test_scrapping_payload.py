@@ -0,0 +1,82 @@
+import unittest
+import os
+import sys
+import json
+from types import SimpleNamespace
+from unittest import mock
+
+# Lecture des réponses de l'API du traducteur (source/traductordarija_scrapping/scrapping.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../traductordarija_scrapping'))
+from scrapping import extraire_traduction_payload, est_reponse_traduction, lire_traduction_reponse, identifiants_connexion
+
+# Réponses de l'API, sous les différentes formes rencontrées
+PAYLOAD_SIMPLE = {"translation": "فين كاينة لاكار؟", "source": "Où est la gare ?"}
+PAYLOAD_IMBRIQUE = {"status": "ok", "data": {"result": {"lang": "ary", "text": "شحال هادي؟"}}}
+PAYLOAD_LISTE = {"choices": [{"text": "Combien ça coûte ?"}, {"text": "بشحال هادا؟"}]}
+PAYLOAD_PRIORITE = {"meta": {"note": "ملاحظة"}, "result": "الترجمة"}
+PAYLOAD_SANS_ARABE = {"translation": "Fin kayna lagar ?", "detected": "fr"}
+
+def reponse(url="https://www.learnmoroccan.com/api/translate", resource_type="fetch", ok=True,
+            status=200, corps=None):
+    """Réponse Playwright simulée : JSON si possible, texte brut sinon"""
+    def lire_json():
+        return json.loads(corps)
+    return SimpleNamespace(url=url, ok=ok, status=status, request=SimpleNamespace(resource_type=resource_type),
+                           json=lire_json, text=lambda: corps)
+
+class TestExtraireTraductionPayload(unittest.TestCase):
+    """Tests unitaires de la recherche de la traduction dans les réponses de l'API"""
+
+    def test_payload_shapes(self):
+        """Test des formes de réponse : clé directe, objets imbriqués, liste de candidats, texte brut"""
+        self.assertEqual(extraire_traduction_payload(PAYLOAD_SIMPLE, "Où est la gare ?"), "فين كاينة لاكار؟")
+        self.assertEqual(extraire_traduction_payload(PAYLOAD_IMBRIQUE), "شحال هادي؟")
+        self.assertEqual(extraire_traduction_payload(PAYLOAD_LISTE), "بشحال هادا؟")
+        self.assertEqual(extraire_traduction_payload("  سلام  "), "سلام")
+
+    def test_preferred_keys_first(self):
+        """Test de l'ordre : les clés de CLES_TRADUCTION passent avant les autres valeurs"""
+        self.assertEqual(extraire_traduction_payload(PAYLOAD_PRIORITE), "الترجمة")
+
+    def test_no_translation(self):
+        """Test des réponses sans traduction : pas d'arabe, phrase source renvoyée, valeurs non textuelles"""
+        self.assertIsNone(extraire_traduction_payload(PAYLOAD_SANS_ARABE))
+        self.assertIsNone(extraire_traduction_payload({"translation": "سلام"}, phrase="سلام"))
+        self.assertIsNone(extraire_traduction_payload({"count": 3, "ok": True, "items": [], "text": None}))
+        self.assertIsNone(extraire_traduction_payload(""))
+
+class TestReponseTraduction(unittest.TestCase):
+    """Tests unitaires de la sélection et de la lecture des réponses interceptées"""
+
+    def test_est_reponse_traduction(self):
+        """Test du filtre : appel xhr/fetch dont l'URL contient le motif, quelle que soit la casse"""
+        self.assertTrue(est_reponse_traduction(reponse()))
+        self.assertTrue(est_reponse_traduction(reponse(url="https://api.example.com/v1/Translate", resource_type="xhr")))
+        self.assertFalse(est_reponse_traduction(reponse(resource_type="script")))
+        self.assertFalse(est_reponse_traduction(reponse(url="https://www.learnmoroccan.com/api/session")))
+        self.assertTrue(est_reponse_traduction(reponse(url="https://x/api/convert"), motif_url="convert"))
+
+    def test_lire_traduction_reponse(self):
+        """Test de la lecture : JSON, texte brut à défaut, rien si la réponse est en erreur"""
+        self.assertEqual(lire_traduction_reponse(reponse(corps=json.dumps(PAYLOAD_IMBRIQUE))), "شحال هادي؟")
+        self.assertEqual(lire_traduction_reponse(reponse(corps="كيداير؟")), "كيداير؟")
+        self.assertIsNone(lire_traduction_reponse(
+            reponse(ok=False, status=502, corps=json.dumps(PAYLOAD_SIMPLE)), "Où est la gare ?"))
+
+class TestIdentifiantsConnexion(unittest.TestCase):
+    """Tests unitaires de la lecture des identifiants du compte dans l'environnement"""
+
+    def test_read_from_environment(self):
+        """Test de la lecture de SCRAPER_EMAIL et SCRAPER_MOT_DE_PASSE"""
+        with mock.patch.dict(os.environ, {"SCRAPER_EMAIL": "compte@example.com", "SCRAPER_MOT_DE_PASSE": "secret"}):
+            self.assertEqual(identifiants_connexion(), ("compte@example.com", "secret"))
+
+    def test_missing_credentials(self):
+        """Test d'une variable absente ou vide : erreur explicite, aucun identifiant par défaut"""
+        with mock.patch.dict(os.environ, {"SCRAPER_EMAIL": "compte@example.com", "SCRAPER_MOT_DE_PASSE": ""}):
+            self.assertRaises(RuntimeError, identifiants_connexion)
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertRaises(RuntimeError, identifiants_connexion)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+import threading
+
+# Stockage append-only du scraper (source/traductordarija_scrapping)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../traductordarija_scrapping'))
+from stockage_traductions import StockageTraductions
+
+def traduction(source, target="ترجمة", source_lang="fr"):
+    return {"source_lang": source_lang, "source": source, "target_lang": "darija", "target": target}
+
+class TestStockageTraductions(unittest.TestCase):
+    """Tests unitaires du stockage JSONL des traductions du scraper"""
+
+    def setUp(self):
+        """Dossier temporaire pour chaque test"""
+        self.dossier = tempfile.TemporaryDirectory()
+        self.fichier_jsonl = os.path.join(self.dossier.name, "translations.jsonl")
+
+    def tearDown(self):
+        self.dossier.cleanup()
+
+    def lignes(self):
+        with open(self.fichier_jsonl, "r", encoding="utf-8") as f:
+            return [json.loads(ligne) for ligne in f]
+
+    def test_ajouter_ignore_doublons(self):
+        """Test de l'ajout : une phrase déjà présente (même langue) n'est pas réécrite"""
+        stockage = StockageTraductions(self.fichier_jsonl)
+        self.assertTrue(stockage.ajouter(traduction("Bonjour")))
+        self.assertFalse(stockage.ajouter(traduction("Bonjour", "autre")))
+        self.assertTrue(stockage.ajouter(traduction("Bonjour", source_lang="en")))
+        self.assertIn(("Bonjour", "fr"), stockage)
+        self.assertEqual(len(self.lignes()), 2)
+
+    def test_ecritures_concurrentes(self):
+        """Test du verrou : plusieurs scrapers ajoutent les mêmes phrases sans doublon ni ligne entrelacée"""
+        phrases = [f"Phrase numéro {i}" for i in range(50)]
+
+        def scraper():
+            stockage = StockageTraductions(self.fichier_jsonl)
+            for phrase in phrases:
+                stockage.ajouter(traduction(phrase, "ت" * 200))
+
+        threads = [threading.Thread(target=scraper) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(sorted(t["source"] for t in self.lignes()), sorted(phrases))
+        self.assertEqual(len(StockageTraductions(self.fichier_jsonl)), 50)
+
+    def test_reprise_derniere_ligne_tronquee(self):
+        """Test d'une dernière ligne incomplète (écriture en cours) : relue une fois terminée"""
+        ligne = json.dumps(traduction("Merci"), ensure_ascii=False)
+        with open(self.fichier_jsonl, "w", encoding="utf-8") as f:
+            f.write(json.dumps(traduction("Bonjour"), ensure_ascii=False) + "\n")
+            f.write(ligne[:10])
+        stockage = StockageTraductions(self.fichier_jsonl)
+        self.assertEqual(len(stockage), 1)
+
+        with open(self.fichier_jsonl, "a", encoding="utf-8") as f:
+            f.write(ligne[10:] + "\n")
+        self.assertEqual(stockage.rafraichir(), 1)
+        self.assertIn(("Merci", "fr"), stockage)
+
+    def test_import_export_json(self):
+        """Test de l'import du translations.json historique et de son export"""
+        fichier_json = os.path.join(self.dossier.name, "translations.json")
+        historique = [traduction("Bonjour"), traduction("Merci"), traduction("Bonjour", "doublon")]
+        with open(fichier_json, "w", encoding="utf-8") as f:
+            json.dump({"translations": historique}, f, ensure_ascii=False)
+
+        stockage = StockageTraductions(self.fichier_jsonl, fichier_json)
+        self.assertEqual(len(stockage), 2)
+        stockage.ajouter(traduction("Au revoir"))
+        stockage.exporter_json(fichier_json)
+        with open(fichier_json, "r", encoding="utf-8") as f:
+            exporte = json.load(f)["translations"]
+        self.assertEqual(exporte, [historique[0], historique[1], traduction("Au revoir")])
+
+        # Le JSONL existe : l'historique n'est pas réimporté
+        self.assertEqual(len(StockageTraductions(self.fichier_jsonl, fichier_json)), 3)
+        self.assertEqual(len(self.lignes()), 3)
+
+if __name__ == '__main__':
+    unittest.main()
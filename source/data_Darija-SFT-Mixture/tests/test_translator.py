@@ -0,0 +1,118 @@
+import unittest
+import os
+import sys
+import asyncio
+from types import SimpleNamespace
+
+# Traduction par lots de l'API (source/api/translator.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../api'))
+from cache import ResponseCache, make_key
+from index_phrases import PhraseIndex
+from translator import BatchTranslator, MicroBatcher
+
+class FakeLLM:
+    """LLM de test : traduit en majuscules, ou échoue, en gardant les lots reçus"""
+
+    def __init__(self, error=None, before=None):
+        self.error = error
+        self.before = before
+        self.calls = []
+
+    async def translate(self, items, source_lang, target_lang):
+        self.calls.append([item["text"] for item in items])
+        if self.before:
+            self.before()
+        if self.error:
+            raise self.error
+        return [item["text"].upper() for item in items]
+
+class TestBatchTranslator(unittest.TestCase):
+    """Tests unitaires de BatchTranslator (index en mémoire, cache et LLM)"""
+
+    def setUp(self):
+        self.cache = ResponseCache()
+        index = PhraseIndex([{"source_lang": "fr", "target_lang": "dr",
+                              "source_text": "Bonjour", "target_text": "Salam"}])
+        self.index_manager = SimpleNamespace(index=index)
+
+    def translate(self, llm, phrases):
+        translator = BatchTranslator(self.index_manager, self.cache, llm=llm)
+        return asyncio.run(translator.translate_batch(phrases, "fr", "dr"))
+
+    def test_duplicates_resolved_once(self):
+        """Test des phrases identiques après normalisation : une seule traduction par le LLM"""
+        llm = FakeLLM()
+        results = self.translate(llm, ["Merci", "merci !", "Bonjour", "MERCI", "Au revoir"])
+        self.assertEqual(llm.calls, [["Merci", "Au revoir"]])
+        self.assertEqual([r["origin"] for r in results], ["llm", "llm", "index", "llm", "llm"])
+        self.assertEqual([r["translation"] for r in results], ["MERCI", "MERCI", "Salam", "MERCI", "AU REVOIR"])
+        # Chaque résultat garde la phrase reçue
+        self.assertEqual(results[1]["phrase"], "merci !")
+        # Deuxième passage : servi par le cache
+        results = self.translate(llm, ["Merci"])
+        self.assertEqual(results[0]["origin"], "cache")
+        self.assertEqual(len(llm.calls), 1)
+
+    def test_llm_error_keeps_partial_results(self):
+        """Test d'une erreur du LLM : les phrases déjà résolues sont retournées"""
+        llm = FakeLLM(error=RuntimeError("quota dépassé"))
+        results = self.translate(llm, ["Bonjour", "Merci"])
+        self.assertEqual(results[0], {"phrase": "Bonjour", "translation": "Salam", "origin": "index"})
+        self.assertEqual(results[1], {"phrase": "Merci", "translation": None, "origin": None})
+        self.assertEqual(self.cache.get(make_key("Merci", "fr", "dr", kind="translate")), (False, None))
+
+    def test_clear_during_batch(self):
+        """Test de clear() (rechargement de l'index) pendant l'appel au LLM : rien n'est mis en cache"""
+        llm = FakeLLM(before=self.cache.clear)
+        results = self.translate(llm, ["Bonjour", "Merci"])
+        self.assertEqual([r["translation"] for r in results], ["Salam", "MERCI"])
+        self.assertEqual(len(self.cache), 0)
+
+class TestMicroBatcher(unittest.TestCase):
+    """Tests unitaires du regroupement des requêtes unitaires concurrentes"""
+
+    def setUp(self):
+        self.batches = []
+
+    async def handler(self, phrases, source_lang, target_lang):
+        self.batches.append((list(phrases), source_lang, target_lang))
+        return [f"{p}-{target_lang}" for p in phrases]
+
+    def test_flush_on_size(self):
+        """Test de l'envoi d'un lot plein sans attendre la fin de la fenêtre"""
+        batcher = MicroBatcher(self.handler, window=60, max_batch=3)
+
+        async def scenario():
+            return await asyncio.wait_for(asyncio.gather(
+                *(batcher.submit(p, "fr", "dr") for p in ["a", "b", "c"])), timeout=5)
+
+        self.assertEqual(asyncio.run(scenario()), ["a-dr", "b-dr", "c-dr"])
+        self.assertEqual(self.batches, [(["a", "b", "c"], "fr", "dr")])
+
+    def test_flush_on_timeout(self):
+        """Test de l'envoi à la fin de la fenêtre, un lot par direction"""
+        batcher = MicroBatcher(self.handler, window=0.01, max_batch=64)
+
+        async def scenario():
+            return await asyncio.gather(
+                batcher.submit("a", "fr", "dr"), batcher.submit("b", "fr", "en"), batcher.submit("c", "fr", "dr"))
+
+        self.assertEqual(asyncio.run(scenario()), ["a-dr", "b-en", "c-dr"])
+        self.assertEqual(sorted(self.batches), [(["a", "c"], "fr", "dr"), (["b"], "fr", "en")])
+        self.assertEqual(batcher.batches, 2)
+
+    def test_handler_error(self):
+        """Test d'une erreur du traitement : propagée à toutes les requêtes du lot"""
+        async def handler(phrases, source_lang, target_lang):
+            raise RuntimeError("échec")
+
+        batcher = MicroBatcher(handler, window=0.01)
+
+        async def scenario():
+            return await asyncio.gather(
+                batcher.submit("a", "fr", "dr"), batcher.submit("b", "fr", "dr"), return_exceptions=True)
+
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in asyncio.run(scenario())))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,221 @@
+import os
+import sys
+import json
+import sqlite3
+import hashlib
+from datetime import datetime
+from dotenv import load_dotenv
+
+# Même normalisation que la mémoire de traduction (agregation/memoire_traduction.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../agregation'))
+from memoire_traduction import normaliser
+
+# Fichier source par défaut, comme pour la migration PostgreSQL
+TRANSLATIONS_FILE = 'data/translations_with_tags.json'
+SNAPSHOT_DIR = 'data/snapshots'
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE translations (
+    id INTEGER PRIMARY KEY,
+    source_lang TEXT NOT NULL,
+    target_lang TEXT NOT NULL,
+    source_text TEXT NOT NULL,
+    target_text TEXT NOT NULL,
+    context TEXT,
+    normalized_key TEXT NOT NULL
+);
+CREATE TABLE translation_tags (
+    tag TEXT NOT NULL,
+    translation_id INTEGER NOT NULL REFERENCES translations(id),
+    PRIMARY KEY (tag, translation_id)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE translations_fts USING fts5(
+    source_text, target_text,
+    content='translations', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+# Index créés après le chargement, plus rapide qu'une mise à jour ligne par ligne
+INDEXES = """
+CREATE INDEX ix_translations_normalized_key ON translations (source_lang, normalized_key, target_lang);
+CREATE INDEX ix_translations_direction ON translations (source_lang, target_lang);
+"""
+
+
+def load_from_json(filepath=TRANSLATIONS_FILE):
+    """Charge les traductions depuis translations_with_tags.json."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_from_database():
+    """Charge les traductions depuis la table translations (DATABASE_URL)."""
+    from sqlalchemy import select
+    from models import Translation, session_scope
+
+    with session_scope() as session:
+        rows = session.execute(select(
+            Translation.source_lang, Translation.target_lang, Translation.source_text,
+            Translation.target_text, Translation.tags, Translation.context
+        ).execution_options(yield_per=10000))
+        return [row._asdict() for row in rows]
+
+
+def _canonical_rows(translations):
+    """Traductions réduites aux champs exportés, dédoublonnées et triées (ordre stable)."""
+    rows = {}
+    for t in translations:
+        key = (t['source_lang'], t['target_lang'], t['source_text'], t['target_text'])
+        rows.setdefault(key, {
+            'source_lang': t['source_lang'],
+            'target_lang': t['target_lang'],
+            'source_text': t['source_text'],
+            'target_text': t['target_text'],
+            'context': t.get('context') or '',
+            'tags': sorted(set(t.get('tags') or [])),
+        })
+    return [rows[key] for key in sorted(rows)]
+
+
+def snapshot_hash(rows):
+    """Empreinte sha256 du contenu exporté : deux exports identiques ont la même version."""
+    digest = hashlib.sha256(f"schema={SCHEMA_VERSION}\n".encode('utf-8'))
+    for row in rows:
+        digest.update(json.dumps(row, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def build_snapshot(translations, output_dir=SNAPSHOT_DIR):
+    """
+    Construit un fichier SQLite en lecture seule à partir d'une liste de traductions.
+
+    Le fichier est nommé d'après l'empreinte du contenu (translations_<empreinte>.sqlite) :
+    s'il existe déjà, il n'est pas reconstruit. La construction se fait en une seule
+    transaction dans un fichier temporaire, renommé une fois terminé.
+
+    Retourne : le chemin du fichier SQLite
+    """
+    rows = _canonical_rows(translations)
+    content_hash = snapshot_hash(rows)
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"translations_{content_hash[:16]}.sqlite")
+    if os.path.exists(path):
+        print(f"Snapshot déjà à jour: {path}")
+        return path
+
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path, isolation_level=None)
+    try:
+        # Fichier jetable jusqu'au renommage : pas de journal ni de synchronisation
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA page_size = 4096")
+        conn.execute("BEGIN")
+        for statement in SCHEMA.split(';'):
+            if statement.strip():
+                conn.execute(statement)
+
+        conn.executemany("""
+            INSERT INTO translations (id, source_lang, target_lang, source_text, target_text, context, normalized_key)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (
+            (i, r['source_lang'], r['target_lang'], r['source_text'], r['target_text'], r['context'],
+             normaliser(r['source_text']))
+            for i, r in enumerate(rows, start=1)
+        ))
+        conn.executemany(
+            "INSERT INTO translation_tags (tag, translation_id) VALUES (?, ?)",
+            ((tag, i) for i, r in enumerate(rows, start=1) for tag in r['tags'])
+        )
+        conn.execute("INSERT INTO translations_fts (translations_fts) VALUES ('rebuild')")
+        conn.execute("INSERT INTO translations_fts (translations_fts) VALUES ('optimize')")
+        for statement in INDEXES.split(';'):
+            if statement.strip():
+                conn.execute(statement)
+        conn.executemany("INSERT INTO metadata (key, value) VALUES (?, ?)", [
+            ('content_hash', content_hash),
+            ('schema_version', str(SCHEMA_VERSION)),
+            ('translation_count', str(len(rows))),
+            ('created_at', datetime.utcnow().isoformat(timespec='seconds')),
+        ])
+        conn.execute("COMMIT")
+        conn.execute("ANALYZE")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, path)
+    print(f"Snapshot créé: {path} ({len(rows)} traductions)")
+    return path
+
+
+def open_snapshot(path):
+    """Ouvre un snapshot en lecture seule."""
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+
+def lookup(conn, text, source_lang, target_lang=None, limit=5):
+    """
+    Recherche une phrase dans un snapshot : correspondance exacte sur le texte normalisé
+    (index normalized_key), sinon recherche plein texte FTS5 classée par bm25.
+
+    Retourne : liste de dictionnaires {source_text, target_text, target_lang, context}
+    """
+    key = normaliser(text)
+    query = """
+        SELECT source_text, target_text, target_lang, context FROM translations
+        WHERE source_lang = ? AND normalized_key = ?
+    """
+    params = [source_lang, key]
+    if target_lang:
+        query += " AND target_lang = ?"
+        params.append(target_lang)
+    rows = conn.execute(query + " LIMIT ?", params + [limit]).fetchall()
+
+    if not rows and key:
+        # Chaque mot est cité pour neutraliser la syntaxe FTS5 de la saisie
+        match = " ".join(f'"{word}"' for word in key.split())
+        query = """
+            SELECT t.source_text, t.target_text, t.target_lang, t.context
+            FROM translations_fts f JOIN translations t ON t.id = f.rowid
+            WHERE translations_fts MATCH ? AND t.source_lang = ?
+        """
+        params = [f"source_text : ({match})", source_lang]
+        if target_lang:
+            query += " AND t.target_lang = ?"
+            params.append(target_lang)
+        rows = conn.execute(query + " ORDER BY bm25(translations_fts) LIMIT ?", params + [limit]).fetchall()
+
+    return [
+        {'source_text': s, 'target_text': t, 'target_lang': lang, 'context': context}
+        for s, t, lang, context in rows
+    ]
+
+
+def find_by_tag(conn, tag, limit=100):
+    """Retourne les traductions portant un tag (index translation_tags)."""
+    rows = conn.execute("""
+        SELECT t.source_lang, t.target_lang, t.source_text, t.target_text
+        FROM translation_tags g JOIN translations t ON t.id = g.translation_id
+        WHERE g.tag = ? LIMIT ?
+    """, (tag, limit)).fetchall()
+    return [dict(zip(('source_lang', 'target_lang', 'source_text', 'target_text'), r)) for r in rows]
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    # EXPORT_SOURCE : json (défaut, translations_with_tags.json) ou db (table translations)
+    if os.getenv('EXPORT_SOURCE', 'json') == 'db':
+        translations = load_from_database()
+    else:
+        translations = load_from_json(os.getenv('EXPORT_TRANSLATIONS_FILE', TRANSLATIONS_FILE))
+    build_snapshot(translations, os.getenv('EXPORT_SNAPSHOT_DIR', SNAPSHOT_DIR))
@@ -0,0 +1,171 @@
+'''Export en flux du corpus de traductions (NDJSON ou Parquet), compressé à la volée.
+
+Les lignes sont lues par un curseur côté serveur (stream_results) et écrites lot par lot :
+la mémoire utilisée ne dépend pas de la taille du corpus et les premiers octets partent
+dès le premier lot. Utilisé par le endpoint GET /export de l'API et en ligne de commande.'''
+
+import os
+import sys
+import json
+import zlib
+from datetime import datetime
+from dotenv import load_dotenv
+from sqlalchemy import select
+
+from models import Translation, get_engine
+from search import filter_by_tags
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Dépendance optionnelle : export NDJSON uniquement
+    pa = None
+
+EXPORT_COLUMNS = ('id', 'source_lang', 'target_lang', 'source_text', 'target_text',
+                  'tags', 'context', 'created_at', 'updated_at')
+BATCH_SIZE = 1000
+FORMATS = ('ndjson', 'parquet')
+
+
+def export_statement(source_lang=None, target_lang=None, all_tags=None, any_tags=None, updated_since=None):
+    """Requête d'export : colonnes brutes (pas d'objets ORM), triées par (created_at, id)"""
+    statement = select(*(getattr(Translation, c) for c in EXPORT_COLUMNS))
+    statement = filter_by_tags(statement, all_tags, any_tags, source_lang, target_lang)
+    if updated_since is not None:
+        statement = statement.where(Translation.updated_at >= updated_since)
+    return statement.order_by(Translation.created_at, Translation.id)
+
+
+def iter_batches(batch_size=BATCH_SIZE, engine=None, **filters):
+    """
+    Produit les traductions par lots de dictionnaires, lues par un curseur côté serveur.
+    La connexion reste ouverte tant que le générateur n'est pas épuisé ou fermé.
+    """
+    engine = engine or get_engine()
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, max_row_buffer=batch_size).execute(
+            export_statement(**filters)
+        )
+        for rows in result.mappings().partitions(batch_size):
+            yield [dict(row) for row in rows]
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Type non sérialisable: {type(value).__name__}")
+
+
+def ndjson_chunks(batches):
+    """Un bloc d'octets NDJSON (une traduction par ligne) par lot"""
+    for batch in batches:
+        yield ''.join(
+            json.dumps(row, ensure_ascii=False, default=_json_default) + '\n' for row in batch
+        ).encode('utf-8')
+
+
+class _ParquetSink:
+    """Fichier en écriture seule dont le contenu est récupéré au fur et à mesure"""
+
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def parquet_chunks(batches):
+    """Un groupe de lignes (row group) Parquet par lot ; le pied de fichier est écrit à la fin"""
+    if pa is None:
+        raise ImportError("pyarrow n'est pas installé (pip install pyarrow), export Parquet indisponible")
+    schema = pa.schema([
+        ('id', pa.string()), ('source_lang', pa.string()), ('target_lang', pa.string()),
+        ('source_text', pa.string()), ('target_text', pa.string()), ('tags', pa.list_(pa.string())),
+        ('context', pa.string()), ('created_at', pa.timestamp('us')), ('updated_at', pa.timestamp('us')),
+    ])
+    sink = _ParquetSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema, compression='zstd')
+    for batch in batches:
+        writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+        data = sink.take()
+        if data:
+            yield data
+    writer.close()
+    yield sink.take()
+
+
+def gzip_chunks(chunks, level=6):
+    """Compression gzip à la volée : chaque bloc compressé est envoyé dès qu'il est prêt"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(format='ndjson', gzip=False, batch_size=BATCH_SIZE, engine=None, **filters):
+    """
+    Générateur d'octets de l'export complet.
+
+    Paramètres :
+        - format : ndjson ou parquet (pyarrow requis ; déjà compressé, gzip ignoré)
+        - gzip : compresse le flux NDJSON
+        - filters : source_lang, target_lang, all_tags, any_tags, updated_since (datetime)
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Format d'export inconnu: {format} (attendu: {', '.join(FORMATS)})")
+    batches = iter_batches(batch_size, engine, **filters)
+    if format == 'parquet':
+        return parquet_chunks(batches)
+    chunks = ndjson_chunks(batches)
+    return gzip_chunks(chunks) if gzip else chunks
+
+
+def _env_list(name):
+    value = os.getenv(name)
+    return [v.strip() for v in value.split(',') if v.strip()] if value else None
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    # EXPORT_FORMAT : ndjson (défaut) ou parquet ; EXPORT_OUTPUT : fichier, sortie standard si absent
+    # Filtres : EXPORT_SOURCE_LANG, EXPORT_TARGET_LANG, EXPORT_ALL_TAGS / EXPORT_ANY_TAGS (a,b,c),
+    # EXPORT_UPDATED_SINCE (date ISO)
+    output = os.getenv('EXPORT_OUTPUT')
+    export_format = os.getenv('EXPORT_FORMAT', 'ndjson')
+    updated_since = os.getenv('EXPORT_UPDATED_SINCE')
+    chunks = stream_export(
+        format=export_format,
+        gzip=os.getenv('EXPORT_GZIP', '1' if output and output.endswith('.gz') else '0') == '1',
+        batch_size=int(os.getenv('EXPORT_BATCH_SIZE', str(BATCH_SIZE))),
+        source_lang=os.getenv('EXPORT_SOURCE_LANG'),
+        target_lang=os.getenv('EXPORT_TARGET_LANG'),
+        all_tags=_env_list('EXPORT_ALL_TAGS'),
+        any_tags=_env_list('EXPORT_ANY_TAGS'),
+        updated_since=datetime.fromisoformat(updated_since) if updated_since else None,
+    )
+    out = open(output, 'wb') if output else sys.stdout.buffer
+    written = 0
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        if output:
+            out.close()
+    if output:
+        print(f"Export terminé: {written} octets écrits dans {output}", file=sys.stderr)
@@ -1,12 +1,60 @@
 import os
+import io
+import csv
 import json
-import psycopg2
+import hashlib
+from datetime import datetime
+from psycopg2.extras import execute_values
 from dotenv import load_dotenv
+from sqlalchemy.engine import URL
 from tqdm import tqdm
+from models import init_db, get_engine, pair_hash, dedup_key, DEDUP_KEY
+from partitions import ensure_partitions
+
+# Fichier source des traductions enrichies
+TRANSLATIONS_FILE = 'data/translations_with_tags.json'
+
+
+def hash_id(source_text, target_text):
+    """Identifiant dérivé de l'empreinte de la paire, stable quel que soit l'ordre du fichier"""
+    return f"pair_{pair_hash(source_text, target_text).hex()[:16]}"
+
+
+def translation_id(translation):
+    """
+    Identifiant de la traduction (pair_XXXX dans translations_with_tags.json), ou dérivé
+    de l'empreinte de la paire s'il est absent.
+    """
+    return translation.get('id') or hash_id(translation['source_text'], translation['target_text'])
+
+
+def translation_row(translation, now):
+    """Valeurs d'une traduction pour les colonnes TRANSLATION_COLUMNS"""
+    return (
+        translation_id(translation),
+        translation['source_lang'],
+        translation['target_lang'],
+        translation['source_text'],
+        translation['target_text'],
+        sorted(set(translation.get('tags') or [])),
+        translation.get('context', ''),
+        now,
+        now,
+    )
+
+
+# Colonnes écrites par le migrateur dans la table translations de models.py
+TRANSLATION_COLUMNS = "id, source_lang, target_lang, source_text, target_text, tags, context, created_at, updated_at"
+# Cible des ON CONFLICT : la clé de dédoublonnage de models.py (index unique uix_translations_pair_hash)
+CONFLICT_TARGET = ", ".join(DEDUP_KEY)
+
 
 class PostgreSQLMigrator:
     """
     Classe pour migrer les données de traduction vers PostgreSQL.
+
+    Le schéma est celui de models.py (table translations partitionnée, tags en tableau,
+    compteurs tag_counts) : le migrateur le crée avec init_db() et n'y ajoute aucune table.
     """
     
     def __init__(self):
@@ -15,123 +63,65 @@ class PostgreSQLMigrator:
         self.cur = self.conn.cursor()
         
     def _connect_to_db(self):
-        """Établit la connexion à la base de données PostgreSQL."""
+        """
+        Établit la connexion à la base de données PostgreSQL, issue du pool de models.py
+        (DATABASE_URL, ou à défaut les variables POSTGRES_*).
+        """
         try:
-            conn = psycopg2.connect(
-                dbname=os.getenv('POSTGRES_DB'),
-                user=os.getenv('POSTGRES_USER'),
-                password=os.getenv('POSTGRES_PASSWORD'),
-                host=os.getenv('POSTGRES_HOST'),
-                port=os.getenv('POSTGRES_PORT')
-            )
-            return conn
+            if not os.getenv('DATABASE_URL') and os.getenv('POSTGRES_DB'):
+                os.environ['DATABASE_URL'] = URL.create(
+                    'postgresql+psycopg2',
+                    username=os.getenv('POSTGRES_USER'),
+                    password=os.getenv('POSTGRES_PASSWORD'),
+                    host=os.getenv('POSTGRES_HOST'),
+                    port=os.getenv('POSTGRES_PORT'),
+                    database=os.getenv('POSTGRES_DB'),
+                ).render_as_string(hide_password=False)
+            return get_engine().raw_connection()
         except Exception as e:
             print(f"Erreur de connexion à la base de données: {e}")
             raise
 
     def create_tables(self):
-        """Crée les tables nécessaires dans la base de données."""
+        """Crée les tables nécessaires dans la base de données (models.init_db)."""
         try:
-            # Table des traductions
-            self.cur.execute("""
-                CREATE TABLE IF NOT EXISTS translations (
-                    id SERIAL PRIMARY KEY,
-                    source_lang VARCHAR(10),
-                    target_lang VARCHAR(10),
-                    source_text TEXT,
-                    target_text TEXT,
-                    context TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Table des tags
-            self.cur.execute("""
-                CREATE TABLE IF NOT EXISTS tags (
-                    id SERIAL PRIMARY KEY,
-                    name VARCHAR(50) UNIQUE
-                )
-            """)
-            
-            # Table de liaison traductions-tags
-            self.cur.execute("""
-                CREATE TABLE IF NOT EXISTS translation_tags (
-                    translation_id INTEGER REFERENCES translations(id),
-                    tag_id INTEGER REFERENCES tags(id),
-                    PRIMARY KEY (translation_id, tag_id)
-                )
-            """)
-            
-            self.conn.commit()
+            init_db()
             print("Tables créées avec succès")
-            
         except Exception as e:
             print(f"Erreur lors de la création des tables: {e}")
-            self.conn.rollback()
             raise
 
     def load_translations(self):
         """Charge les traductions depuis le fichier JSON."""
         try:
-            with open('data/translations_with_tags.json', 'r', encoding='utf-8') as f:
+            with open(TRANSLATIONS_FILE, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except Exception as e:
             print(f"Erreur lors du chargement des traductions: {e}")
             raise
 
+    def prepare_partitions(self, translations):
+        """
+        Crée les partitions des directions présentes dans le fichier, pour que le
+        chargement n'aille pas dans les partitions par défaut.
+        """
+        pairs = {(t['source_lang'], t['target_lang']) for t in translations}
+        ensure_partitions(self.cur, pairs)
+        self.conn.commit()
+
     def insert_translation(self, translation):
-        """Insère une traduction dans la base de données."""
+        """Insère une traduction dans la base de données (ignorée si la paire existe déjà)."""
         try:
-            self.cur.execute("""
-                INSERT INTO translations (source_lang, target_lang, source_text, target_text, context)
-                VALUES (%s, %s, %s, %s, %s)
-                RETURNING id
-            """, (
-                translation['source_lang'],
-                translation['target_lang'],
-                translation['source_text'],
-                translation['target_text'],
-                translation.get('context', '')
-            ))
-            return self.cur.fetchone()[0]
+            self.cur.execute(f"""
+                INSERT INTO translations ({TRANSLATION_COLUMNS})
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT ({CONFLICT_TARGET}) DO NOTHING
+            """, translation_row(translation, datetime.utcnow()))
         except Exception as e:
             print(f"Erreur lors de l'insertion de la traduction: {e}")
             self.conn.rollback()
             raise
 
-    def insert_tag(self, tag_name):
-        """Insère un tag dans la base de données."""
-        try:
-            self.cur.execute("""
-                INSERT INTO tags (name)
-                VALUES (%s)
-                ON CONFLICT (name) DO NOTHING
-                RETURNING id
-            """, (tag_name,))
-            result = self.cur.fetchone()
-            if result:
-                return result[0]
-            # Si le tag existe déjà, récupérer son ID
-            self.cur.execute("SELECT id FROM tags WHERE name = %s", (tag_name,))
-            return self.cur.fetchone()[0]
-        except Exception as e:
-            print(f"Erreur lors de l'insertion du tag: {e}")
-            self.conn.rollback()
-            raise
-
-    def link_translation_tag(self, translation_id, tag_id):
-        """Lie une traduction à un tag."""
-        try:
-            self.cur.execute("""
-                INSERT INTO translation_tags (translation_id, tag_id)
-                VALUES (%s, %s)
-                ON CONFLICT DO NOTHING
-            """, (translation_id, tag_id))
-        except Exception as e:
-            print(f"Erreur lors de la liaison traduction-tag: {e}")
-            self.conn.rollback()
-            raise
-
     def migrate(self):
         """Migre toutes les données vers PostgreSQL."""
         try:
@@ -142,19 +132,14 @@ class PostgreSQLMigrator:
             
             # Chargement des traductions
             translations = self.load_translations()
+            self.prepare_partitions(translations)
             
-            # Migration des données
-            for translation in tqdm(translations, desc="Migration des traductions"):
-                # Insertion de la traduction
-                translation_id = self.insert_translation(translation)
-                
-                # Insertion des tags et création des liens
-                for tag in translation.get('tags', []):
-                    tag_id = self.insert_tag(tag)
-                    self.link_translation_tag(translation_id, tag_id)
+            # Migration des données (les tags sont stockés dans la colonne tags)
+            for count, translation in enumerate(tqdm(translations, desc="Migration des traductions"), start=1):
+                self.insert_translation(translation)
                 
                 # Sauvegarde intermédiaire tous les 100 enregistrements
-                if translation_id % 100 == 0:
+                if count % 100 == 0:
                     self.conn.commit()
             
             # Validation finale
@@ -169,6 +154,297 @@ class PostgreSQLMigrator:
             self.cur.close()
             self.conn.close()
 
+    def _iter_batches(self, translations, batch_size):
+        """Découpe la liste des traductions en lots de batch_size éléments."""
+        for start in range(0, len(translations), batch_size):
+            yield translations[start:start + batch_size]
+
+    def create_staging_table(self):
+        """Crée la table temporaire servant de zone de transit pour COPY."""
+        self.cur.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS staging_translations (
+                rownum INTEGER,
+                id VARCHAR(50),
+                source_lang VARCHAR(10),
+                target_lang VARCHAR(10),
+                source_text TEXT,
+                target_text TEXT,
+                context TEXT,
+                tags JSONB
+            )
+        """)
+
+    def copy_batch_to_staging(self, batch):
+        """Envoie un lot de traductions dans la table de transit avec COPY FROM STDIN."""
+        buffer = io.StringIO()
+        # Les chaînes sont quotées pour que COPY distingue '' de NULL
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+        for rownum, translation in enumerate(batch):
+            writer.writerow([
+                rownum,
+                translation_id(translation),
+                translation['source_lang'],
+                translation['target_lang'],
+                translation['source_text'],
+                translation['target_text'],
+                translation.get('context', ''),
+                json.dumps(translation.get('tags') or [], ensure_ascii=False)
+            ])
+        buffer.seek(0)
+        self.cur.execute("TRUNCATE staging_translations")
+        self.cur.copy_expert("""
+            COPY staging_translations (rownum, id, source_lang, target_lang, source_text, target_text, context, tags)
+            FROM STDIN WITH (FORMAT csv)
+        """, buffer)
+
+    def resolve_staging(self):
+        """
+        Insère le contenu de la table de transit en une requête ensembliste ; les paires
+        déjà présentes (même pair_hash dans la même direction) sont ignorées.
+        """
+        self.cur.execute(f"""
+            INSERT INTO translations ({TRANSLATION_COLUMNS})
+            SELECT id, source_lang, target_lang, source_text, target_text,
+                   ARRAY(SELECT DISTINCT jsonb_array_elements_text(tags) ORDER BY 1), context,
+                   now() AT TIME ZONE 'utc', now() AT TIME ZONE 'utc'
+            FROM staging_translations
+            ORDER BY rownum
+            ON CONFLICT ({CONFLICT_TARGET}) DO NOTHING
+        """)
+
+    def migrate_bulk(self, batch_size=10000):
+        """
+        Migre toutes les données vers PostgreSQL par lots, via COPY FROM STDIN.
+
+        Chaque lot est chargé dans une table de transit puis inséré en une requête
+        ensembliste, dans une transaction par lot.
+        """
+        try:
+            print("Début de la migration (COPY)...")
+            self.create_tables()
+            self.create_staging_table()
+            translations = self.load_translations()
+            self.prepare_partitions(translations)
+
+            batches = self._iter_batches(translations, batch_size)
+            total_batches = (len(translations) + batch_size - 1) // batch_size
+            for batch in tqdm(batches, total=total_batches, desc="Migration des lots"):
+                self.copy_batch_to_staging(batch)
+                self.resolve_staging()
+                self.conn.commit()
+
+            print(f"Migration terminée avec succès ({len(translations)} traductions)")
+
+        except Exception as e:
+            print(f"Erreur lors de la migration: {e}")
+            self.conn.rollback()
+            raise
+        finally:
+            self.cur.close()
+            self.conn.close()
+
+    def insert_translations_batch(self, batch):
+        """
+        Insère un lot de traductions, tags compris, en une requête multi-lignes (execute_values).
+
+        Les tags sont écrits dans la colonne tableau tags de chaque ligne : aucun id de tag
+        à résoudre ni lien translation_tags à insérer, et les compteurs tag_counts sont mis
+        à jour une fois par lot par les triggers par instruction de models.py.
+        """
+        try:
+            now = datetime.utcnow()
+            execute_values(self.cur, f"""
+                INSERT INTO translations ({TRANSLATION_COLUMNS})
+                VALUES %s
+                ON CONFLICT ({CONFLICT_TARGET}) DO NOTHING
+            """, [translation_row(t, now) for t in batch], page_size=len(batch))
+        except Exception as e:
+            print(f"Erreur lors de l'insertion du lot: {e}")
+            self.conn.rollback()
+            raise
+
+    def migrate_batched(self, batch_size=1000):
+        """
+        Migre toutes les données vers PostgreSQL par lots multi-lignes (execute_values).
+        Une transaction par lot.
+        """
+        try:
+            print("Début de la migration (par lots)...")
+            self.create_tables()
+            translations = self.load_translations()
+            self.prepare_partitions(translations)
+
+            batches = self._iter_batches(translations, batch_size)
+            total_batches = (len(translations) + batch_size - 1) // batch_size
+            for batch in tqdm(batches, total=total_batches, desc="Migration des lots"):
+                self.insert_translations_batch(batch)
+                self.conn.commit()
+
+            print(f"Migration terminée avec succès ({len(translations)} traductions)")
+
+        except Exception as e:
+            print(f"Erreur lors de la migration: {e}")
+            self.conn.rollback()
+            raise
+        finally:
+            self.cur.close()
+            self.conn.close()
+
+    def create_resumable_schema(self):
+        """
+        Crée la table des points de reprise. Les traductions sont identifiées par la clé
+        de dédoublonnage de models.py (DEDUP_KEY) ; la colonne content_hash des versions
+        précédentes, redondante avec pair_hash, est supprimée.
+        """
+        try:
+            self.cur.execute("DROP INDEX IF EXISTS uix_translations_content_hash")
+            self.cur.execute("ALTER TABLE translations DROP COLUMN IF EXISTS content_hash")
+            self.cur.execute("""
+                CREATE TABLE IF NOT EXISTS migration_checkpoints (
+                    source_file TEXT PRIMARY KEY,
+                    source_hash CHAR(64) NOT NULL,
+                    last_offset INTEGER NOT NULL DEFAULT 0,
+                    completed BOOLEAN NOT NULL DEFAULT FALSE,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            self.conn.commit()
+        except Exception as e:
+            print(f"Erreur lors de la préparation de la migration reprenable: {e}")
+            self.conn.rollback()
+            raise
+
+    def get_checkpoint(self, source_file, source_hash):
+        """
+        Retourne (offset, terminé) pour le fichier source. Si le fichier a changé
+        depuis le dernier passage, la migration repart de zéro (les upserts évitent les doublons).
+        """
+        self.cur.execute(
+            "SELECT source_hash, last_offset, completed FROM migration_checkpoints WHERE source_file = %s",
+            (source_file,)
+        )
+        row = self.cur.fetchone()
+        if row and row[0] == source_hash:
+            return row[1], row[2]
+        self.cur.execute("""
+            INSERT INTO migration_checkpoints (source_file, source_hash, last_offset, completed)
+            VALUES (%s, %s, 0, FALSE)
+            ON CONFLICT (source_file) DO UPDATE
+            SET source_hash = EXCLUDED.source_hash, last_offset = 0, completed = FALSE,
+                updated_at = CURRENT_TIMESTAMP
+        """, (source_file, source_hash))
+        self.conn.commit()
+        return 0, False
+
+    def save_checkpoint(self, source_file, offset, completed=False):
+        """Enregistre le point de reprise (dans la transaction du lot en cours)."""
+        self.cur.execute("""
+            UPDATE migration_checkpoints
+            SET last_offset = %s, completed = %s, updated_at = CURRENT_TIMESTAMP
+            WHERE source_file = %s
+        """, (offset, completed, source_file))
+
+    def reconcile_ids(self, rows):
+        """
+        Les id pair_XXXX de enrichir_traductions sont positionnels : si le fichier a été
+        modifié depuis une migration précédente, un id peut désigner en base une autre paire
+        que dans le fichier. ON CONFLICT ne couvrant que DEDUP_KEY, l'insertion heurterait
+        alors la clé primaire ; ces lignes prennent l'id dérivé de leur empreinte (hash_id).
+
+        Retourne : les lignes (valeurs de TRANSLATION_COLUMNS), id corrigés
+        """
+        taken = set(execute_values(self.cur, """
+            SELECT t.id, t.source_lang, t.target_lang
+            FROM translations t
+            JOIN (VALUES %s) AS v (id, source_lang, target_lang, pair_hash)
+                ON t.id = v.id AND t.source_lang = v.source_lang AND t.target_lang = v.target_lang
+            WHERE t.pair_hash <> v.pair_hash
+        """, [(r[0], r[1], r[2], pair_hash(r[3], r[4])) for r in rows], page_size=len(rows), fetch=True))
+        return [
+            (hash_id(r[3], r[4]),) + r[1:] if tuple(r[:3]) in taken else r
+            for r in rows
+        ]
+
+    def upsert_translations_batch(self, batch):
+        """
+        Insère ou met à jour un lot de traductions, identifiées par DEDUP_KEY.
+        Rejouer un lot ne crée aucun doublon, et un fichier modifié entre deux passages
+        ne heurte pas la clé primaire (voir reconcile_ids).
+        """
+        try:
+            # Une même ligne ne peut être mise à jour deux fois dans une seule requête
+            by_key = {}
+            for t in batch:
+                by_key.setdefault(dedup_key(t), t)
+
+            now = datetime.utcnow()
+            rows = self.reconcile_ids([translation_row(t, now) for t in by_key.values()])
+            execute_values(self.cur, f"""
+                INSERT INTO translations ({TRANSLATION_COLUMNS})
+                VALUES %s
+                ON CONFLICT ({CONFLICT_TARGET}) DO UPDATE
+                SET context = EXCLUDED.context, tags = EXCLUDED.tags, updated_at = EXCLUDED.updated_at
+            """, rows, page_size=len(rows))
+        except Exception as e:
+            print(f"Erreur lors de l'upsert du lot: {e}")
+            self.conn.rollback()
+            raise
+
+    def migrate_resumable(self, batch_size=1000):
+        """
+        Migration idempotente et reprenable.
+
+        Chaque lot est upserté sur DEDUP_KEY et le point de reprise est
+        enregistré dans la même transaction : une migration interrompue reprend au
+        dernier lot validé, et une migration terminée n'est pas rejouée.
+        """
+        try:
+            print("Début de la migration (reprenable)...")
+            self.create_tables()
+            self.create_resumable_schema()
+
+            with open(TRANSLATIONS_FILE, 'rb') as f:
+                source_hash = hashlib.sha256(f.read()).hexdigest()
+            offset, completed = self.get_checkpoint(TRANSLATIONS_FILE, source_hash)
+            if completed:
+                print("Fichier déjà migré, rien à faire")
+                return
+
+            translations = self.load_translations()
+            self.prepare_partitions(translations)
+            if offset:
+                print(f"Reprise de la migration à partir de la traduction {offset}")
+
+            batches = self._iter_batches(translations[offset:], batch_size)
+            total_batches = (len(translations) - offset + batch_size - 1) // batch_size
+            for batch in tqdm(batches, total=total_batches, desc="Migration des lots"):
+                self.upsert_translations_batch(batch)
+                offset += len(batch)
+                self.save_checkpoint(TRANSLATIONS_FILE, offset)
+                self.conn.commit()
+
+            self.save_checkpoint(TRANSLATIONS_FILE, offset, completed=True)
+            self.conn.commit()
+            print(f"Migration terminée avec succès ({len(translations)} traductions)")
+
+        except Exception as e:
+            print(f"Erreur lors de la migration: {e}")
+            self.conn.rollback()
+            raise
+        finally:
+            self.cur.close()
+            self.conn.close()
+
 if __name__ == "__main__":
     migrator = PostgreSQLMigrator()
-    migrator.migrate() 
\ No newline at end of file
+    # MIGRATION_MODE : copy (défaut), batch (execute_values), resumable (upserts reprenables)
+    # ou standard (ligne par ligne, historique)
+    mode = os.getenv('MIGRATION_MODE', 'copy')
+    if mode == 'resumable':
+        migrator.migrate_resumable(int(os.getenv('MIGRATION_BATCH_SIZE', '1000')))
+    elif mode == 'standard':
+        migrator.migrate()
+    elif mode == 'batch':
+        migrator.migrate_batched(int(os.getenv('MIGRATION_BATCH_SIZE', '1000')))
+    else:
+        migrator.migrate_bulk(int(os.getenv('MIGRATION_BATCH_SIZE', '10000')))
@@ -1,10 +1,16 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, Table, UniqueConstraint
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, Table, PrimaryKeyConstraint, Computed, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import ARRAY, BYTEA, TSVECTOR, insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.schema import CreateIndex
+from contextlib import contextmanager, asynccontextmanager
 from datetime import datetime
+import hashlib
 import os
+import threading
 from dotenv import load_dotenv
+from partitions import PARTITIONED_TABLE, DEFAULT_LANGUAGE_PAIRS, is_partitioned, ensure_partitions, swap_partition
 
 # Charger les variables d'environnement
 load_dotenv()
@@ -12,42 +18,441 @@ load_dotenv()
 # Création du modèle de base
 Base = declarative_base()
 
+# Configuration de recherche plein texte par langue ('simple' pour le darija et l'arabe)
+TEXT_SEARCH_CONFIGS = {'fr': 'french', 'en': 'english'}
+
+
+def _tsvector_expression(lang_column, text_column):
+    """Expression SQL du tsvector d'un texte, selon la configuration de sa langue"""
+    cases = " ".join(
+        f"WHEN '{lang}' THEN '{config}'::regconfig" for lang, config in TEXT_SEARCH_CONFIGS.items()
+    )
+    return f"to_tsvector(CASE {lang_column} {cases} ELSE 'simple'::regconfig END, {text_column})"
+
+
+# Les textes cibles sont surtout en darija (graphie arabe ou latine) : aucune racinisation
+# française ou anglaise ne s'y applique, ils sont indexés avec la configuration 'simple'.
+# Écrit sous la forme rendue par PostgreSQL, pour détecter une colonne à recalculer.
+TARGET_TSV_EXPRESSION = "to_tsvector('simple'::regconfig, target_text)"
+
+
+# Règle de dédoublonnage des traductions, appliquée partout (upsert_translations, migration.py) :
+# deux traductions sont des doublons si elles ont la même direction (source_lang, target_lang)
+# et exactement les mêmes source_text et target_text, comparés octet par octet en UTF-8
+# (casse, accents, ponctuation et espaces comptent ; aucune normalisation). La même paire de
+# textes dans deux directions donne deux traductions. Clé : index unique
+# uix_translations_pair_hash sur DEDUP_KEY, pair_hash étant l'empreinte sha256 (32 octets)
+# de source_text, séparateur \x1f, target_text.
+DEDUP_KEY = ('pair_hash', 'source_lang', 'target_lang')
+
+# convert_to() n'est que STABLE (il dépend de l'encodage du serveur) et PostgreSQL refuse
+# une colonne générée qui l'appelle directement : la fonction est déclarée IMMUTABLE, ce qui
+# est exact pour une base en UTF8
+PAIR_HASH_FUNCTION = """
+CREATE OR REPLACE FUNCTION translation_pair_hash(source_text TEXT, target_text TEXT) RETURNS BYTEA
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$ SELECT sha256(convert_to(source_text || E'\\x1f' || target_text, 'UTF8')) $$
+"""
+PAIR_HASH_EXPRESSION = "translation_pair_hash(source_text, target_text)"
+
+
+def pair_hash(source_text, target_text):
+    """Calcule côté Python la même empreinte que la colonne générée pair_hash"""
+    return hashlib.sha256(f"{source_text}\x1f{target_text}".encode('utf-8')).digest()
+
+
+def dedup_key(translation):
+    """Clé de dédoublonnage (DEDUP_KEY) d'une traduction, calculée côté Python"""
+    return (
+        pair_hash(translation['source_text'], translation['target_text']),
+        translation['source_lang'],
+        translation['target_lang'],
+    )
+
+
+# created_at est en UTC sans fuseau, comme datetime.utcnow() côté Python
+CREATED_AT_DEFAULT = text("(now() AT TIME ZONE 'utc')")
+
+
 class Translation(Base):
     __tablename__ = 'translations'
     
     # Garder l'ID original comme une chaîne
     id = Column(String(50), primary_key=True)  # Pour préserver pair_XXXX
-    source_lang = Column(String(10), nullable=False)
-    target_lang = Column(String(10), nullable=False)
+    # Clés de partition : elles font partie de la clé primaire et des index uniques
+    source_lang = Column(String(10), primary_key=True)
+    target_lang = Column(String(10), primary_key=True)
     source_text = Column(Text, nullable=False)
     target_text = Column(Text, nullable=False)
     # Stocker les tags directement comme un tableau
     tags = Column(ARRAY(String))
     context = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Valeur par défaut aussi côté serveur : les chargements en SQL brut (COPY, execute_values)
+    # ne laissent pas de created_at NULL, dont la pagination par curseur a besoin
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, server_default=CREATED_AT_DEFAULT)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Vecteurs de recherche plein texte générés par PostgreSQL
+    source_tsv = Column(TSVECTOR, Computed(_tsvector_expression('source_lang', 'source_text'), persisted=True))
+    target_tsv = Column(TSVECTOR, Computed(TARGET_TSV_EXPRESSION, persisted=True))
+    # Empreinte de la paire (source_text, target_text), générée par PostgreSQL
+    pair_hash = Column(BYTEA, Computed(PAIR_HASH_EXPRESSION, persisted=True))
     
-    # Contrainte pour éviter les doublons
+    # Contrainte pour éviter les doublons (voir DEDUP_KEY) : index unique sur l'empreinte de
+    # taille fixe plutôt qu'un B-tree sur deux colonnes TEXT non bornées
     __table_args__ = (
-        UniqueConstraint('source_text', 'target_text', name='uix_1'),
+        Index('uix_translations_pair_hash', *DEDUP_KEY, unique=True),
+        # Recherche plein texte
+        Index('ix_translations_source_tsv', 'source_tsv', postgresql_using='gin'),
+        Index('ix_translations_target_tsv', 'target_tsv', postgresql_using='gin'),
+        # Recherche approchée par trigrammes (extension pg_trgm)
+        Index('ix_translations_source_trgm', 'source_text', postgresql_using='gin',
+              postgresql_ops={'source_text': 'gin_trgm_ops'}),
+        Index('ix_translations_target_trgm', 'target_text', postgresql_using='gin',
+              postgresql_ops={'target_text': 'gin_trgm_ops'}),
+        # Recherche exacte par lot (search.find_exact_translations : source_text = ANY(...))
+        Index('ix_translations_direction_source_text', 'source_lang', 'target_lang', 'source_text'),
+        # Filtres par tags (@> et &&)
+        Index('ix_translations_tags', 'tags', postgresql_using='gin'),
+        # Pagination par curseur sur (created_at, id, source_lang, target_lang), globale ou par
+        # direction : l'id seul n'est unique que dans une direction (clé primaire)
+        Index('ix_translations_created_id', 'created_at', 'id', 'source_lang', 'target_lang'),
+        Index('ix_translations_direction_created_id', 'source_lang', 'target_lang', 'created_at', 'id'),
+        # Partitionnement par direction : LIST (source_lang), puis LIST (target_lang) dans
+        # chaque partition (voir partitions.py). Une requête filtrée sur la paire de
+        # langues ne lit qu'une partition, dont les index restent petits.
+        {'postgresql_partition_by': 'LIST (source_lang)'},
     )
 
-def get_db_session():
-    """Crée et retourne une session de base de données"""
+
+class TagCount(Base):
+    """
+    Nombre de traductions par tag et par paire de langues, tenu à jour par des triggers
+    sur la table translations : les facettes se lisent ici sans agréger toute la table.
+    """
+    __tablename__ = 'tag_counts'
+
+    tag = Column(String, nullable=False)
+    source_lang = Column(String(10), nullable=False)
+    target_lang = Column(String(10), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        PrimaryKeyConstraint('tag', 'source_lang', 'target_lang'),
+    )
+
+
+# Mise à jour incrémentale de tag_counts : triggers par instruction avec tables de transition,
+# pour qu'un chargement en masse (COPY, INSERT multi-lignes) ne déclenche qu'une agrégation
+TAG_COUNTS_FUNCTION = """
+CREATE OR REPLACE FUNCTION tag_counts_refresh() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE tag_counts c SET count = c.count - r.n
+        FROM (
+            SELECT t.tag, o.source_lang, o.target_lang, count(*) AS n
+            FROM old_rows o, LATERAL (SELECT DISTINCT unnest(o.tags) AS tag) t
+            WHERE t.tag IS NOT NULL
+            GROUP BY 1, 2, 3
+        ) r
+        WHERE c.tag = r.tag AND c.source_lang = r.source_lang AND c.target_lang = r.target_lang;
+        DELETE FROM tag_counts WHERE count <= 0;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO tag_counts (tag, source_lang, target_lang, count)
+        SELECT t.tag, n.source_lang, n.target_lang, count(*)
+        FROM new_rows n, LATERAL (SELECT DISTINCT unnest(n.tags) AS tag) t
+        WHERE t.tag IS NOT NULL
+        GROUP BY 1, 2, 3
+        ON CONFLICT (tag, source_lang, target_lang)
+        DO UPDATE SET count = tag_counts.count + EXCLUDED.count;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+TAG_COUNTS_TRIGGERS = {
+    'tag_counts_insert': "AFTER INSERT ON translations REFERENCING NEW TABLE AS new_rows",
+    'tag_counts_update': "AFTER UPDATE ON translations REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    'tag_counts_delete': "AFTER DELETE ON translations REFERENCING OLD TABLE AS old_rows",
+}
+
+
+def install_tag_counts(conn):
+    """Installe la fonction et les triggers de tag_counts, puis recalcule les compteurs"""
+    conn.execute(text(TAG_COUNTS_FUNCTION))
+    for name, definition in TAG_COUNTS_TRIGGERS.items():
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {name} ON translations"))
+        conn.execute(text(
+            f"CREATE TRIGGER {name} {definition} FOR EACH STATEMENT EXECUTE FUNCTION tag_counts_refresh()"
+        ))
+    rebuild_tag_counts(conn)
+
+
+def rebuild_tag_counts(conn, source_lang=None, target_lang=None):
+    """
+    Recalcule tag_counts (installation initiale, vérification), entièrement ou pour
+    une seule direction si source_lang et target_lang sont donnés
+    """
+    params = {"source_lang": source_lang, "target_lang": target_lang}
+    direction = source_lang is not None and target_lang is not None
+    if direction:
+        conn.execute(text(
+            "DELETE FROM tag_counts WHERE source_lang = :source_lang AND target_lang = :target_lang"
+        ), params)
+    else:
+        conn.execute(text("TRUNCATE tag_counts"))
+    conn.execute(text(f"""
+        INSERT INTO tag_counts (tag, source_lang, target_lang, count)
+        SELECT t.tag, tr.source_lang, tr.target_lang, count(*)
+        FROM translations tr, LATERAL (SELECT DISTINCT unnest(tr.tags) AS tag) t
+        WHERE t.tag IS NOT NULL
+        {"AND tr.source_lang = :source_lang AND tr.target_lang = :target_lang" if direction else ""}
+        GROUP BY 1, 2, 3
+    """), params)
+
+# Moteurs partagés par tout le processus, créés à la première utilisation
+_engine = None
+_session_factory = None
+_async_engine = None
+_async_session_factory = None
+_engine_lock = threading.Lock()
+
+
+def _get_db_url():
     db_url = os.getenv('DATABASE_URL')
     if not db_url:
         raise ValueError("L'URL de la base de données n'est pas définie dans les variables d'environnement")
-    
-    engine = create_engine(db_url)
-    Session = sessionmaker(bind=engine)
-    return Session()
+    return db_url
+
+
+def _pool_options():
+    """Paramètres du pool de connexions, configurables par variables d'environnement"""
+    return {
+        "pool_size": int(os.getenv('DB_POOL_SIZE', '5')),
+        "max_overflow": int(os.getenv('DB_MAX_OVERFLOW', '10')),
+        "pool_pre_ping": os.getenv('DB_POOL_PRE_PING', '1') == '1',
+        "pool_recycle": int(os.getenv('DB_POOL_RECYCLE', '1800')),
+        "pool_timeout": int(os.getenv('DB_POOL_TIMEOUT', '30')),
+    }
+
+
+def get_engine():
+    """Retourne le moteur SQLAlchemy du processus (pool de connexions partagé)"""
+    global _engine, _session_factory
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(_get_db_url(), **_pool_options())
+                _session_factory = sessionmaker(bind=_engine)
+    return _engine
+
+
+def get_async_engine():
+    """
+    Retourne le moteur asynchrone du processus (pilote asyncpg), pour les services asyncio.
+    L'URL synchrone (postgresql:// ou postgresql+psycopg2://) est convertie automatiquement.
+    """
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+        with _engine_lock:
+            if _async_engine is None:
+                url = make_url(os.getenv('ASYNC_DATABASE_URL') or _get_db_url())
+                if url.drivername in ('postgresql', 'postgresql+psycopg2', 'postgres'):
+                    url = url.set(drivername='postgresql+asyncpg')
+                _async_engine = create_async_engine(url, **_pool_options())
+                _async_session_factory = async_sessionmaker(_async_engine, expire_on_commit=False)
+    return _async_engine
+
+
+def get_db_session():
+    """Crée et retourne une session de base de données (connexion issue du pool partagé)"""
+    get_engine()
+    return _session_factory()
+
+
+@contextmanager
+def session_scope():
+    """
+    Fournit une session transactionnelle : commit en fin de bloc, rollback en cas d'erreur,
+    et retour systématique de la connexion au pool.
+    """
+    session = get_db_session()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+@asynccontextmanager
+async def async_session_scope():
+    """Équivalent asynchrone de session_scope()"""
+    get_async_engine()
+    async with _async_session_factory() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
+def dispose_engines():
+    """Ferme le pool de connexions synchrone (arrêt du service ou après un fork)"""
+    global _engine, _session_factory
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+        _engine = _session_factory = None
+
+
+async def dispose_async_engine():
+    """Ferme le pool de connexions asynchrone"""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = _async_session_factory = None
+
+
+def migrate_pair_hash(conn):
+    """
+    Remplace l'ancienne contrainte uix_1 (source_text, target_text) par l'index unique
+    sur DEDUP_KEY. L'ajout de la colonne générée recalcule l'empreinte des lignes existantes.
+    """
+    conn.execute(text(PAIR_HASH_FUNCTION))
+    conn.execute(text(
+        f"ALTER TABLE translations ADD COLUMN IF NOT EXISTS pair_hash BYTEA "
+        f"GENERATED ALWAYS AS ({PAIR_HASH_EXPRESSION}) STORED"
+    ))
+    conn.execute(text(
+        f"CREATE UNIQUE INDEX IF NOT EXISTS uix_translations_pair_hash ON translations ({', '.join(DEDUP_KEY)})"
+    ))
+    conn.execute(text("ALTER TABLE translations DROP CONSTRAINT IF EXISTS uix_1"))
+
+
+def migrate_search_columns(conn):
+    """
+    Ajoute aux tables créées avant la recherche plein texte les colonnes générées
+    source_tsv et target_tsv, puis crée les index de Translation qui manquent
+    (create_all ne modifie pas une table existante).
+
+    Une colonne target_tsv générée avec une autre expression (configuration de la langue
+    cible des premières versions) est supprimée puis recréée avec TARGET_TSV_EXPRESSION,
+    ADD COLUMN IF NOT EXISTS ne modifiant pas une colonne existante.
+    """
+    generation = conn.execute(text(
+        "SELECT generation_expression FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = 'translations' AND column_name = 'target_tsv'"
+    )).scalar()
+    if generation is not None and generation != TARGET_TSV_EXPRESSION:
+        # L'index ix_translations_target_tsv disparaît avec la colonne, il est recréé plus bas
+        conn.execute(text("ALTER TABLE translations DROP COLUMN target_tsv"))
+    for column in ('source_tsv', 'target_tsv'):
+        expression = Translation.__table__.c[column].computed.sqltext
+        conn.execute(text(
+            f"ALTER TABLE translations ADD COLUMN IF NOT EXISTS {column} TSVECTOR "
+            f"GENERATED ALWAYS AS ({expression}) STORED"
+        ))
+    for index in Translation.__table__.indexes:
+        conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+def migrate_pagination(conn):
+    """
+    Met à niveau une table créée avant la pagination par curseur sur
+    (created_at, id, source_lang, target_lang) : created_at devient obligatoire (les lignes
+    sans date reçoivent la date courante) et l'index ix_translations_created_id est recréé
+    s'il ne couvre pas encore la direction.
+    """
+    conn.execute(text(f"UPDATE translations SET created_at = {CREATED_AT_DEFAULT.text} WHERE created_at IS NULL"))
+    conn.execute(text(f"ALTER TABLE translations ALTER COLUMN created_at SET DEFAULT {CREATED_AT_DEFAULT.text}"))
+    conn.execute(text("ALTER TABLE translations ALTER COLUMN created_at SET NOT NULL"))
+    definition = conn.execute(text(
+        "SELECT indexdef FROM pg_indexes WHERE indexname = 'ix_translations_created_id' "
+        "AND schemaname = current_schema()"
+    )).scalar()
+    if definition is not None and 'source_lang' not in definition:
+        conn.execute(text("DROP INDEX ix_translations_created_id"))
+    for index in Translation.__table__.indexes:
+        if index.name == 'ix_translations_created_id':
+            conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+def upsert_translations(session, rows):
+    """
+    Insère des traductions en ignorant celles déjà présentes (conflit sur DEDUP_KEY).
+
+    Paramètres :
+        - session : session SQLAlchemy
+        - rows : liste de dictionnaires aux colonnes de Translation
+
+    Retourne : le nombre de traductions insérées
+    """
+    if not rows:
+        return 0
+    statement = insert(Translation).values(rows).on_conflict_do_nothing(
+        index_elements=list(DEDUP_KEY)
+    )
+    return session.execute(statement).rowcount
+
+
+def migrate_to_partitioned(conn):
+    """
+    Convertit une table translations non partitionnée (créée avant le partitionnement) :
+    l'ancienne table est renommée, la table partitionnée et les partitions des directions
+    présentes sont créées, puis les lignes sont recopiées.
+    """
+    cur = conn.connection.cursor()
+    cur.execute("SELECT to_regclass(%s) IS NOT NULL", (PARTITIONED_TABLE,))
+    if not cur.fetchone()[0] or is_partitioned(cur):
+        return
+
+    print("Conversion de la table translations en table partitionnée...")
+    # Les noms d'index doivent être libérés pour la nouvelle table
+    cur.execute("SELECT indexname FROM pg_indexes WHERE tablename = %s AND schemaname = current_schema()",
+                (PARTITIONED_TABLE,))
+    for (index_name,) in cur.fetchall():
+        cur.execute(f"ALTER INDEX {index_name} RENAME TO {index_name}_legacy")
+    cur.execute(f"ALTER TABLE {PARTITIONED_TABLE} RENAME TO {PARTITIONED_TABLE}_legacy")
+
+    Translation.__table__.create(conn)
+    cur.execute(f"SELECT DISTINCT source_lang, target_lang FROM {PARTITIONED_TABLE}_legacy")
+    ensure_partitions(cur, list(cur.fetchall()) + DEFAULT_LANGUAGE_PAIRS)
+
+    columns = ", ".join(c.name for c in Translation.__table__.columns if c.computed is None)
+    cur.execute(f"INSERT INTO {PARTITIONED_TABLE} ({columns}) SELECT {columns} FROM {PARTITIONED_TABLE}_legacy")
+    cur.execute(f"DROP TABLE {PARTITIONED_TABLE}_legacy")
+
+
+def swap_translations_partition(conn, source_lang, target_lang):
+    """
+    Remplace toutes les traductions d'une direction par le contenu de la table
+    translations_<source>_<cible>_swap (voir partitions.create_swap_table), sans DELETE.
+    Les triggers ne voyant pas l'échange, les compteurs de tags de la direction sont recalculés.
+    """
+    swap_partition(conn.connection.cursor(), source_lang, target_lang)
+    rebuild_tag_counts(conn, source_lang, target_lang)
+
 
 def init_db():
     """Initialise la base de données"""
-    db_url = os.getenv('DATABASE_URL')
-    if not db_url:
-        raise ValueError("L'URL de la base de données n'est pas définie dans les variables d'environnement")
-    
-    engine = create_engine(db_url)
+    engine = get_engine()
+    with engine.begin() as conn:
+        # Nécessaire aux index trigrammes
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        # Utilisée par la colonne générée pair_hash, avant toute création de table
+        conn.execute(text(PAIR_HASH_FUNCTION))
+        migrate_to_partitioned(conn)
     Base.metadata.create_all(engine)
-    print("Base de données initialisée avec succès!") 
\ No newline at end of file
+    with engine.begin() as conn:
+        ensure_partitions(conn.connection.cursor())
+        migrate_pair_hash(conn)
+        migrate_search_columns(conn)
+        migrate_pagination(conn)
+        install_tag_counts(conn)
+    print("Base de données initialisée avec succès!")
@@ -0,0 +1,160 @@
+import os
+import re
+
+# Table des traductions, partitionnée par LIST (source_lang) puis LIST (target_lang)
+PARTITIONED_TABLE = 'translations'
+
+# Directions créées à l'initialisation (TRANSLATION_LANGUAGE_PAIRS=fr_dr,dr_fr,...)
+DEFAULT_LANGUAGE_PAIRS = [
+    tuple(pair.split('_', 1))
+    for pair in os.getenv('TRANSLATION_LANGUAGE_PAIRS', 'fr_dr,dr_fr,en_dr,dr_en').split(',')
+    if '_' in pair
+]
+
+_LANG_PATTERN = re.compile(r'^[a-z]{2,10}$')
+
+
+def _check_lang(lang):
+    """Les codes de langue entrent dans des noms de tables : on n'accepte que [a-z]"""
+    if not _LANG_PATTERN.match(lang or ''):
+        raise ValueError(f"Code de langue invalide pour une partition: {lang!r}")
+    return lang
+
+
+def partition_name(source_lang, target_lang=None):
+    """Nom de la partition d'une langue source, ou d'une direction source -> cible"""
+    if target_lang is None:
+        return f"{PARTITIONED_TABLE}_{_check_lang(source_lang)}"
+    return f"{PARTITIONED_TABLE}_{_check_lang(source_lang)}_{_check_lang(target_lang)}"
+
+
+def _table_exists(cur, table):
+    cur.execute("SELECT to_regclass(%s) IS NOT NULL", (table,))
+    return cur.fetchone()[0]
+
+
+def is_partitioned(cur, table=PARTITIONED_TABLE):
+    """Indique si la table existe et est partitionnée"""
+    cur.execute("""
+        SELECT EXISTS (
+            SELECT 1 FROM pg_partitioned_table p
+            JOIN pg_class c ON c.oid = p.partrelid
+            WHERE c.relname = %s AND pg_table_is_visible(c.oid)
+        )
+    """, (table,))
+    return cur.fetchone()[0]
+
+
+def _insert_columns(cur, table=PARTITIONED_TABLE):
+    """Colonnes non générées de la table, dans l'ordre de définition"""
+    cur.execute("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_name = %s AND table_schema = current_schema() AND is_generated = 'NEVER'
+        ORDER BY ordinal_position
+    """, (table,))
+    return ", ".join(row[0] for row in cur.fetchall())
+
+
+def _create_partition(cur, parent, name, create_statements, column, value):
+    """
+    Crée une partition (create_statements : la création de la table, puis celle de ses
+    propres partitions si elle est sous-partitionnée). Si la partition par défaut du parent
+    contient déjà des lignes pour cette valeur, elle est détachée le temps de les déplacer
+    dans la nouvelle partition (PostgreSQL refuse sinon la création) ; les sous-partitions
+    sont créées avant le déplacement pour que chaque ligne y trouve sa place.
+    """
+    default = f"{parent}_default"
+    moved = False
+    if _table_exists(cur, default):
+        cur.execute(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {column} = %s)", (value,))
+        moved = cur.fetchone()[0]
+    if not moved:
+        for statement in create_statements:
+            cur.execute(statement)
+        return
+
+    columns = _insert_columns(cur)
+    cur.execute(f"ALTER TABLE {parent} DETACH PARTITION {default}")
+    for statement in create_statements:
+        cur.execute(statement)
+    cur.execute(f"INSERT INTO {name} ({columns}) SELECT {columns} FROM {default} WHERE {column} = %s", (value,))
+    cur.execute(f"DELETE FROM {default} WHERE {column} = %s", (value,))
+    cur.execute(f"ALTER TABLE {parent} ATTACH PARTITION {default} DEFAULT")
+    print(f"Lignes de {default} déplacées dans {name}")
+
+
+def ensure_default_partition(cur):
+    """Crée la partition par défaut de la table (langues sources sans partition dédiée)"""
+    cur.execute(f"CREATE TABLE IF NOT EXISTS {PARTITIONED_TABLE}_default PARTITION OF {PARTITIONED_TABLE} DEFAULT")
+
+
+def ensure_partition(cur, source_lang, target_lang):
+    """
+    Crée si besoin la partition de la langue source (sous-partitionnée par langue cible,
+    avec sa partition par défaut) puis celle de la direction source -> cible.
+    """
+    source_partition = partition_name(source_lang)
+    pair_partition = partition_name(source_lang, target_lang)
+
+    if not _table_exists(cur, source_partition):
+        # Les lignes déplacées depuis translations_default passent par la partition par
+        # défaut de la langue source, puis l'étape suivante les range dans leur direction
+        _create_partition(cur, PARTITIONED_TABLE, source_partition, [f"""
+            CREATE TABLE {source_partition} PARTITION OF {PARTITIONED_TABLE}
+            FOR VALUES IN ('{source_lang}') PARTITION BY LIST (target_lang)
+        """, f"CREATE TABLE {source_partition}_default PARTITION OF {source_partition} DEFAULT"],
+            'source_lang', source_lang)
+
+    if not _table_exists(cur, pair_partition):
+        _create_partition(cur, source_partition, pair_partition, [f"""
+            CREATE TABLE {pair_partition} PARTITION OF {source_partition}
+            FOR VALUES IN ('{target_lang}')
+        """], 'target_lang', target_lang)
+
+
+def ensure_partitions(cur, pairs=None):
+    """Crée les partitions des directions données (par défaut DEFAULT_LANGUAGE_PAIRS)"""
+    ensure_default_partition(cur)
+    for source_lang, target_lang in sorted(set(pairs or DEFAULT_LANGUAGE_PAIRS)):
+        ensure_partition(cur, source_lang, target_lang)
+
+
+def create_swap_table(cur, source_lang, target_lang):
+    """
+    Crée une table vide de même structure que la partition d'une direction, à remplir
+    (COPY, INSERT...) avant swap_partition(). La contrainte CHECK reprend les bornes de
+    la partition pour que l'attachement n'ait pas à parcourir la table.
+
+    Retourne : le nom de la table
+    """
+    name = f"{partition_name(source_lang, target_lang)}_swap"
+    cur.execute(f"DROP TABLE IF EXISTS {name}")
+    cur.execute(f"""
+        CREATE TABLE {name} (LIKE {PARTITIONED_TABLE} INCLUDING DEFAULTS INCLUDING GENERATED)
+    """)
+    cur.execute(f"""
+        ALTER TABLE {name} ADD CONSTRAINT {name}_bounds
+        CHECK (source_lang = '{source_lang}' AND target_lang = '{target_lang}')
+    """)
+    return name
+
+
+def swap_partition(cur, source_lang, target_lang):
+    """
+    Remplace la partition d'une direction par sa table de swap (create_swap_table) :
+    détachement de l'ancienne partition, attachement de la nouvelle puis suppression
+    de l'ancienne, dans la transaction courante. Les index de la table partitionnée
+    sont construits sur la nouvelle partition lors de l'attachement.
+    """
+    ensure_partition(cur, source_lang, target_lang)
+    source_partition = partition_name(source_lang)
+    pair_partition = partition_name(source_lang, target_lang)
+    swap = f"{pair_partition}_swap"
+
+    cur.execute(f"ALTER TABLE {source_partition} DETACH PARTITION {pair_partition}")
+    cur.execute(f"ALTER TABLE {pair_partition} RENAME TO {pair_partition}_old")
+    cur.execute(f"ALTER TABLE {swap} RENAME TO {pair_partition}")
+    cur.execute(f"ALTER TABLE {source_partition} ATTACH PARTITION {pair_partition} FOR VALUES IN ('{target_lang}')")
+    cur.execute(f"ALTER TABLE {pair_partition} DROP CONSTRAINT {swap}_bounds")
+    cur.execute(f"DROP TABLE {pair_partition}_old")
+    print(f"Partition {pair_partition} remplacée")
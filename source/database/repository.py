@@ -0,0 +1,90 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import select, tuple_
+from models import Translation
+from search import filter_by_tags
+
+
+class InvalidCursorError(ValueError):
+    """Curseur de pagination illisible ou altéré"""
+
+
+def encode_cursor(created_at, translation_id, source_lang, target_lang):
+    """
+    Encode la position (created_at, id, source_lang, target_lang) de la dernière ligne d'une
+    page en curseur opaque (l'id n'est unique que dans une direction)
+    """
+    payload = json.dumps([created_at.isoformat(), translation_id, source_lang, target_lang], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Décode un curseur produit par encode_cursor()"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, translation_id, source_lang, target_lang = json.loads(
+            base64.urlsafe_b64decode(padded.encode('ascii'))
+        )
+        return datetime.fromisoformat(created_at), str(translation_id), str(source_lang), str(target_lang)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Curseur invalide: {cursor}") from e
+
+
+# Ordre des pages : created_at puis la clé primaire (id, source_lang, target_lang)
+PAGE_ORDER = (Translation.created_at, Translation.id, Translation.source_lang, Translation.target_lang)
+
+
+class TranslationRepository:
+    """
+    Accès en lecture aux traductions avec une pagination par curseur (keyset).
+
+    Les pages sont triées par (created_at, id, source_lang, target_lang) et chaque page
+    reprend après la dernière ligne de la précédente (WHERE (...) > curseur) : la requête descend
+    directement dans l'index au lieu de parcourir et jeter OFFSET lignes, et la page N
+    coûte autant que la première.
+    """
+
+    MAX_LIMIT = 500
+
+    def __init__(self, session):
+        self.session = session
+
+    def list_page(self, limit=50, cursor=None, source_lang=None, target_lang=None,
+                  all_tags=None, any_tags=None):
+        """
+        Retourne une page de traductions.
+
+        Paramètres :
+            - limit : taille de la page (bornée à MAX_LIMIT)
+            - cursor : curseur next_cursor de la page précédente, None pour la première page
+            - source_lang / target_lang : filtre sur la direction (index
+              ix_translations_direction_created_id, et une seule partition lue)
+            - all_tags / any_tags : filtres par tags (voir search.filter_by_tags)
+
+        Retourne : {"items": [Translation, ...], "next_cursor": str ou None}
+        """
+        limit = max(1, min(limit, self.MAX_LIMIT))
+        statement = filter_by_tags(select(Translation), all_tags, any_tags, source_lang, target_lang)
+        if cursor:
+            statement = statement.where(tuple_(*PAGE_ORDER) > tuple_(*decode_cursor(cursor)))
+        # Une ligne de plus pour savoir s'il existe une page suivante
+        statement = statement.order_by(*PAGE_ORDER).limit(limit + 1)
+        items = self.session.execute(statement).scalars().all()
+
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            last = items[-1]
+            next_cursor = encode_cursor(last.created_at, last.id, last.source_lang, last.target_lang)
+        return {"items": items, "next_cursor": next_cursor}
+
+    def iter_all(self, page_size=500, **filters):
+        """Parcourt toutes les traductions correspondant aux filtres, page par page"""
+        cursor = None
+        while True:
+            page = self.list_page(limit=page_size, cursor=cursor, **filters)
+            yield from page["items"]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return
@@ -0,0 +1,122 @@
+from sqlalchemy import Text, any_, func, cast, literal, or_, select
+from sqlalchemy.dialects.postgresql import ARRAY, REGCONFIG
+from models import Translation, TagCount, TEXT_SEARCH_CONFIGS
+
+
+def _tsquery(config, query):
+    """Requête plein texte au format « moteur de recherche » (guillemets, OR, -mot)"""
+    return func.websearch_to_tsquery(cast(config, REGCONFIG), query)
+
+
+def search_translations(session, query, source_lang=None, target_lang=None, limit=20, fuzzy=True):
+    """
+    Recherche des traductions par texte, classées par pertinence.
+
+    La recherche plein texte (index GIN sur source_tsv / target_tsv) est combinée,
+    si fuzzy est vrai, à une recherche approchée par trigrammes (index pg_trgm) qui
+    tolère les fautes de frappe et les mots partiels. Le texte cible, indexé avec la
+    configuration 'simple', est interrogé avec cette même configuration.
+
+    Paramètres :
+        - session : session SQLAlchemy
+        - query : texte recherché
+        - source_lang / target_lang : filtre optionnel sur la direction
+        - limit : nombre maximum de résultats
+        - fuzzy : active la correspondance par trigrammes
+
+    Retourne : liste de tuples (Translation, score) triée par score décroissant
+    """
+    if source_lang:
+        configs = [TEXT_SEARCH_CONFIGS.get(source_lang, 'simple')]
+    else:
+        configs = sorted(set(TEXT_SEARCH_CONFIGS.values())) + ['simple']
+
+    conditions = []
+    scores = []
+    for config in configs:
+        tsquery = _tsquery(config, query)
+        conditions.append(Translation.source_tsv.op('@@')(tsquery))
+        scores.append(func.ts_rank_cd(Translation.source_tsv, tsquery))
+    target_tsquery = _tsquery('simple', query)
+    conditions.append(Translation.target_tsv.op('@@')(target_tsquery))
+    scores.append(func.ts_rank_cd(Translation.target_tsv, target_tsquery))
+
+    if fuzzy:
+        # L'opérateur % utilise le seuil pg_trgm.similarity_threshold (0.3 par défaut)
+        conditions += [Translation.source_text.op('%')(query), Translation.target_text.op('%')(query)]
+        scores += [func.similarity(Translation.source_text, query), func.similarity(Translation.target_text, query)]
+
+    score = func.greatest(*scores).label('score')
+    statement = select(Translation, score).where(or_(*conditions))
+    if source_lang:
+        statement = statement.where(Translation.source_lang == source_lang)
+    if target_lang:
+        statement = statement.where(Translation.target_lang == target_lang)
+    statement = statement.order_by(score.desc()).limit(limit)
+
+    return [(translation, row_score) for translation, row_score in session.execute(statement)]
+
+
+def filter_by_tags(statement, all_tags=None, any_tags=None, source_lang=None, target_lang=None):
+    """
+    Ajoute à une requête les filtres par tags et par paire de langues.
+
+    - all_tags : la traduction doit porter tous ces tags (tags @> ..., index GIN)
+    - any_tags : la traduction doit porter au moins un de ces tags (tags && ..., index GIN)
+    """
+    if all_tags:
+        statement = statement.where(Translation.tags.contains(list(all_tags)))
+    if any_tags:
+        statement = statement.where(Translation.tags.overlap(list(any_tags)))
+    if source_lang:
+        statement = statement.where(Translation.source_lang == source_lang)
+    if target_lang:
+        statement = statement.where(Translation.target_lang == target_lang)
+    return statement
+
+
+def find_by_tags(session, all_tags=None, any_tags=None, source_lang=None, target_lang=None, limit=100):
+    """
+    Retourne les traductions correspondant aux filtres de tags et de langues.
+
+    Exemple : find_by_tags(session, all_tags=['gastronomie', 'informel'], source_lang='fr')
+    """
+    statement = filter_by_tags(select(Translation), all_tags, any_tags, source_lang, target_lang)
+    return session.execute(statement.order_by(Translation.id).limit(limit)).scalars().all()
+
+
+def tag_facets(session, source_lang=None, target_lang=None, limit=50):
+    """
+    Nombre de traductions par tag, lu dans la table tag_counts tenue à jour par triggers.
+
+    Retourne : liste de tuples (tag, nombre) triée par nombre décroissant
+    """
+    total = func.sum(TagCount.count).label('total')
+    statement = select(TagCount.tag, total)
+    if source_lang:
+        statement = statement.where(TagCount.source_lang == source_lang)
+    if target_lang:
+        statement = statement.where(TagCount.target_lang == target_lang)
+    statement = statement.group_by(TagCount.tag).order_by(total.desc(), TagCount.tag).limit(limit)
+    return [(tag, int(count)) for tag, count in session.execute(statement)]
+
+
+def find_exact_translations(session, texts, source_lang, target_lang=None):
+    """
+    Traductions dont le texte source est exactement l'un des textes donnés, en une seule
+    requête (source_text = ANY(:texts)) quel que soit le nombre de textes.
+
+    Retourne : dictionnaire texte source -> liste de Translation
+    """
+    if not texts:
+        return {}
+    statement = select(Translation).where(
+        Translation.source_lang == source_lang,
+        Translation.source_text == any_(literal(list(texts), ARRAY(Text))),
+    )
+    if target_lang:
+        statement = statement.where(Translation.target_lang == target_lang)
+    found = {}
+    for translation in session.execute(statement).scalars():
+        found.setdefault(translation.source_text, []).append(translation)
+    return found
@@ -0,0 +1,72 @@
+'''Encodeurs de phrases (embeddings) utilisés par l'index vectoriel du RAG.'''
+
+import os
+import sys
+import zlib
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../agregation'))
+from memoire_traduction import normaliser
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # Dépendance optionnelle : encodeur par n-grammes à défaut
+    SentenceTransformer = None
+
+
+class EncodeurNgrammes:
+    """
+    Encodeur local sans dépendance : les n-grammes de caractères du texte normalisé sont
+    projetés par hachage dans un vecteur de dimension fixe, puis normalisés (norme L2).
+    Robuste aux variantes d'orthographe, utilisable hors ligne et en CI.
+    """
+
+    def __init__(self, dimension=384, n_min=2, n_max=4):
+        self.dimension = dimension
+        self.n_min = n_min
+        self.n_max = n_max
+        self.nom = f"ngrammes-{dimension}-{n_min}-{n_max}"
+
+    def _encoder_texte(self, texte, vecteur):
+        texte = f" {normaliser(texte)} "
+        for n in range(self.n_min, self.n_max + 1):
+            for i in range(len(texte) - n + 1):
+                h = zlib.crc32(texte[i:i + n].encode('utf-8'))
+                # Le bit de poids fort donne le signe : les collisions se compensent en moyenne
+                vecteur[h % self.dimension] += 1.0 if h & 0x80000000 else -1.0
+
+    def encoder(self, textes):
+        """Retourne une matrice float32 (len(textes), dimension) de vecteurs normalisés"""
+        matrice = np.zeros((len(textes), self.dimension), dtype=np.float32)
+        for ligne, texte in zip(matrice, textes):
+            self._encoder_texte(texte, ligne)
+        normes = np.linalg.norm(matrice, axis=1, keepdims=True)
+        return matrice / np.maximum(normes, 1e-12)
+
+
+class EncodeurSentenceTransformers:
+    """Encodeur neuronal local (CPU) via sentence-transformers, si le paquet est installé."""
+
+    def __init__(self, modele="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"):
+        if SentenceTransformer is None:
+            raise ImportError("sentence-transformers n'est pas installé (pip install sentence-transformers)")
+        self.modele = SentenceTransformer(modele, device="cpu")
+        self.dimension = self.modele.get_sentence_embedding_dimension()
+        self.nom = f"st:{modele}"
+
+    def encoder(self, textes):
+        return self.modele.encode(
+            list(textes), batch_size=64, normalize_embeddings=True, convert_to_numpy=True
+        ).astype(np.float32)
+
+
+def charger_encodeur(nom=None):
+    """
+    Retourne l'encodeur correspondant à un nom (celui enregistré dans un index ou la
+    variable RAG_ENCODEUR) : 'st:<modèle>' ou 'ngrammes-<dimension>-<n_min>-<n_max>'.
+    """
+    nom = nom or os.getenv('RAG_ENCODEUR', 'ngrammes-384-2-4')
+    if nom.startswith('st:'):
+        return EncodeurSentenceTransformers(nom[3:])
+    _, dimension, n_min, n_max = nom.split('-')
+    return EncodeurNgrammes(int(dimension), int(n_min), int(n_max))
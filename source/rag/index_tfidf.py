@@ -0,0 +1,240 @@
+'''Index TF-IDF sur les n-grammes de caractères, pour retrouver une phrase malgré une
+orthographe approximative (darija en arabizi, alternance de langues, fautes de frappe).
+
+Chaque texte (source_text et target_text de chaque paire) est découpé en n-grammes de
+caractères, hachés dans un espace de dimension fixe : il n'y a pas de vocabulaire à
+construire ni à stocker. Un fragment (shard) par direction contient la matrice transposée
+n-grammes x textes (index inversé CSR) et les poids idf, dans un fichier .npz.
+
+Structure d'un index (un dossier) :
+- manifeste.json : paramètres des n-grammes et fragments par direction
+- <direction>.npz : matrice, idf, numéro de paire et colonne (source/cible) de chaque texte
+- paires.jsonl et positions.npy : paires au format JSON (voir index_vectoriel.py)'''
+
+import os
+import json
+import shutil
+import time
+import numpy as np
+from scipy import sparse
+
+from embeddings import normaliser
+from index_vectoriel import ecrire_paires, LecteurPaires, remplacer_dossier
+
+COLONNES = ('source', 'target')
+
+
+def compter_ngrammes(textes, n_min=3, n_max=4, nb_colonnes=2 ** 20):
+    """
+    Matrice CSR (textes x nb_colonnes) des occurrences des n-grammes de caractères hachés.
+
+    Le hachage est vectorisé : tous les textes normalisés sont concaténés en un tableau de
+    points de code, et les n-grammes qui chevauchent deux textes sont écartés.
+    nb_colonnes doit être une puissance de 2.
+    """
+    textes = [f" {normaliser(t)} " for t in textes]
+    longueurs = np.array([len(t) for t in textes], dtype=np.int64)
+    points = np.frombuffer("".join(textes).encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    documents = np.repeat(np.arange(len(textes), dtype=np.int64), longueurs)
+
+    # Hachage polynomial incrémental : le hachage des n-grammes prolonge celui des (n-1)-grammes
+    masque = np.uint64(nb_colonnes - 1)
+    lignes, colonnes = [], []
+    h = points.copy()
+    for n in range(2, n_max + 1):
+        m = len(points) - n + 1
+        if m <= 0:
+            break
+        h = h[:m] * np.uint64(1000003) ^ points[n - 1:n - 1 + m]
+        if n < n_min:
+            continue
+        valides = documents[:m] == documents[n - 1:n - 1 + m]
+        # Mélange final des bits avant de garder les bits de poids faible
+        melange = (h[valides] ^ np.uint64(n)) * np.uint64(0x9E3779B97F4A7C15)
+        lignes.append(documents[:m][valides])
+        colonnes.append(((melange >> np.uint64(32)) & masque).astype(np.int32))
+
+    lignes = np.concatenate(lignes) if lignes else np.empty(0, dtype=np.int64)
+    colonnes = np.concatenate(colonnes) if colonnes else np.empty(0, dtype=np.int32)
+    comptes = sparse.coo_matrix(
+        (np.ones(len(lignes), dtype=np.float32), (lignes, colonnes)), shape=(len(textes), nb_colonnes)
+    ).tocsr()
+    comptes.sum_duplicates()
+    return comptes
+
+
+def ponderer(comptes, idf):
+    """Pondération tf (sous-linéaire) x idf puis normalisation L2 de chaque ligne"""
+    matrice = comptes.astype(np.float32, copy=True)
+    matrice.data = (1.0 + np.log(matrice.data)) * idf[matrice.indices]
+    normes = np.sqrt(np.asarray(matrice.multiply(matrice).sum(axis=1)).ravel())
+    matrice.data /= np.repeat(np.maximum(normes, 1e-12), np.diff(matrice.indptr)).astype(np.float32)
+    return matrice
+
+
+def construire_index(paires, dossier, n_min=3, n_max=4, nb_colonnes=2 ** 20):
+    """
+    Construit l'index TF-IDF d'une liste de paires, un fragment par direction.
+
+    Args:
+        paires (list): Paires {source_lang, target_lang, source_text, target_text, tags, context}
+        dossier (str): Dossier de l'index, remplacé d'un bloc une fois la construction finie
+        n_min, n_max (int): Tailles des n-grammes de caractères
+        nb_colonnes (int): Dimension de l'espace de hachage (puissance de 2)
+
+    Returns:
+        int: Nombre de paires indexées
+    """
+    paires = [p for p in paires if p.get('source_text') and p.get('target_text')]
+    dossier_tmp = f"{dossier}.tmp"
+    shutil.rmtree(dossier_tmp, ignore_errors=True)
+    os.makedirs(dossier_tmp)
+
+    lignes_par_direction = {}
+    for ligne, p in enumerate(paires):
+        lignes_par_direction.setdefault(f"{p['source_lang']}_{p['target_lang']}", []).append(ligne)
+
+    fragments = {}
+    for direction, lignes in sorted(lignes_par_direction.items()):
+        # Textes source puis textes cibles de la direction
+        textes = [paires[l]['source_text'] for l in lignes] + [paires[l]['target_text'] for l in lignes]
+        comptes = compter_ngrammes(textes, n_min, n_max, nb_colonnes)
+        df = np.bincount(comptes.indices, minlength=nb_colonnes)
+        # Les n-grammes absents gardent un idf nul : ils ne contribuent à aucun score
+        idf = np.where(df > 0, np.log((1.0 + len(textes)) / (1.0 + df)) + 1.0, 0.0).astype(np.float32)
+        inverse = ponderer(comptes, idf).T.tocsr()
+
+        fichier = f"{direction}.npz"
+        np.savez(
+            os.path.join(dossier_tmp, fichier),
+            # Poids stockés en float16 (fichier plus compact), repassés en float32 au chargement
+            data=inverse.data.astype(np.float16), indices=inverse.indices, indptr=inverse.indptr, forme=np.array(inverse.shape),
+            idf=idf,
+            paires=np.array(lignes + lignes, dtype=np.int64),
+            colonnes=np.repeat(np.array([0, 1], dtype=np.int8), len(lignes)),
+        )
+        fragments[direction] = {'fichier': fichier, 'textes': len(textes)}
+
+    ecrire_paires(dossier_tmp, paires)
+    with open(os.path.join(dossier_tmp, 'manifeste.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'n_min': n_min,
+            'n_max': n_max,
+            'nb_colonnes': nb_colonnes,
+            'nombre': len(paires),
+            'fragments': fragments,
+            'construit_le': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }, f, ensure_ascii=False, indent=2)
+
+    remplacer_dossier(dossier_tmp, dossier)
+    print(f"Index TF-IDF construit: {len(paires)} paires, {len(fragments)} directions dans {dossier}")
+    return len(paires)
+
+
+class Fragment:
+    """Fragment d'une direction : index inversé n-grammes -> textes et poids idf."""
+
+    def __init__(self, chemin):
+        with np.load(chemin) as f:
+            self.inverse = sparse.csr_matrix(
+                (f['data'].astype(np.float32), f['indices'], f['indptr']), shape=tuple(f['forme'])
+            )
+            self.idf = f['idf']
+            self.paires = f['paires']
+            self.colonnes = f['colonnes']
+
+    def scores(self, comptes):
+        """Matrice creuse (requêtes x textes) des similarités cosinus"""
+        return ponderer(comptes, self.idf) @ self.inverse
+
+
+class IndexTfidf:
+    """Index TF-IDF en lecture seule."""
+
+    def __init__(self, dossier):
+        with open(os.path.join(dossier, 'manifeste.json'), encoding='utf-8') as f:
+            self.manifeste = json.load(f)
+        self.fragments = {
+            direction: Fragment(os.path.join(dossier, info['fichier']))
+            for direction, info in self.manifeste['fragments'].items()
+        }
+        self.paires = LecteurPaires(dossier)
+
+    def __len__(self):
+        return self.manifeste['nombre']
+
+    def close(self):
+        self.paires.close()
+
+    def rechercher(self, textes, k=5, direction=None, colonne=None):
+        """
+        Recherche les paires dont un texte (source ou cible) est le plus proche de chaque
+        texte donné, en similarité cosinus TF-IDF.
+
+        Args:
+            textes (list | str): Texte(s) recherché(s), traités en un seul produit matriciel
+            k (int): Nombre de paires par texte
+            direction (str): Fragment interrogé, par exemple 'fr_dr' (tous si None)
+            colonne (str): 'source' ou 'target' pour ne comparer qu'un côté des paires
+
+        Returns:
+            list: Pour chaque texte, liste de {"paire", "score", "colonne"} (une seule liste
+                si textes est une chaîne)
+        """
+        unique = isinstance(textes, str)
+        textes = [textes] if unique else list(textes)
+        if direction is not None and direction not in self.fragments:
+            return [] if unique else [[] for _ in textes]
+        fragments = [self.fragments[direction]] if direction else list(self.fragments.values())
+        numero_colonne = None if colonne is None else COLONNES.index(colonne)
+        comptes = compter_ngrammes(
+            textes, self.manifeste['n_min'], self.manifeste['n_max'], self.manifeste['nb_colonnes']
+        )
+
+        # Candidats par texte : (score, ligne de paire, colonne), k meilleurs par fragment
+        candidats = [[] for _ in textes]
+        for fragment in fragments:
+            scores = fragment.scores(comptes).tocsr()
+            for i in range(len(textes)):
+                debut, fin = scores.indptr[i], scores.indptr[i + 1]
+                documents, valeurs = scores.indices[debut:fin], scores.data[debut:fin]
+                if numero_colonne is not None:
+                    garder = fragment.colonnes[documents] == numero_colonne
+                    documents, valeurs = documents[garder], valeurs[garder]
+                # 2k textes : une paire peut apparaître par sa source et par sa cible
+                n = min(2 * k, len(valeurs))
+                if n == 0:
+                    continue
+                top = np.argpartition(-valeurs, n - 1)[:n]
+                candidats[i].extend(
+                    (float(valeurs[t]), int(fragment.paires[documents[t]]), int(fragment.colonnes[documents[t]]))
+                    for t in top
+                )
+
+        resultats = []
+        for liste in candidats:
+            vues, meilleurs = set(), []
+            for score, ligne, numero in sorted(liste, reverse=True):
+                if ligne in vues:
+                    continue
+                vues.add(ligne)
+                meilleurs.append({'paire': self.paires[ligne], 'score': round(score, 4), 'colonne': COLONNES[numero]})
+                if len(meilleurs) == k:
+                    break
+            resultats.append(meilleurs)
+        return resultats[0] if unique else resultats
+
+
+if __name__ == "__main__":
+    dossier_script = os.path.dirname(os.path.abspath(__file__))
+    fichier_paires = os.getenv(
+        'RAG_PAIRES', os.path.join(dossier_script, '../agregation/translations_with_tags.json')
+    )
+    dossier_index = os.getenv('RAG_INDEX_TFIDF', os.path.join(dossier_script, 'index_tfidf'))
+    with open(fichier_paires, 'r', encoding='utf-8') as f:
+        paires = json.load(f)
+    construire_index(paires, dossier_index)
+
+    index = IndexTfidf(dossier_index)
+    for r in index.rechercher("chhal hada", k=3):
+        print(f"[{r['score']}] ({r['colonne']}) {r['paire']['source_text']} -> {r['paire']['target_text']}")
@@ -0,0 +1,289 @@
+'''Index vectoriel des paires enrichies pour le RAG : retrouve les paires (avec tags et
+contexte) les plus proches d'une phrase avant de demander la traduction au LLM.
+
+Structure d'un index (un dossier) :
+- manifeste.json : encodeur, dimension, type des vecteurs, directions et plages de tags
+- vecteurs.npy : matrice (n, dimension) en float16, ou int8 avec echelles.npy (n,)
+- directions.npy : numéro de direction (source_target) de chaque paire
+- tags_lignes.npy : numéros de lignes de chaque tag, concaténés (voir le manifeste)
+- paires.jsonl et positions.npy : paires au format JSON et position de chaque ligne
+
+Tous les tableaux sont ouverts en mémoire partagée (np.load(mmap_mode='r')) : l'ouverture
+ne lit pas les données, et plusieurs processus de l'API partagent les mêmes pages.'''
+
+import os
+import json
+import shutil
+import threading
+import time
+import numpy as np
+
+from embeddings import charger_encodeur
+
+# Nombre de lignes de la matrice traitées par produit matriciel
+TAILLE_BLOC = 65536
+
+
+def _ecrire_tableau(chemin, tableau):
+    np.save(chemin, np.ascontiguousarray(tableau))
+
+
+def ecrire_paires(dossier, paires):
+    """Écrit les paires dans paires.jsonl et la position de chaque ligne dans positions.npy"""
+    positions = np.zeros(len(paires), dtype=np.int64)
+    with open(os.path.join(dossier, 'paires.jsonl'), 'wb') as f:
+        for ligne, p in enumerate(paires):
+            positions[ligne] = f.tell()
+            f.write((json.dumps({
+                'source_lang': p['source_lang'],
+                'target_lang': p['target_lang'],
+                'source_text': p['source_text'],
+                'target_text': p['target_text'],
+                'tags': p.get('tags') or [],
+                'context': p.get('context') or '',
+            }, ensure_ascii=False) + '\n').encode('utf-8'))
+    _ecrire_tableau(os.path.join(dossier, 'positions.npy'), positions)
+
+
+class LecteurPaires:
+    """
+    Accès direct aux paires de paires.jsonl, par numéro de ligne.
+
+    Utilisable depuis plusieurs threads (asyncio.to_thread dans l'API) : chaque lecture est
+    un os.pread() à une position explicite, sans position de fichier partagée. Sans
+    os.pread (Windows), seek et read sont faits sous un verrou.
+    """
+
+    def __init__(self, dossier):
+        self.positions = np.load(os.path.join(dossier, 'positions.npy'), mmap_mode='r')
+        self._fichier = open(os.path.join(dossier, 'paires.jsonl'), 'rb')
+        self._taille = os.fstat(self._fichier.fileno()).st_size
+        self._verrou = threading.Lock()
+
+    def __getitem__(self, ligne):
+        debut = int(self.positions[ligne])
+        # La ligne s'arrête à la position de la suivante (ou à la fin du fichier)
+        fin = int(self.positions[ligne + 1]) if ligne + 1 < len(self.positions) else self._taille
+        if hasattr(os, 'pread'):
+            return json.loads(os.pread(self._fichier.fileno(), fin - debut, debut))
+        with self._verrou:
+            self._fichier.seek(debut)
+            return json.loads(self._fichier.read(fin - debut))
+
+    def close(self):
+        self._fichier.close()
+
+
+def remplacer_dossier(dossier_tmp, dossier):
+    """Remplace un index par celui construit dans dossier_tmp (deux renommages)"""
+    if os.path.exists(dossier):
+        os.replace(dossier, f"{dossier}.ancien")
+    os.replace(dossier_tmp, dossier)
+    shutil.rmtree(f"{dossier}.ancien", ignore_errors=True)
+
+
+def construire_index(paires, dossier, encodeur=None, type_vecteurs='float16', taille_lot=512):
+    """
+    Construit l'index vectoriel d'une liste de paires enrichies.
+
+    Args:
+        paires (list): Paires {source_lang, target_lang, source_text, target_text, tags, context}
+        dossier (str): Dossier de l'index, remplacé d'un bloc une fois la construction finie
+        encodeur: Encodeur (embeddings.py), par défaut charger_encodeur()
+        type_vecteurs (str): 'float16' ou 'int8' (quantification par ligne)
+        taille_lot (int): Nombre de textes encodés à la fois
+
+    Returns:
+        int: Nombre de paires indexées
+    """
+    if type_vecteurs not in ('float16', 'int8'):
+        raise ValueError(f"Type de vecteurs non supporté: {type_vecteurs}")
+    encodeur = encodeur or charger_encodeur()
+    paires = [p for p in paires if p.get('source_text') and p.get('target_text')]
+    dossier_tmp = f"{dossier}.tmp"
+    shutil.rmtree(dossier_tmp, ignore_errors=True)
+    os.makedirs(dossier_tmp)
+
+    # Vecteurs écrits lot par lot directement dans le fichier .npy
+    vecteurs = np.lib.format.open_memmap(
+        os.path.join(dossier_tmp, 'vecteurs.npy'), mode='w+',
+        dtype=np.dtype(type_vecteurs), shape=(len(paires), encodeur.dimension)
+    )
+    echelles = np.ones(len(paires), dtype=np.float32)
+    for debut in range(0, len(paires), taille_lot):
+        lot = encodeur.encoder([p['source_text'] for p in paires[debut:debut + taille_lot]])
+        if type_vecteurs == 'int8':
+            maximum = np.maximum(np.abs(lot).max(axis=1), 1e-12)
+            echelles[debut:debut + len(lot)] = maximum / 127.0
+            lot = np.round(lot / echelles[debut:debut + len(lot), None])
+        vecteurs[debut:debut + len(lot)] = lot
+    vecteurs.flush()
+    del vecteurs
+    if type_vecteurs == 'int8':
+        _ecrire_tableau(os.path.join(dossier_tmp, 'echelles.npy'), echelles)
+
+    directions = sorted({f"{p['source_lang']}_{p['target_lang']}" for p in paires})
+    numeros_directions = {d: i for i, d in enumerate(directions)}
+    _ecrire_tableau(os.path.join(dossier_tmp, 'directions.npy'), np.array(
+        [numeros_directions[f"{p['source_lang']}_{p['target_lang']}"] for p in paires], dtype=np.int16
+    ))
+
+    lignes_par_tag = {}
+    for ligne, p in enumerate(paires):
+        for tag in set(p.get('tags') or []):
+            lignes_par_tag.setdefault(tag, []).append(ligne)
+    plages_tags, lignes, debut = {}, [], 0
+    for tag in sorted(lignes_par_tag):
+        lignes.extend(lignes_par_tag[tag])
+        plages_tags[tag] = [debut, len(lignes)]
+        debut = len(lignes)
+    _ecrire_tableau(os.path.join(dossier_tmp, 'tags_lignes.npy'), np.array(lignes, dtype=np.int64))
+
+    ecrire_paires(dossier_tmp, paires)
+
+    with open(os.path.join(dossier_tmp, 'manifeste.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'encodeur': encodeur.nom,
+            'dimension': encodeur.dimension,
+            'type_vecteurs': type_vecteurs,
+            'nombre': len(paires),
+            'directions': directions,
+            'tags': plages_tags,
+            'construit_le': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }, f, ensure_ascii=False, indent=2)
+
+    remplacer_dossier(dossier_tmp, dossier)
+    print(f"Index vectoriel construit: {len(paires)} paires dans {dossier}")
+    return len(paires)
+
+
+class IndexVectoriel:
+    """Index vectoriel en lecture seule, ouvert en mémoire partagée."""
+
+    def __init__(self, dossier, encodeur=None):
+        self.dossier = dossier
+        with open(os.path.join(dossier, 'manifeste.json'), encoding='utf-8') as f:
+            self.manifeste = json.load(f)
+        self.encodeur = encodeur or charger_encodeur(self.manifeste['encodeur'])
+        if self.encodeur.nom != self.manifeste['encodeur']:
+            raise ValueError(
+                f"Encodeur {self.encodeur.nom} différent de celui de l'index ({self.manifeste['encodeur']})"
+            )
+
+        def ouvrir(nom):
+            return np.load(os.path.join(dossier, nom), mmap_mode='r')
+
+        self.vecteurs = ouvrir('vecteurs.npy')
+        self.echelles = ouvrir('echelles.npy') if self.manifeste['type_vecteurs'] == 'int8' else None
+        self.directions = ouvrir('directions.npy')
+        self.tags_lignes = ouvrir('tags_lignes.npy')
+        self.paires = LecteurPaires(dossier)
+
+    def __len__(self):
+        return self.manifeste['nombre']
+
+    def close(self):
+        self.paires.close()
+
+    def _lignes_candidates(self, direction=None, tags=None):
+        """
+        Lignes respectant les pré-filtres (None si aucun filtre) : direction 'fr_dr' et
+        tags, tous requis.
+        """
+        lignes = None
+        if direction is not None:
+            if direction not in self.manifeste['directions']:
+                return np.empty(0, dtype=np.int64)
+            numero = self.manifeste['directions'].index(direction)
+            lignes = np.flatnonzero(self.directions == numero)
+        for tag in tags or []:
+            plage = self.manifeste['tags'].get(tag)
+            if plage is None:
+                return np.empty(0, dtype=np.int64)
+            lignes_tag = np.asarray(self.tags_lignes[plage[0]:plage[1]])
+            lignes = lignes_tag if lignes is None else np.intersect1d(lignes, lignes_tag, assume_unique=True)
+        return lignes
+
+    def _scores(self, bloc, requetes, echelles=None):
+        scores = np.asarray(bloc, dtype=np.float32) @ requetes.T
+        if echelles is not None:
+            scores *= np.asarray(echelles, dtype=np.float32)[:, None]
+        return scores
+
+    def rechercher_vecteurs(self, requetes, k=5, direction=None, tags=None):
+        """
+        Top-k des lignes les plus proches (produit scalaire) de chaque vecteur requête.
+
+        Returns:
+            tuple: (lignes, scores), deux tableaux (nombre de requêtes, k') avec k' <= k
+        """
+        requetes = np.asarray(requetes, dtype=np.float32)
+        candidates = self._lignes_candidates(direction, tags)
+        nombre = len(self) if candidates is None else len(candidates)
+        k = min(k, nombre)
+        if k == 0:
+            return np.empty((len(requetes), 0), dtype=np.int64), np.empty((len(requetes), 0), dtype=np.float32)
+
+        meilleures_lignes = np.empty((len(requetes), 0), dtype=np.int64)
+        meilleurs_scores = np.empty((len(requetes), 0), dtype=np.float32)
+        for debut in range(0, nombre, TAILLE_BLOC):
+            if candidates is None:
+                lignes = np.arange(debut, min(debut + TAILLE_BLOC, nombre))
+                bloc = self.vecteurs[debut:debut + TAILLE_BLOC]
+                echelles = None if self.echelles is None else self.echelles[debut:debut + TAILLE_BLOC]
+            else:
+                lignes = candidates[debut:debut + TAILLE_BLOC]
+                bloc = self.vecteurs[lignes]
+                echelles = None if self.echelles is None else self.echelles[lignes]
+            scores = self._scores(bloc, requetes, echelles).T  # (requêtes, lignes du bloc)
+
+            # Fusion du top-k courant et du top-k du bloc
+            k_bloc = min(k, scores.shape[1])
+            top = np.argpartition(-scores, k_bloc - 1, axis=1)[:, :k_bloc]
+            meilleures_lignes = np.concatenate([meilleures_lignes, lignes[top]], axis=1)
+            meilleurs_scores = np.concatenate([meilleurs_scores, np.take_along_axis(scores, top, axis=1)], axis=1)
+            if meilleurs_scores.shape[1] > k:
+                garder = np.argpartition(-meilleurs_scores, k - 1, axis=1)[:, :k]
+                meilleures_lignes = np.take_along_axis(meilleures_lignes, garder, axis=1)
+                meilleurs_scores = np.take_along_axis(meilleurs_scores, garder, axis=1)
+
+        ordre = np.argsort(-meilleurs_scores, axis=1)
+        return np.take_along_axis(meilleures_lignes, ordre, axis=1), np.take_along_axis(meilleurs_scores, ordre, axis=1)
+
+    def rechercher(self, textes, k=5, direction=None, tags=None):
+        """
+        Recherche les paires enrichies les plus proches de chaque texte.
+
+        Args:
+            textes (list | str): Phrase(s) à traduire, encodées en un seul lot
+            k (int): Nombre de paires par texte
+            direction (str): Pré-filtre sur la direction, par exemple 'fr_dr'
+            tags (list): Pré-filtre, tags que les paires doivent toutes porter
+
+        Returns:
+            list: Pour chaque texte, liste de {"paire": ..., "score": ...} (une seule liste si
+                textes est une chaîne)
+        """
+        unique = isinstance(textes, str)
+        textes = [textes] if unique else list(textes)
+        lignes, scores = self.rechercher_vecteurs(self.encodeur.encoder(textes), k, direction, tags)
+        resultats = [
+            [{'paire': self.paires[l], 'score': round(float(s), 4)} for l, s in zip(lignes_texte, scores_texte)]
+            for lignes_texte, scores_texte in zip(lignes, scores)
+        ]
+        return resultats[0] if unique else resultats
+
+
+if __name__ == "__main__":
+    dossier_script = os.path.dirname(os.path.abspath(__file__))
+    fichier_paires = os.getenv(
+        'RAG_PAIRES', os.path.join(dossier_script, '../agregation/translations_with_tags.json')
+    )
+    dossier_index = os.getenv('RAG_INDEX', os.path.join(dossier_script, 'index_vectoriel'))
+    with open(fichier_paires, 'r', encoding='utf-8') as f:
+        paires = json.load(f)
+    construire_index(paires, dossier_index, type_vecteurs=os.getenv('RAG_TYPE_VECTEURS', 'float16'))
+
+    index = IndexVectoriel(dossier_index)
+    for r in index.rechercher("Que penses-tu des pommes de terre ?", k=3, direction='fr_dr'):
+        print(f"[{r['score']}] {r['paire']['source_text']} -> {r['paire']['target_text']} {r['paire']['tags']}")
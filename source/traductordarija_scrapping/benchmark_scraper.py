@@ -0,0 +1,162 @@
+'''Benchmark du scraper contre le traducteur local (traducteur_local.py).
+
+Chaque configuration traduit le même lot de phrases issues des fichiers Excel de
+questions, comme traduire_phrases_excel, puis le débit (phrases/minute), la latence
+p95 par phrase et le nombre de nouvelles tentatives sont comparés.'''
+
+import asyncio
+import json
+import math
+import os
+import tempfile
+import time
+import pandas as pd
+from playwright.sync_api import sync_playwright
+
+from scrapping import ouvrir_navigateur, configurer_page_traduction, traduire_texte_dans_page
+from scrapping_async import traduire_phrases_async
+from stockage_traductions import StockageTraductions
+from traducteur_local import demarrer_serveur
+
+# Configurations comparées : moteur et options du scraper
+CONFIGURATIONS = {
+    "sync_dom": {"moteur": "sync", "mode_extraction": "dom"},
+    "sync_reseau": {"moteur": "sync", "mode_extraction": "reseau"},
+    "async_4_pages": {"moteur": "async", "nb_pages": 4},
+    "async_8_pages": {"moteur": "async", "nb_pages": 8},
+}
+
+# Comportement du traducteur local pendant le benchmark
+PARAMETRES_SERVEUR = {"latence": 0.5, "gigue": 0.2, "taux_echec": 0.05, "delai_affichage": 300, "graine": 42}
+
+
+def percentile(valeurs, p):
+    """
+    Calcule le percentile p (0-100) d'une liste de valeurs (méthode du rang le plus proche).
+
+    Args:
+        valeurs (list): Les valeurs mesurées
+        p (float): Le percentile souhaité
+
+    Returns:
+        float: La valeur du percentile, 0.0 si la liste est vide
+    """
+    if not valeurs:
+        return 0.0
+    valeurs = sorted(valeurs)
+    rang = max(1, math.ceil(p / 100 * len(valeurs)))
+    return valeurs[rang - 1]
+
+
+def charger_phrases(chemin_fichier_excel, nb_phrases):
+    """
+    Charge les premières phrases d'un fichier Excel de questions.
+
+    Args:
+        chemin_fichier_excel (str): Chemin vers le fichier Excel
+        nb_phrases (int): Nombre de phrases à charger
+
+    Returns:
+        list: Les phrases, sans doublons
+    """
+    df = pd.read_excel(chemin_fichier_excel)
+    phrases = [str(p).strip() for p in df['Questions ou Affirmations'] if str(p).strip()]
+    return list(dict.fromkeys(phrases))[:nb_phrases]
+
+
+def executer_sync(phrases, url_base, dossier, source_lang="fr", mode_extraction="reseau"):
+    """
+    Traduit les phrases avec le moteur synchrone, une page à la fois.
+
+    Returns:
+        dict: Statistiques d'exécution (traduites, echecs, latences)
+    """
+    statistiques = {"traduites": 0, "echecs": 0, "latences": []}
+    fichier_session = os.path.join(dossier, "session.json")
+    with sync_playwright() as p:
+        browser, page = ouvrir_navigateur(p, url_base, fichier_session=fichier_session)
+        if not configurer_page_traduction(page, url_base, source_lang, fichier_session):
+            browser.close()
+            raise Exception("Échec de la configuration de la page")
+        for phrase in phrases:
+            debut = time.perf_counter()
+            traduction = traduire_texte_dans_page(page, phrase, source_lang=source_lang,
+                                                  mode_extraction=mode_extraction,
+                                                  fichier_session=fichier_session, url_base=url_base)
+            statistiques["latences"].append(time.perf_counter() - debut)
+            statistiques["traduites" if traduction else "echecs"] += 1
+        browser.close()
+    return statistiques
+
+
+def executer_configuration(nom, configuration, phrases, source_lang="fr"):
+    """
+    Exécute une configuration contre un traducteur local neuf et mesure ses performances.
+
+    Args:
+        nom (str): Nom de la configuration
+        configuration (dict): Moteur et options du scraper
+        phrases (list): Les phrases à traduire
+        source_lang (str): La langue source
+
+    Returns:
+        dict: Résultats (phrases_par_minute, latence_p50, latence_p95, tentatives_supplementaires...)
+    """
+    print(f"\n⏱️ Configuration {nom}")
+    serveur, url_base = demarrer_serveur(**PARAMETRES_SERVEUR)
+    try:
+        with tempfile.TemporaryDirectory() as dossier:
+            debut = time.perf_counter()
+            if configuration["moteur"] == "sync":
+                stats = executer_sync(phrases, url_base, dossier, source_lang, configuration["mode_extraction"])
+            else:
+                stockage = StockageTraductions(os.path.join(dossier, "translations.jsonl"))
+                stats = asyncio.run(traduire_phrases_async(
+                    phrases, stockage, source_lang, configuration["nb_pages"], url_base=url_base,
+                    fichier_session=os.path.join(dossier, "session.json"), delai=100,
+                ))
+            duree = time.perf_counter() - debut
+    finally:
+        serveur.shutdown()
+
+    requetes = serveur.statistiques["requetes_traduction"]
+    return {
+        "configuration": nom,
+        "phrases": len(phrases),
+        "traduites": stats["traduites"],
+        "echecs": stats["echecs"],
+        "duree_s": round(duree, 2),
+        "phrases_par_minute": round(stats["traduites"] / duree * 60, 1) if duree else 0.0,
+        "latence_p50_s": round(percentile(stats["latences"], 50), 3),
+        "latence_p95_s": round(percentile(stats["latences"], 95), 3),
+        # Chaque appel à l'API au-delà du premier par phrase est une nouvelle tentative
+        "tentatives_supplementaires": max(0, requetes - len(phrases)),
+        "erreurs_serveur": serveur.statistiques["echecs_injectes"],
+        "connexions": serveur.statistiques["connexions"],
+    }
+
+
+def afficher_resultats(resultats):
+    """Affiche le tableau comparatif des configurations."""
+    print(f"\n{'Configuration':<16}{'phrases/min':>12}{'p50 (s)':>10}{'p95 (s)':>10}{'retries':>9}{'échecs':>8}")
+    for r in resultats:
+        print(f"{r['configuration']:<16}{r['phrases_par_minute']:>12}{r['latence_p50_s']:>10}"
+              f"{r['latence_p95_s']:>10}{r['tentatives_supplementaires']:>9}{r['echecs']:>8}")
+
+
+if __name__ == "__main__":
+    dossier_script = os.path.dirname(os.path.abspath(__file__))
+    fichier_excel = os.path.join(dossier_script, "../agregation/data_synthetique/questions_fr.xlsx")
+    nb_phrases = int(os.getenv("BENCH_NB_PHRASES", "20"))
+    # BENCH_CONFIGURATIONS=sync_reseau,async_8_pages pour ne lancer qu'une partie des configurations
+    noms = os.getenv("BENCH_CONFIGURATIONS", ",".join(CONFIGURATIONS)).split(",")
+
+    phrases = charger_phrases(fichier_excel, nb_phrases)
+    print(f"📊 Benchmark sur {len(phrases)} phrases, serveur : {PARAMETRES_SERVEUR}")
+    resultats = [executer_configuration(nom, CONFIGURATIONS[nom], phrases) for nom in noms]
+    afficher_resultats(resultats)
+
+    fichier_resultats = os.path.join(dossier_script, "benchmark_resultats.json")
+    with open(fichier_resultats, "w", encoding="utf-8") as f:
+        json.dump({"serveur": PARAMETRES_SERVEUR, "resultats": resultats}, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Résultats sauvegardés dans {fichier_resultats}")
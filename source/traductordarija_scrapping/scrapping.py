@@ -1,184 +1,228 @@
 from playwright.sync_api import sync_playwright
-import json
+import sys
 import time
 import os
+from urllib.parse import urlparse
 import pandas as pd
+from stockage_traductions import StockageTraductions
+
+
+# Sélecteur du champ de saisie du traducteur
+TEXTAREA_SELECTOR = "textarea.pl-1.w-full.bg-white.outline-none.overflow-hidden.pt-2.resize-none.min-h-28.sm\\:min-h-48"
+# Fragment d'URL de l'appel à l'API de traduction (interception réseau)
+MOTIF_URL_TRADUCTION = "translat"
+# Clés examinées en priorité dans la réponse JSON du traducteur
+CLES_TRADUCTION = ("translation", "translatedText", "translated_text", "result", "output", "target", "text", "data")
+# Types de ressources inutiles au scraping, bloqués en mode production
+TYPES_RESSOURCES_BLOQUES = {"image", "media", "font", "stylesheet"}
+# Liste blanche de domaines (séparés par des virgules) en mode production : si elle est
+# définie, les requêtes vers d'autres domaines que le site et ceux-ci sont bloquées ;
+# sinon seul le type de ressource compte
+DOMAINES_AUTORISES = (
+    [d.strip().lower() for d in os.environ["SCRAPER_DOMAINES_AUTORISES"].split(",") if d.strip()]
+    if "SCRAPER_DOMAINES_AUTORISES" in os.environ else None
+)
+# Menu déroulant affichant la langue source
+XPATH_MENU_LANGUE = "xpath=/html/body/div/div[2]/div[2]/div[1]/div[1]"
+# Bouton affiché dans l'en-tête aux visiteurs non connectés
+SELECTEUR_BOUTON_CONNEXION = "header button:has-text('Se connecter')"
+# Marqueurs de l'en-tête d'un utilisateur connecté (menu du compte, avatar)
+SELECTEUR_MARQUEUR_CONNECTE = "header :is(a[href*='compte'], a[href*='profil'], button:has-text('Mon compte'), img[alt*='avatar' i])"
+# Fragments du nom des cookies de session du site
+NOMS_COOKIES_SESSION = ("session", "token", "auth")
+# État authentifié (cookies, localStorage) réutilisé entre les tentatives et les exécutions
+FICHIER_SESSION = os.path.join(os.path.dirname(os.path.abspath(__file__)), "session_traducteur.json")
+# Variables d'environnement contenant les identifiants du compte du site
+VARIABLE_EMAIL = "SCRAPER_EMAIL"
+VARIABLE_MOT_DE_PASSE = "SCRAPER_MOT_DE_PASSE"
+
+
+def identifiants_connexion():
+    """
+    Lit les identifiants du compte dans l'environnement (SCRAPER_EMAIL, SCRAPER_MOT_DE_PASSE).
 
+    Returns:
+        tuple: (email, mot de passe)
 
-def traduire_texte_traductordarija(phrase, url_base="https://www.learnmoroccan.com/fr"):
-    print(f"Tentative de traduction de : '{phrase}'")
-    traduction_arabe = None
+    Raises:
+        RuntimeError: Si l'une des deux variables n'est pas définie
+    """
+    email = os.getenv(VARIABLE_EMAIL)
+    mot_de_passe = os.getenv(VARIABLE_MOT_DE_PASSE)
+    if not email or not mot_de_passe:
+        raise RuntimeError(f"Identifiants manquants : définir {VARIABLE_EMAIL} et {VARIABLE_MOT_DE_PASSE}")
+    return email, mot_de_passe
 
-    try:
-        with sync_playwright() as p:
-            print("Lancement du navigateur Chromium...")
-            browser = p.chromium.launch(
-                headless=False,    # Mode visible pour déboguer
-                args=['--start-maximized']  # Démarrer en plein écran
-            )
-            page = browser.new_page(viewport={"width": 1920, "height": 1080})  # Définir une résolution HD
-
-            # Commencer par la page d'accueil pour la connexion
-            print("Accès à la page d'accueil pour connexion...")
-            page.goto(url_base)
-            page.wait_for_timeout(2000)
 
-            # Se connecter
-            print("Tentative de connexion...")
-            if not se_connecter(page):
-                print("La connexion a échoué, tentative de continuer quand même...")
+def est_domaine_autorise(url, domaines_autorises):
+    """
+    Indique si l'URL appartient à l'un des domaines autorisés (sous-domaines compris).
 
-            # Rediriger vers la page du traducteur
-            url_traducteur = f"{url_base}/translator"
-            print(f"Accès à la page du traducteur : {url_traducteur}")
-            page.goto(url_traducteur)
-            page.wait_for_timeout(2000)
-            print("Page du traducteur chargée")
+    Args:
+        url (str): L'URL de la requête
+        domaines_autorises (iterable): Domaines autorisés, par ex. 'learnmoroccan.com'
 
-            # Gérer le bouton initial inversion de langue
-            try:
-                print("Vérification de la présence du bouton initial d'inversion de langue...")
-                bouton_selector = "button.shadow-md.shadow-\\[rgba\\(0\\,0\\,0\\,0\\.01\\)\\].border.border-\\[\\#ECECEC\\].mx-2.p-\\[17px\\].rounded-2xl.bg-white.hover\\:bg-lighter.duration-150[aria-label='échanger les langues'][title='échanger les langues']"
-                page.wait_for_selector(bouton_selector, state="visible", timeout=5000)
-                print("Bouton initial détecté, clic sur le bouton...")
-                page.locator(bouton_selector).click()
-                print("Bouton initial cliqué")
-                page.wait_for_timeout(1000)
-            except Exception as e:
-                print(f"Erreur lors de la gestion du bouton initial : {e}, poursuite du script")
+    Returns:
+        bool: True si la requête vise le site lui-même, False pour un domaine tiers
+    """
+    hote = urlparse(url).hostname
+    if not hote:
+        # data:, blob:, about: ... ne sortent pas du navigateur
+        return True
+    return any(hote == d or hote.endswith("." + d) for d in domaines_autorises)
 
-            # Sélectionner la langue française depuis le menu déroulant
-            print("Gestion du menu déroulant de sélection de langue...")
-            print("Ouverture du menu déroulant de langues...")
-            page.locator("xpath=/html/body/div/div[2]/div[2]/div[1]/div[1]").click()
-            page.wait_for_timeout(1000)
-            print("Menu déroulant ouvert")
-            print("Sélection de la langue française dans le menu...")
-            page.locator("div:has-text('Français'):not(:has(div:has-text('Français')))").first.click()
-            print("Langue française sélectionnée")
-            page.wait_for_timeout(1000)
 
-            # Activer le bouton toggle
-            print("Activation du bouton toggle...")
-            page.locator("xpath=/html/body/div/div[2]/div[3]/div/label/div/div").click()
-            print("Bouton toggle activé")
-            page.wait_for_timeout(1000)
+def domaines_du_site(url_base, domaines_autorises=()):
+    """
+    Retourne les domaines autorisés pour un site : son hôte (sans 'www.') et les extras.
 
-            # Entrer le texte à traduire
-            print(f"Saisie du texte : '{phrase}'")
-            page.fill("textarea.pl-1.w-full.bg-white.outline-none.overflow-hidden.pt-2.resize-none.min-h-28.sm\\:min-h-48", phrase)
-            page.wait_for_timeout(1000)
+    L'hôte est gardé tel quel plutôt que réduit à ses deux derniers niveaux, qui seraient
+    faux pour une adresse IP, localhost ou un domaine en co.uk ; les sous-domaines de
+    l'hôte restent autorisés (voir est_domaine_autorise).
 
-            # Cliquer sur le bouton de traduction
-            print("Clic sur le bouton de traduction")
-            try:
-                # Attendre que le bouton soit cliquable
-                page.wait_for_selector("xpath=/html/body/div/div[2]/button", state="visible", timeout=5000)
-                # Attendre un peu avant de cliquer pour s'assurer que la page est prête
-                page.wait_for_timeout(2000)
-                # Cliquer sur le bouton avec JavaScript pour éviter les problèmes de navigation
-                page.evaluate("document.querySelector('button.font-normal.shadow-sm').click()")
-                print("✅ Bouton de traduction cliqué")
-                # Attendre plus longtemps après le clic pour laisser le temps à la traduction de s'initialiser
-                page.wait_for_timeout(5000)
-            except Exception as e:
-                print(f"❌ Erreur lors du clic sur le bouton de traduction : {e}")
-                return None
-            
-            print("Attente de 8 secondes pour laisser le temps au site de traiter la demande...")
-            page.wait_for_timeout(8000)  # 8 secondes d'attente
+    Args:
+        url_base (str): L'URL du site, par ex. 'https://www.learnmoroccan.com/fr'
+        domaines_autorises (iterable): Domaines supplémentaires à laisser passer
 
-            # Récupérer directement la traduction en arabe
-            print("Récupération directe de la traduction en arabe...")
+    Returns:
+        set: Domaines autorisés, par ex. {'learnmoroccan.com'}
+    """
+    hote = urlparse(url_base).hostname or ""
+    if hote.startswith("www."):
+        hote = hote[len("www."):]
+    return {hote, *domaines_autorises}
 
-            script_xpath_exact = """
-            () => {
-                try {
-                    const xpath = "/html/body/div/div[2]/div[4]/p[2]";
-                    const result = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
-                    return result ? result.textContent : null;
-                } catch (e) {
-                    return "Erreur: " + e.message;
-                }
-            }
-            """
-            traduction_arabe = page.evaluate(script_xpath_exact)
 
-            if traduction_arabe and not traduction_arabe.startswith("Erreur:") and traduction_arabe != "Marocain":
-                print(f"Traduction trouvée avec le XPath exact : {traduction_arabe}")
-            else:
-                print(f"Le XPath exact a retourné : {traduction_arabe}")
-                traduction_arabe = None
-
-                print("Tentative avec d'autres approches...")
-                html_content = page.content()
-                with open("page_debug.html", "w", encoding="utf-8") as f:
-                    f.write(html_content)
-                print("HTML de la page sauvegardé pour analyse")
-
-                script_all_paragraphs = """
-                () => {
-                    const paragraphs = Array.from(document.querySelectorAll('p'));
-                    return paragraphs.map((p, index) => {
-                        return {
-                            index: index,
-                            text: p.textContent,
-                            hasArabic: Array.from(p.textContent).some(c => c.charCodeAt(0) >= 0x0600 && c.charCodeAt(0) <= 0x06FF)
-                        };
-                    });
-                }
-                """
-                all_paragraphs = page.evaluate(script_all_paragraphs)
-                for p in all_paragraphs:
-                    if p["hasArabic"] and p["text"] != "Marocain":
-                        traduction_arabe = p["text"]
-                        print(f"Traduction en arabe trouvée (paragraphe {p['index']}): {traduction_arabe}")
-                        break
-
-                if not traduction_arabe:
-                    print("Aucune traduction trouvée dans l'analyse des paragraphes, essai avec d'autres XPath...")
-                    xpath_options = [
-                        "/html/body/div/div[2]/div[4]/p[1]",
-                        "//div[contains(@class, 'mt-4')]/p[1]",
-                        "//div[contains(@class, 'mt-4')]/p[2]"
-                    ]
-                    for xpath in xpath_options:
-                        script_xpath = f"""
-                        () => {{
-                            try {{
-                                const xpath = "{xpath}";
-                                const result = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
-                                return result ? result.textContent : null;
-                            }} catch (e) {{
-                                return "Erreur: " + e.message;
-                            }}
-                        }}
-                        """
-                        result = page.evaluate(script_xpath)
-                        if result and not result.startswith("Erreur:") and result != "Marocain" and any(ord(c) >= 0x0600 and ord(c) <= 0x06FF for c in result):
-                            traduction_arabe = result
-                            print(f"Traduction en arabe trouvée via XPath {xpath}: {traduction_arabe}")
-                            break
-                        else:
-                            print(f"XPath {xpath} a retourné: {result}")
-
-            print("Finalisation de la traduction")
-            browser.close()
-            return traduction_arabe
+def doit_bloquer_requete(requete, domaines=None, types_bloques=TYPES_RESSOURCES_BLOQUES,
+                         motif_url=MOTIF_URL_TRADUCTION):
+    """
+    Indique si une requête doit être bloquée : ressource non essentielle, ou domaine hors
+    de la liste blanche quand elle est configurée. L'appel à l'API de traduction n'est
+    jamais bloqué, quel que soit son hôte, pour que sa réponse puisse être interceptée.
+
+    Args:
+        requete: La requête Playwright interceptée
+        domaines (set): Domaines autorisés (voir domaines_du_site), None pour ne pas filtrer les domaines
+        types_bloques (set): Types de ressources Playwright à bloquer
+        motif_url (str): Fragment d'URL identifiant l'appel de traduction
+
+    Returns:
+        bool: True si la requête doit être annulée
+    """
+    if requete.resource_type in types_bloques:
+        return True
+    if requete.resource_type in ("xhr", "fetch") and motif_url in requete.url.lower():
+        return False
+    return domaines is not None and not est_domaine_autorise(requete.url, domaines)
+
+
+def bloquer_ressources(context, url_base, types_bloques=TYPES_RESSOURCES_BLOQUES, domaines_autorises=DOMAINES_AUTORISES):
+    """
+    Bloque les ressources non essentielles (images, polices, feuilles de style...) du
+    contexte et, si une liste blanche est donnée, les requêtes vers des domaines tiers
+    (analytics, publicités).
+
+    Args:
+        context: Le contexte de navigateur Playwright
+        url_base (str): L'URL du site, dont le domaine reste autorisé
+        types_bloques (set): Types de ressources Playwright à bloquer
+        domaines_autorises (iterable): Domaines supplémentaires à laisser passer, None pour ne pas filtrer les domaines
+    """
+    domaines = None if domaines_autorises is None else domaines_du_site(url_base, domaines_autorises)
+
+    def filtrer(route):
+        if doit_bloquer_requete(route.request, domaines, types_bloques):
+            route.abort()
+        else:
+            route.continue_()
+
+    context.route("**/*", filtrer)
+
+
+def ouvrir_navigateur(p, url_base="https://www.learnmoroccan.com/fr", mode_debug=False, fichier_session=FICHIER_SESSION):
+    """
+    Lance Chromium et ouvre une page selon le profil choisi.
+
+    En mode debug, le navigateur est visible en plein écran et charge toutes les ressources.
+    En mode production, il tourne sans interface et ne charge que le strict nécessaire.
+
+    Args:
+        p: L'instance sync_playwright
+        url_base (str): L'URL de base du site
+        mode_debug (bool): True pour le profil visible de débogage
+        fichier_session (str): Session sauvegardée à recharger si elle existe
+
+    Returns:
+        tuple: (browser, page)
+    """
+    options_contexte = {}
+    if fichier_session and os.path.exists(fichier_session):
+        print(f"♻️ Chargement de la session sauvegardée : {fichier_session}")
+        options_contexte["storage_state"] = fichier_session
+    print(f"Lancement du navigateur Chromium ({'debug' if mode_debug else 'production'})...")
+    if mode_debug:
+        browser = p.chromium.launch(
+            headless=False,    # Mode visible pour déboguer
+            args=['--start-maximized']  # Démarrer en plein écran
+        )
+        context = browser.new_context(viewport={"width": 1920, "height": 1080}, **options_contexte)  # Définir une résolution HD
+    else:
+        browser = p.chromium.launch(
+            headless=True,
+            args=['--disable-gpu', '--disable-dev-shm-usage', '--disable-extensions']
+        )
+        context = browser.new_context(viewport={"width": 1280, "height": 800}, **options_contexte)
+        bloquer_ressources(context, url_base)
+    return browser, context.new_page()
+
+
+def traduire_texte_traductordarija(phrase, url_base="https://www.learnmoroccan.com/fr", mode_debug=False,
+                                   source_lang="fr", mode_extraction="reseau"):
+    """
+    Traduit une seule phrase dans un navigateur ouvert pour l'occasion.
+
+    Même chemin que traduire_phrases_excel : configuration de la page (session réutilisée
+    si possible) puis traduire_texte_dans_page, qui lit la traduction dans la réponse de
+    l'API du traducteur et n'analyse le DOM qu'en repli.
+
+    Args:
+        phrase (str): La phrase à traduire
+        url_base (str): L'URL de base du site
+        mode_debug (bool): True pour un navigateur visible chargeant toutes les ressources
+        source_lang (str): La langue source ('fr' pour français, 'en' pour anglais)
+        mode_extraction (str): 'reseau' (interception de la réponse) ou 'dom' (analyse de la page)
+
+    Returns:
+        str: La traduction en arabe ou None si échec
+    """
+    print(f"Tentative de traduction de : '{phrase}'")
+    try:
+        with sync_playwright() as p:
+            browser, page = ouvrir_navigateur(p, url_base, mode_debug=mode_debug)
+            try:
+                if not configurer_page_traduction(page, url_base, source_lang, FICHIER_SESSION):
+                    print("❌ Échec de la configuration de la page")
+                    return None
+                return traduire_texte_dans_page(page, phrase, source_lang=source_lang,
+                                                mode_extraction=mode_extraction, url_base=url_base)
+            finally:
+                browser.close()
     except Exception as e:
         print(f"Erreur lors de la traduction : {e}")
         return None
 
 
-def sauvegarder_traduction_json(phrase, traduction_arabe, source_lang="fr", fichier_json="translations.json"):
+def sauvegarder_traduction(stockage, phrase, traduction_arabe, source_lang="fr", origine=None):
     """
-    Sauvegarde la traduction dans un fichier JSON structuré.
+    Ajoute la traduction au stockage append-only (une ligne JSONL, sans réécrire le fichier).
     
     Args:
+        stockage (StockageTraductions): Le stockage des traductions
         phrase (str): La phrase à traduire
         traduction_arabe (str): La traduction en caractères arabes
         source_lang (str): La langue source ('fr' pour français, 'en' pour anglais)
-        fichier_json (str): Le chemin du fichier JSON où sauvegarder les traductions
+        origine (str): Provenance si la traduction ne vient pas du site ('memoire' pour une
+            reprise de la mémoire de traduction) ; absente pour une traduction scrapée
     """
     nouvelle_traduction = {
         "source_lang": source_lang,
@@ -186,22 +230,17 @@ def sauvegarder_traduction_json(phrase, traduction_arabe, source_lang="fr", fich
         "target_lang": "darija",
         "target": traduction_arabe if traduction_arabe else "Traduction non disponible"
     }
-    try:
-        with open(fichier_json, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        data = {"translations": []}
-
-    data["translations"].append(nouvelle_traduction)
-
-    with open(fichier_json, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    print(f"Traduction sauvegardée dans {fichier_json}")
+    if origine:
+        nouvelle_traduction["origine"] = origine
+    if stockage.ajouter(nouvelle_traduction):
+        print(f"Traduction sauvegardée dans {stockage.fichier_jsonl}")
+    else:
+        print("Traduction déjà présente dans le stockage (ajoutée par un autre scraper)")
 
 
 def se_connecter(page):
     """
-    Effectue la connexion sur le site avec les identifiants fournis.
+    Effectue la connexion sur le site avec les identifiants lus dans l'environnement.
     
     Args:
         page: L'instance de page Playwright
@@ -210,14 +249,15 @@ def se_connecter(page):
         bool: True si la connexion a réussi, False sinon
     """
     try:
+        email, mot_de_passe = identifiants_connexion()
         print("Clic sur le bouton 'Se connecter'...")
         page.locator("xpath=/html/body/header/div/div[2]/div/a[2]/button").click()
         page.wait_for_timeout(2000)
         print("Saisie de l'identifiant...")
-        page.locator("xpath=/html/body/section[1]/div/form/div[1]/input").fill("faridigouti@gmail.com")
+        page.locator("xpath=/html/body/section[1]/div/form/div[1]/input").fill(email)
         page.wait_for_timeout(1000)
         print("Saisie du mot de passe...")
-        page.locator("xpath=/html/body/section[1]/div/form/div[2]/input").fill("34635263")
+        page.locator("xpath=/html/body/section[1]/div/form/div[2]/input").fill(mot_de_passe)
         page.wait_for_timeout(1000)
         print("Clic sur le bouton de validation...")
         page.locator("xpath=/html/body/section[1]/div/form/button").click()
@@ -228,28 +268,118 @@ def se_connecter(page):
         return False
 
 
-def configurer_page_traduction(page, url_base="https://www.learnmoroccan.com/fr", source_lang="fr"):
+def a_cookie_de_session(cookies, noms=NOMS_COOKIES_SESSION):
+    """
+    Indique si l'un des cookies du site est un cookie de session non expiré.
+
+    Args:
+        cookies (list): Cookies du contexte Playwright (context.cookies(url))
+        noms (iterable): Fragments de nom identifiant un cookie de session
+
+    Returns:
+        bool: True si un cookie de session est présent
+    """
+    maintenant = time.time()
+    return any(
+        any(nom in cookie["name"].lower() for nom in noms)
+        and (cookie.get("expires", -1) < 0 or cookie["expires"] > maintenant)
+        for cookie in cookies
+    )
+
+
+def est_connecte(page):
+    """
+    Indique si la session courante est authentifiée.
+
+    Le bouton 'Se connecter' signale une session absente ; sinon il faut un signe positif :
+    un marqueur de l'utilisateur connecté dans l'en-tête (menu du compte, avatar) ou un
+    cookie de session. Sans aucun de ces signes (page incomplète, sélecteurs obsolètes),
+    la session est considérée comme absente et la connexion est relancée.
+    
+    Args:
+        page: L'instance de page Playwright
+    
+    Returns:
+        bool: True si l'utilisateur est déjà connecté
+    """
+    try:
+        if page.locator(SELECTEUR_BOUTON_CONNEXION).count():
+            return False
+        if page.locator(SELECTEUR_MARQUEUR_CONNECTE).count():
+            return True
+        return a_cookie_de_session(page.context.cookies(page.url))
+    except Exception:
+        return False
+
+
+def sauvegarder_session(page, fichier_session):
+    """
+    Enregistre l'état authentifié (cookies et localStorage) du contexte pour le réutiliser
+    lors des tentatives et des exécutions suivantes.
+    
+    Args:
+        page: L'instance de page Playwright
+        fichier_session (str): Chemin du fichier d'état de session
+    """
+    if not fichier_session:
+        return
+    try:
+        page.context.storage_state(path=fichier_session)
+        print(f"💾 Session sauvegardée dans {fichier_session}")
+    except Exception as e:
+        print(f"Erreur lors de la sauvegarde de la session : {e}")
+
+
+def selectionner_langue(page, source_lang="fr"):
+    """
+    Sélectionne la langue source dans le menu déroulant du traducteur.
+    
+    Args:
+        page: L'instance de page Playwright
+        source_lang: La langue source ('fr' pour français, 'en' pour anglais)
+    """
+    langue = "Français" if source_lang == "fr" else "Anglais"
+    print(f"Sélection de la langue {langue}...")
+    page.locator(XPATH_MENU_LANGUE).click()
+    page.wait_for_timeout(1000)
+    page.locator(f"div:has-text('{langue}'):not(:has(div:has-text('{langue}')))").first.click()
+    print(f"Langue {langue} sélectionnée")
+    page.wait_for_timeout(1000)
+
+
+def configurer_page_traduction(page, url_base="https://www.learnmoroccan.com/fr", source_lang="fr",
+                               fichier_session=FICHIER_SESSION):
     """
     Configure la page pour la traduction (connexion et paramètres initiaux).
+
+    Si le contexte a été ouvert avec une session sauvegardée encore valide, la connexion
+    est sautée et la page du traducteur est ouverte directement.
     
     Args:
         page: L'instance de page Playwright
         url_base: L'URL de base du site
         source_lang: La langue source ('fr' pour français, 'en' pour anglais)
+        fichier_session: Fichier où sauvegarder la session après connexion (None pour désactiver)
     
     Returns:
         bool: True si la configuration a réussi, False sinon
     """
     try:
-        print("Accès à la page d'accueil pour connexion...")
-        page.goto(url_base)
-        page.wait_for_timeout(2000)
-        if not se_connecter(page):
-            return False
         url_traducteur = f"{url_base}/translator"
         print(f"Accès à la page du traducteur : {url_traducteur}")
         page.goto(url_traducteur)
         page.wait_for_timeout(2000)
+        if est_connecte(page):
+            print("✅ Session existante réutilisée, connexion inutile")
+        else:
+            print("Accès à la page d'accueil pour connexion...")
+            page.goto(url_base)
+            page.wait_for_timeout(2000)
+            if not se_connecter(page):
+                return False
+            sauvegarder_session(page, fichier_session)
+            page.goto(url_traducteur)
+            page.wait_for_timeout(2000)
         try:
             bouton_selector = "button.shadow-md.shadow-\\[rgba\\(0\\,0\\,0\\,0\\.01\\)\\].border.border-\\[\\#ECECEC\\].mx-2.p-\\[17px\\].rounded-2xl.bg-white.hover\\:bg-lighter.duration-150[aria-label='échanger les langues'][title='échanger les langues']"
             page.wait_for_selector(bouton_selector, state="visible", timeout=5000)
@@ -259,13 +389,7 @@ def configurer_page_traduction(page, url_base="https://www.learnmoroccan.com/fr"
             print(f"Erreur lors de la gestion du bouton initial : {e}, poursuite du script")
 
         # Sélection de la langue source (français ou anglais)
-        langue = "Français" if source_lang == "fr" else "Anglais"
-        print(f"Sélection de la langue {langue}...")
-        page.locator("xpath=/html/body/div/div[2]/div[2]/div[1]/div[1]").click()
-        page.wait_for_timeout(1000)
-        page.locator(f"div:has-text('{langue}'):not(:has(div:has-text('{langue}')))").first.click()
-        print(f"Langue {langue} sélectionnée")
-        page.wait_for_timeout(1000)
+        selectionner_langue(page, source_lang)
 
         # Activer le bouton toggle
         page.locator("xpath=/html/body/div/div[2]/div[3]/div/label/div/div").click()
@@ -276,113 +400,292 @@ def configurer_page_traduction(page, url_base="https://www.learnmoroccan.com/fr"
         return False
 
 
-def traduire_texte_dans_page(page, phrase, max_retries=3, source_lang="fr"):
+def reinitialiser_page_traduction(page, source_lang="fr"):
+    """
+    Réinitialisation légère de la page avant une nouvelle tentative : vide le champ de
+    saisie et vérifie la langue source, sans navigation ni nouvelle connexion.
+    
+    Args:
+        page: L'instance de page Playwright déjà configurée
+        source_lang: La langue source ('fr' pour français, 'en' pour anglais)
+    
+    Returns:
+        bool: True si la page est de nouveau utilisable, False s'il faut la reconfigurer
+    """
+    try:
+        page.wait_for_selector(TEXTAREA_SELECTOR, state="visible", timeout=3000)
+        page.fill(TEXTAREA_SELECTOR, "")
+        if not est_connecte(page):
+            print("Session expirée, reconfiguration nécessaire")
+            return False
+        langue = "Français" if source_lang == "fr" else "Anglais"
+        if langue not in page.locator(XPATH_MENU_LANGUE).inner_text(timeout=3000):
+            print(f"Langue source différente de {langue}, nouvelle sélection...")
+            selectionner_langue(page, source_lang)
+        return True
+    except Exception as e:
+        print(f"Erreur lors de la réinitialisation légère : {e}")
+        return False
+
+
+def contient_arabe(texte):
+    """
+    Indique si un texte contient au moins un caractère arabe.
+
+    Args:
+        texte (str): Le texte à analyser
+
+    Returns:
+        bool: True si le texte contient des caractères arabes, False sinon
+    """
+    return any(0x0600 <= ord(c) <= 0x06FF for c in texte)
+
+
+def extraire_traduction_payload(payload, phrase=None):
+    """
+    Parcourt récursivement la réponse JSON du traducteur pour y trouver la traduction.
+
+    Les clés les plus probables ('translation', 'result', ...) sont examinées en premier,
+    puis toutes les autres valeurs. La première chaîne contenant de l'arabe et différente
+    de la phrase source est retenue.
+
+    Args:
+        payload: Le contenu JSON décodé de la réponse (dict, list ou str)
+        phrase (str): La phrase source, pour ne pas la confondre avec la traduction
+
+    Returns:
+        str: La traduction en arabe ou None si aucune n'est trouvée
+    """
+    if isinstance(payload, str):
+        texte = payload.strip()
+        if texte and texte != phrase and contient_arabe(texte):
+            return texte
+        return None
+    if isinstance(payload, dict):
+        valeurs = [payload[cle] for cle in CLES_TRADUCTION if cle in payload]
+        valeurs += [v for cle, v in payload.items() if cle not in CLES_TRADUCTION]
+    elif isinstance(payload, list):
+        valeurs = payload
+    else:
+        return None
+    for valeur in valeurs:
+        traduction = extraire_traduction_payload(valeur, phrase)
+        if traduction:
+            return traduction
+    return None
+
+
+def est_reponse_traduction(response, motif_url=MOTIF_URL_TRADUCTION):
+    """
+    Indique si une réponse réseau provient de l'API de traduction du site.
+
+    Args:
+        response: La réponse Playwright interceptée
+        motif_url (str): Fragment d'URL identifiant l'appel de traduction
+
+    Returns:
+        bool: True si la réponse correspond à un appel de traduction
+    """
+    return (
+        response.request.resource_type in ("xhr", "fetch")
+        and motif_url in response.url.lower()
+    )
+
+
+def lire_traduction_reponse(response, phrase=None):
+    """
+    Lit la traduction directement depuis la réponse de l'API du traducteur.
+
+    Args:
+        response: La réponse Playwright interceptée
+        phrase (str): La phrase source
+
+    Returns:
+        str: La traduction en arabe ou None si la réponse est inexploitable
+    """
+    if not response.ok:
+        print(f"Réponse du traducteur en erreur : {response.status}")
+        return None
+    try:
+        payload = response.json()
+    except Exception:
+        # Certaines API renvoient du texte brut
+        payload = response.text()
+    return extraire_traduction_payload(payload, phrase)
+
+
+def cliquer_bouton_traduction(page, attente_avant_clic=2000):
+    """
+    Clique sur le bouton de traduction de la page.
+
+    Args:
+        page: L'instance de page Playwright
+        attente_avant_clic (int): Délai en millisecondes avant le clic
+
+    Returns:
+        bool: True si le clic a réussi, False sinon
+    """
+    print("Clic sur le bouton de traduction")
+    try:
+        # Attendre que le bouton soit cliquable
+        page.wait_for_selector("xpath=/html/body/div/div[2]/button", state="visible", timeout=5000)
+        # Attendre un peu avant de cliquer pour s'assurer que la page est prête
+        if attente_avant_clic:
+            page.wait_for_timeout(attente_avant_clic)
+        # Cliquer sur le bouton avec JavaScript pour éviter les problèmes de navigation
+        page.evaluate("document.querySelector('button.font-normal.shadow-sm').click()")
+        print("✅ Bouton de traduction cliqué")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur lors du clic sur le bouton de traduction : {e}")
+        return False
+
+
+def attendre_traduction_dom(page, max_attempts=15):
+    """
+    Attend l'apparition de la traduction dans le DOM en analysant les paragraphes
+    du conteneur de résultat (méthode de repli).
+
+    Args:
+        page: L'instance de page Playwright
+        max_attempts (int): Nombre maximum de vérifications
+
+    Returns:
+        str: La traduction en arabe ou None si rien n'est apparu
+    """
+    print("Attente de la traduction...")
+    attempt = 0
+    dernier_texte = None
+
+    while attempt < max_attempts:
+        try:
+            # Attendre que le conteneur de traduction soit visible
+            page.wait_for_selector("xpath=/html/body/div/div[2]/div[4]", state="visible", timeout=3000)
+
+            # Récupérer tous les paragraphes dans le conteneur de traduction
+            script_all_paragraphs = """
+            () => {
+                const container = document.evaluate("/html/body/div/div[2]/div[4]", document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+                if (!container) return [];
+                const paragraphs = Array.from(container.querySelectorAll('p'));
+                return paragraphs.map(p => ({
+                    text: p.textContent,
+                    hasArabic: Array.from(p.textContent).some(c => c.charCodeAt(0) >= 0x0600 && c.charCodeAt(0) <= 0x06FF)
+                }));
+            }
+            """
+            paragraphs = page.evaluate(script_all_paragraphs)
+
+            # Chercher le premier paragraphe contenant du texte arabe
+            texte_actuel = None
+            for p in paragraphs:
+                if p["hasArabic"] and p["text"] != "Marocain":
+                    texte_actuel = p["text"]
+                    break
+                elif "traduction devrait apparaître" in p["text"].lower():
+                    texte_actuel = "en_attente"
+                    break
+
+            # Si le texte n'a pas changé depuis la dernière vérification, continuer à attendre
+            if texte_actuel == dernier_texte:
+                print(f"Tentative {attempt + 1}/{max_attempts} - Attente de changement...")
+                page.wait_for_timeout(1000)
+                attempt += 1
+                continue
+
+            # Si on trouve un nouveau texte arabe valide
+            if texte_actuel and texte_actuel != "en_attente":
+                return texte_actuel
+
+            # Mettre à jour le dernier texte vu
+            dernier_texte = texte_actuel
+            print(f"Tentative {attempt + 1}/{max_attempts} - Attente de la traduction...")
+            page.wait_for_timeout(1000)
+            attempt += 1
+
+        except Exception as e:
+            print(f"Erreur lors de la tentative {attempt + 1} : {e}")
+            attempt += 1
+
+    return None
+
+
+def traduire_texte_dans_page(page, phrase, max_retries=3, source_lang="fr", mode_extraction="reseau",
+                             motif_url=MOTIF_URL_TRADUCTION, timeout_reseau=20000,
+                             fichier_session=FICHIER_SESSION, url_base="https://www.learnmoroccan.com/fr"):
     """
     Traduit une phrase en utilisant une page déjà configurée.
+
+    En mode 'reseau', la réponse de l'API du traducteur est interceptée au moment du clic
+    et la traduction est lue directement dans son contenu. L'analyse du DOM n'est utilisée
+    qu'en repli, ou systématiquement en mode 'dom'.
     
     Args:
         page: L'instance de page Playwright déjà configurée
         phrase: La phrase à traduire
         max_retries: Nombre maximum de tentatives de traduction
         source_lang: La langue source ('fr' pour français, 'en' pour anglais)
+        mode_extraction: 'reseau' (interception de la réponse) ou 'dom' (analyse de la page)
+        motif_url: Fragment d'URL identifiant l'appel à l'API de traduction
+        timeout_reseau: Délai maximum d'attente de la réponse réseau, en millisecondes
+        fichier_session: Fichier de session à mettre à jour en cas de reconnexion
+        url_base: L'URL de base du site, utilisée en cas de reconfiguration complète
     
     Returns:
         str: La traduction en arabe ou None si échec
     """
-    url_base = "https://www.learnmoroccan.com/fr"
-    url_traducteur = f"{url_base}/translator"
-
     for retry in range(max_retries):
         try:
             if retry > 0:
                 print(f"\n🔄 Tentative {retry + 1}/{max_retries} - Réinitialisation de la page...")
-                # Reconfigurer la page sans passer par la page d'accueil
-                if not configurer_page_traduction(page, source_lang=source_lang):
-                    print("❌ Échec de la configuration de la page")
-                    continue
+                # Réinitialisation légère, puis reconfiguration complète seulement si elle échoue
+                if not reinitialiser_page_traduction(page, source_lang=source_lang):
+                    print("Réinitialisation légère insuffisante, reconfiguration complète...")
+                    if not configurer_page_traduction(page, url_base, source_lang, fichier_session):
+                        print("❌ Échec de la configuration de la page")
+                        continue
 
             # Effacer d'abord le contenu existant
             print("Nettoyage du champ de texte...")
-            textarea_selector = "textarea.pl-1.w-full.bg-white.outline-none.overflow-hidden.pt-2.resize-none.min-h-28.sm\\:min-h-48"
-            page.fill(textarea_selector, "")
+            page.fill(TEXTAREA_SELECTOR, "")
             page.wait_for_timeout(500)
 
             print(f"Saisie du texte : '{phrase}'")
-            page.fill(textarea_selector, phrase)
+            page.fill(TEXTAREA_SELECTOR, phrase)
             page.wait_for_timeout(1000)
-            
-            print("Clic sur le bouton de traduction")
-            try:
-                # Attendre que le bouton soit cliquable
-                page.wait_for_selector("xpath=/html/body/div/div[2]/button", state="visible", timeout=5000)
-                # Attendre un peu avant de cliquer pour s'assurer que la page est prête
-                page.wait_for_timeout(2000)
-                # Cliquer sur le bouton avec JavaScript pour éviter les problèmes de navigation
-                page.evaluate("document.querySelector('button.font-normal.shadow-sm').click()")
-                print("✅ Bouton de traduction cliqué")
-                # Attendre plus longtemps après le clic pour laisser le temps à la traduction de s'initialiser
-                page.wait_for_timeout(5000)
-            except Exception as e:
-                print(f"❌ Erreur lors du clic sur le bouton de traduction : {e}")
-                continue
-            
-            print("Attente de la traduction...")
-            max_attempts = 15  # Augmenter le nombre de tentatives
-            attempt = 0
+
             traduction_arabe = None
-            dernier_texte = None
-            
-            while attempt < max_attempts:
+            if mode_extraction == "reseau":
+                clic_reussi = False
+                reponse = None
                 try:
-                    # Attendre que le conteneur de traduction soit visible
-                    page.wait_for_selector("xpath=/html/body/div/div[2]/div[4]", state="visible", timeout=3000)
-                    
-                    # Récupérer tous les paragraphes dans le conteneur de traduction
-                    script_all_paragraphs = """
-                    () => {
-                        const container = document.evaluate("/html/body/div/div[2]/div[4]", document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
-                        if (!container) return [];
-                        const paragraphs = Array.from(container.querySelectorAll('p'));
-                        return paragraphs.map(p => ({
-                            text: p.textContent,
-                            hasArabic: Array.from(p.textContent).some(c => c.charCodeAt(0) >= 0x0600 && c.charCodeAt(0) <= 0x06FF)
-                        }));
-                    }
-                    """
-                    paragraphs = page.evaluate(script_all_paragraphs)
-                    
-                    # Chercher le premier paragraphe contenant du texte arabe
-                    texte_actuel = None
-                    for p in paragraphs:
-                        if p["hasArabic"] and p["text"] != "Marocain":
-                            texte_actuel = p["text"]
-                            break
-                        elif "traduction devrait apparaître" in p["text"].lower():
-                            texte_actuel = "en_attente"
-                            break
-                    
-                    # Si le texte n'a pas changé depuis la dernière vérification, continuer à attendre
-                    if texte_actuel == dernier_texte:
-                        print(f"Tentative {attempt + 1}/{max_attempts} - Attente de changement...")
-                        page.wait_for_timeout(1000)
-                        attempt += 1
-                        continue
-                    
-                    # Si on trouve un nouveau texte arabe valide
-                    if texte_actuel and texte_actuel != "en_attente":
-                        traduction_arabe = texte_actuel
-                        print(f"✅ Traduction trouvée : {traduction_arabe}")
-                        return traduction_arabe
-                    
-                    # Mettre à jour le dernier texte vu
-                    dernier_texte = texte_actuel
-                    print(f"Tentative {attempt + 1}/{max_attempts} - Attente de la traduction...")
-                    page.wait_for_timeout(1000)
-                    attempt += 1
-                    
+                    with page.expect_response(lambda r: est_reponse_traduction(r, motif_url),
+                                              timeout=timeout_reseau) as info_reponse:
+                        clic_reussi = cliquer_bouton_traduction(page, attente_avant_clic=0)
+                        if not clic_reussi:
+                            raise RuntimeError("clic impossible")
+                    reponse = info_reponse.value
+                    traduction_arabe = lire_traduction_reponse(reponse, phrase)
                 except Exception as e:
-                    print(f"Erreur lors de la tentative {attempt + 1} : {e}")
-                    attempt += 1
+                    print(f"⚠️ Aucune réponse réseau exploitable ({e}), repli sur le DOM")
+                if not clic_reussi:
+                    continue
+                if reponse is not None and not reponse.ok:
+                    # Erreur côté serveur : la page n'affichera pas de traduction, inutile d'attendre
+                    continue
+                if traduction_arabe:
+                    print(f"✅ Traduction interceptée : {traduction_arabe}")
+                    return traduction_arabe
+            else:
+                if not cliquer_bouton_traduction(page):
+                    continue
+                # Attendre plus longtemps après le clic pour laisser le temps à la traduction de s'initialiser
+                page.wait_for_timeout(5000)
+
+            traduction_arabe = attendre_traduction_dom(page)
+            if traduction_arabe:
+                print(f"✅ Traduction trouvée : {traduction_arabe}")
+                return traduction_arabe
             
             if retry < max_retries - 1:
                 print("❌ Échec de la traduction, nouvelle tentative...")
@@ -396,31 +699,52 @@ def traduire_texte_dans_page(page, phrase, max_retries=3, source_lang="fr"):
     return None
 
 
-def charger_traductions_existantes(fichier_json):
+def charger_traductions_existantes(fichier_jsonl, fichier_json_legacy=None):
     """
-    Charge les traductions existantes depuis le fichier JSON.
+    Charge l'index des traductions existantes depuis le stockage JSONL.
+    Au premier lancement, l'ancien fichier JSON est importé dans le stockage.
     
     Args:
-        fichier_json (str): Chemin vers le fichier JSON des traductions
+        fichier_jsonl (str): Chemin vers le fichier JSONL des traductions
+        fichier_json_legacy (str): Chemin vers l'ancien fichier 'translations.json'
     
     Returns:
-        set: Ensemble des phrases déjà traduites
+        StockageTraductions: Stockage indexé par (source, source_lang)
     """
-    try:
-        with open(fichier_json, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return {(t["source"], t["source_lang"]) for t in data.get("translations", [])}
-    except (FileNotFoundError, json.JSONDecodeError):
-        return set()
+    return StockageTraductions(fichier_jsonl, fichier_json_legacy)
 
 
-def traduire_phrases_excel(chemin_fichier_excel, source_lang="fr"):
+def consulter_memoire(memoire, phrase, source_lang="fr"):
+    """
+    Consulte la mémoire de traduction avant de lancer le navigateur pour une phrase.
+    
+    Args:
+        memoire (MemoireTraduction): La mémoire de traduction du projet
+        phrase (str): La phrase à traduire
+        source_lang (str): La langue source ('fr' pour français, 'en' pour anglais)
+    
+    Returns:
+        tuple: (traduction réutilisable ou None, liste des paires proches à signaler)
+    """
+    resultats = [r for r in memoire.rechercher(phrase, source_lang) if r["entree"]["target_lang"] == "dr"]
+    for r in resultats:
+        # Même phrase à la ponctuation, la casse ou aux accents près : la traduction est réutilisée
+        if r["distance"] == 0:
+            return r["entree"]["target_text"], []
+    return None, resultats
+
+
+def traduire_phrases_excel(chemin_fichier_excel, source_lang="fr", mode_extraction="reseau", mode_debug=False,
+                           memoire=None):
     """
     Traduit toutes les phrases d'un fichier Excel.
     
     Args:
         chemin_fichier_excel (str): Chemin vers le fichier Excel contenant les phrases à traduire
         source_lang (str): La langue source ('fr' pour français, 'en' pour anglais)
+        mode_extraction (str): 'reseau' (interception de la réponse) ou 'dom' (analyse de la page)
+        mode_debug (bool): True pour un navigateur visible chargeant toutes les ressources
+        memoire (MemoireTraduction): Mémoire de traduction consultée avant chaque scraping (optionnelle)
     """
     try:
         print(f"Lecture du fichier Excel : {chemin_fichier_excel}")
@@ -435,21 +759,17 @@ def traduire_phrases_excel(chemin_fichier_excel, source_lang="fr"):
         total_phrases = len(df)
         print(f"📊 Nombre total de phrases à traduire : {total_phrases}")
 
-        # Utiliser un seul fichier JSON pour toutes les traductions
+        # Utiliser un seul stockage append-only pour toutes les traductions
         dossier_script = os.path.dirname(os.path.abspath(__file__))
+        fichier_jsonl = os.path.join(dossier_script, "translations.jsonl")
         fichier_json = os.path.join(dossier_script, "translations.json")
 
         # Charger les traductions existantes
-        traductions_existantes = charger_traductions_existantes(fichier_json)
+        traductions_existantes = charger_traductions_existantes(fichier_jsonl, fichier_json)
         print(f"📚 Nombre de traductions déjà effectuées : {len(traductions_existantes)}")
 
         with sync_playwright() as p:
-            print("Lancement du navigateur Chromium...")
-            browser = p.chromium.launch(
-                headless=False,
-                args=['--start-maximized']
-            )
-            page = browser.new_page(viewport={"width": 1920, "height": 1080})
+            browser, page = ouvrir_navigateur(p, mode_debug=mode_debug)
             if not configurer_page_traduction(page, source_lang=source_lang):
                 raise Exception("Échec de la configuration de la page")
             
@@ -463,20 +783,35 @@ def traduire_phrases_excel(chemin_fichier_excel, source_lang="fr"):
                     print(f"\n⏭️ Phrase déjà traduite ({index + 1}/{total_phrases})")
                     print(f"📝 Phrase source ({source_lang}): {phrase}")
                     continue
+
+                # Consulter la mémoire de traduction avant le navigateur
+                if memoire is not None:
+                    traduction, proches = consulter_memoire(memoire, phrase, source_lang)
+                    if traduction:
+                        print(f"\n♻️ Traduction reprise de la mémoire ({index + 1}/{total_phrases})")
+                        print(f"📝 Phrase source ({source_lang}): {phrase}")
+                        sauvegarder_traduction(traductions_existantes, phrase, traduction, source_lang,
+                                               origine="memoire")
+                        continue
+                    for r in proches:
+                        print(f"⚠️ Phrase proche déjà traduite (distance {r['distance']}) : "
+                              f"{r['entree']['source_text']} -> {r['entree']['target_text']}")
                 
                 print(f"\n🔄 Traduction {index + 1}/{total_phrases}")
                 print(f"📝 Phrase source ({source_lang}): {phrase}")
-                traduction = traduire_texte_dans_page(page, phrase, source_lang=source_lang)
+                traduction = traduire_texte_dans_page(page, phrase, source_lang=source_lang,
+                                                      mode_extraction=mode_extraction)
                 if traduction:
                     print(f"✅ Traduction : {traduction}")
-                    sauvegarder_traduction_json(phrase, traduction, source_lang, fichier_json)
-                    # Mettre à jour l'ensemble des traductions existantes
-                    traductions_existantes.add((phrase, source_lang))
+                    sauvegarder_traduction(traductions_existantes, phrase, traduction, source_lang)
                 else:
                     print(f"❌ Échec de la traduction pour : {phrase}")
                 time.sleep(5)
             print("\n✅ Traduction terminée !")
             browser.close()
+
+        # Régénérer le fichier JSON historique utilisé par l'enrichissement
+        traductions_existantes.exporter_json(fichier_json)
     except Exception as e:
         print(f"❌ Erreur lors du traitement : {str(e)}")
 
@@ -485,22 +820,23 @@ if __name__ == "__main__":
     print("🚀 Démarrage du script de traduction...")
     print(f"📂 Répertoire de travail : {os.getcwd()}")
 
+    # SCRAPER_DEBUG=1 : navigateur visible et chargement de toutes les ressources
+    mode_debug = os.getenv("SCRAPER_DEBUG", "0") == "1"
+
+    # Mémoire de traduction construite à partir de toutes les sources du projet
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agregation"))
+    from memoire_traduction import construire_memoire_projet
+    memoire = construire_memoire_projet()
+
     # Définition des chemins des fichiers Excel
     fichier_excel_fr = "../agregation/data_xlsx/questions_fr.xlsx"
     fichier_excel_en = "../agregation/data_xlsx/questions_en.xlsx"
 
-    # Créer un fichier JSON unique pour toutes les traductions
-    dossier_script = os.path.dirname(os.path.abspath(__file__))
-    fichier_json = os.path.join(dossier_script, "translations.json")
-    if not os.path.exists(fichier_json):
-        with open(fichier_json, 'w', encoding='utf-8') as f:
-            json.dump({"translations": []}, f, ensure_ascii=False, indent=2)
-
     # 1. Traitement du fichier français
     print("\n🇫🇷 Traitement du fichier français...")
     print(f"📄 Fichier : {fichier_excel_fr}")
     if os.path.exists(fichier_excel_fr):
-        traduire_phrases_excel(fichier_excel_fr, source_lang="fr")
+        traduire_phrases_excel(fichier_excel_fr, source_lang="fr", mode_debug=mode_debug, memoire=memoire)
     else:
         print(f"❌ Fichier non trouvé : {fichier_excel_fr}")
 
@@ -508,7 +844,7 @@ if __name__ == "__main__":
     print("\n🇬🇧 Traitement du fichier anglais...")
     print(f"📄 Fichier : {fichier_excel_en}")
     if os.path.exists(fichier_excel_en):
-        traduire_phrases_excel(fichier_excel_en, source_lang="en")
+        traduire_phrases_excel(fichier_excel_en, source_lang="en", mode_debug=mode_debug, memoire=memoire)
     else:
         print(f"❌ Fichier non trouvé : {fichier_excel_en}")
 
@@ -0,0 +1,436 @@
+'''Moteur de scraping asynchrone : plusieurs pages du traducteur pilotées en parallèle
+dans une seule boucle asyncio, les résultats étant écrits par une tâche dédiée.'''
+
+import asyncio
+import os
+import time
+import pandas as pd
+from playwright.async_api import async_playwright
+
+from scrapping import (
+    TEXTAREA_SELECTOR,
+    MOTIF_URL_TRADUCTION,
+    XPATH_MENU_LANGUE,
+    FICHIER_SESSION,
+    DOMAINES_AUTORISES,
+    SELECTEUR_BOUTON_CONNEXION,
+    SELECTEUR_MARQUEUR_CONNECTE,
+    a_cookie_de_session,
+    domaines_du_site,
+    doit_bloquer_requete,
+    est_reponse_traduction,
+    extraire_traduction_payload,
+    identifiants_connexion,
+)
+from stockage_traductions import StockageTraductions
+
+
+async def ouvrir_contexte(p, url_base="https://www.learnmoroccan.com/fr", mode_debug=False,
+                          fichier_session=FICHIER_SESSION):
+    """
+    Lance Chromium et crée le contexte partagé par toutes les pages.
+
+    Args:
+        p: L'instance async_playwright
+        url_base (str): L'URL de base du site
+        mode_debug (bool): True pour un navigateur visible chargeant toutes les ressources
+        fichier_session (str): Session sauvegardée à recharger si elle existe
+
+    Returns:
+        tuple: (browser, context)
+    """
+    options_contexte = {}
+    if fichier_session and os.path.exists(fichier_session):
+        options_contexte["storage_state"] = fichier_session
+    browser = await p.chromium.launch(headless=not mode_debug)
+    context = await browser.new_context(viewport={"width": 1280, "height": 800}, **options_contexte)
+    if not mode_debug:
+        await bloquer_ressources(context, url_base)
+    return browser, context
+
+
+async def bloquer_ressources(context, url_base, domaines_autorises=DOMAINES_AUTORISES):
+    """Bloque les ressources non essentielles et, si une liste blanche est donnée, les domaines tiers (version asynchrone)."""
+    domaines = None if domaines_autorises is None else domaines_du_site(url_base, domaines_autorises)
+
+    async def filtrer(route):
+        if doit_bloquer_requete(route.request, domaines):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await context.route("**/*", filtrer)
+
+
+async def est_connecte(page):
+    """
+    Indique si la session courante est authentifiée : pas de bouton 'Se connecter' et un
+    signe positif (marqueur de l'en-tête ou cookie de session), comme scrapping.est_connecte.
+    """
+    try:
+        if await page.locator(SELECTEUR_BOUTON_CONNEXION).count():
+            return False
+        if await page.locator(SELECTEUR_MARQUEUR_CONNECTE).count():
+            return True
+        return a_cookie_de_session(await page.context.cookies(page.url))
+    except Exception:
+        return False
+
+
+async def se_connecter(page):
+    """
+    Effectue la connexion sur le site avec les identifiants lus dans l'environnement
+    (voir scrapping.identifiants_connexion).
+
+    Returns:
+        bool: True si la connexion a réussi, False sinon
+    """
+    try:
+        email, mot_de_passe = identifiants_connexion()
+        await page.locator("xpath=/html/body/header/div/div[2]/div/a[2]/button").click()
+        await page.wait_for_selector("xpath=/html/body/section[1]/div/form", timeout=10000)
+        await page.locator("xpath=/html/body/section[1]/div/form/div[1]/input").fill(email)
+        await page.locator("xpath=/html/body/section[1]/div/form/div[2]/input").fill(mot_de_passe)
+        await page.locator("xpath=/html/body/section[1]/div/form/button").click()
+        await page.wait_for_load_state("networkidle")
+        return True
+    except Exception as e:
+        print(f"Erreur lors de la connexion : {e}")
+        return False
+
+
+async def selectionner_langue(page, source_lang="fr", delai=500):
+    """Sélectionne la langue source dans le menu déroulant du traducteur."""
+    langue = "Français" if source_lang == "fr" else "Anglais"
+    await page.locator(XPATH_MENU_LANGUE).click()
+    await page.wait_for_timeout(delai)
+    await page.locator(f"div:has-text('{langue}'):not(:has(div:has-text('{langue}')))").first.click()
+    await page.wait_for_timeout(delai)
+
+
+async def configurer_page_traduction(page, url_base="https://www.learnmoroccan.com/fr", source_lang="fr",
+                                     fichier_session=FICHIER_SESSION, verrou_connexion=None, delai=500):
+    """
+    Configure la page pour la traduction (connexion et paramètres initiaux).
+
+    Les pages partagent le même contexte, donc les mêmes cookies : le verrou de connexion
+    garantit qu'une seule page se connecte, les autres réutilisant la session obtenue.
+
+    Args:
+        page: L'instance de page Playwright (API asynchrone)
+        url_base: L'URL de base du site
+        source_lang: La langue source ('fr' pour français, 'en' pour anglais)
+        fichier_session: Fichier où sauvegarder la session après connexion (None pour désactiver)
+        verrou_connexion (asyncio.Lock): Verrou partagé entre les pages d'un même contexte
+        delai (int): Pause entre deux actions sur la page, en millisecondes
+
+    Returns:
+        bool: True si la configuration a réussi, False sinon
+    """
+    verrou_connexion = verrou_connexion or asyncio.Lock()
+    url_traducteur = f"{url_base}/translator"
+    try:
+        await page.goto(url_traducteur)
+        if not await est_connecte(page):
+            async with verrou_connexion:
+                # Une autre page a pu se connecter pendant l'attente du verrou
+                await page.goto(url_traducteur)
+                if not await est_connecte(page):
+                    print("Connexion au traducteur...")
+                    await page.goto(url_base)
+                    if not await se_connecter(page):
+                        return False
+                    if fichier_session:
+                        await page.context.storage_state(path=fichier_session)
+                    await page.goto(url_traducteur)
+        try:
+            bouton_selector = "button.shadow-md.shadow-\\[rgba\\(0\\,0\\,0\\,0\\.01\\)\\].border.border-\\[\\#ECECEC\\].mx-2.p-\\[17px\\].rounded-2xl.bg-white.hover\\:bg-lighter.duration-150[aria-label='échanger les langues'][title='échanger les langues']"
+            await page.wait_for_selector(bouton_selector, state="visible", timeout=5000)
+            await page.locator(bouton_selector).click()
+            await page.wait_for_timeout(delai)
+        except Exception as e:
+            print(f"Erreur lors de la gestion du bouton initial : {e}, poursuite du script")
+
+        await selectionner_langue(page, source_lang, delai)
+
+        # Activer le bouton toggle
+        await page.locator("xpath=/html/body/div/div[2]/div[3]/div/label/div/div").click()
+        await page.wait_for_timeout(delai)
+        return True
+    except Exception as e:
+        print(f"Erreur lors de la configuration : {e}")
+        return False
+
+
+async def reinitialiser_page_traduction(page, source_lang="fr", delai=500):
+    """
+    Réinitialisation légère : vide le champ de saisie et vérifie la langue source.
+
+    Returns:
+        bool: True si la page est de nouveau utilisable, False s'il faut la reconfigurer
+    """
+    try:
+        await page.wait_for_selector(TEXTAREA_SELECTOR, state="visible", timeout=3000)
+        await page.fill(TEXTAREA_SELECTOR, "")
+        if not await est_connecte(page):
+            return False
+        langue = "Français" if source_lang == "fr" else "Anglais"
+        if langue not in await page.locator(XPATH_MENU_LANGUE).inner_text(timeout=3000):
+            await selectionner_langue(page, source_lang, delai)
+        return True
+    except Exception as e:
+        print(f"Erreur lors de la réinitialisation légère : {e}")
+        return False
+
+
+async def lire_traduction_reponse(response, phrase=None):
+    """Lit la traduction directement depuis la réponse de l'API du traducteur."""
+    if not response.ok:
+        print(f"Réponse du traducteur en erreur : {response.status}")
+        return None
+    try:
+        payload = await response.json()
+    except Exception:
+        payload = await response.text()
+    return extraire_traduction_payload(payload, phrase)
+
+
+async def attendre_traduction_dom(page, traduction_precedente=None, timeout=15000):
+    """
+    Attend l'apparition d'un paragraphe arabe dans le conteneur de résultat (méthode de repli).
+    L'attente est faite dans le navigateur par wait_for_function, sans aller-retour par seconde.
+
+    Args:
+        page: L'instance de page Playwright
+        traduction_precedente (str): Dernière traduction affichée par la page, à ignorer
+        timeout (int): Délai maximum d'attente, en millisecondes
+
+    Returns:
+        str: La traduction en arabe ou None si rien n'est apparu
+    """
+    script = """
+    (precedente) => {
+        const container = document.evaluate("/html/body/div/div[2]/div[4]", document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        if (!container) return null;
+        for (const p of container.querySelectorAll('p')) {
+            if (p.textContent !== "Marocain" && p.textContent !== precedente && Array.from(p.textContent).some(c => c.charCodeAt(0) >= 0x0600 && c.charCodeAt(0) <= 0x06FF)) {
+                return p.textContent;
+            }
+        }
+        return null;
+    }
+    """
+    try:
+        handle = await page.wait_for_function(script, arg=traduction_precedente, timeout=timeout)
+        return await handle.json_value()
+    except Exception as e:
+        print(f"Aucune traduction dans le DOM : {e}")
+        return None
+
+
+async def traduire_texte_avec_tentatives(page, phrase, max_retries=3, source_lang="fr",
+                                         url_base="https://www.learnmoroccan.com/fr",
+                                         motif_url=MOTIF_URL_TRADUCTION, timeout_reseau=20000,
+                                         fichier_session=FICHIER_SESSION, verrou_connexion=None, delai=500,
+                                         traduction_precedente=None):
+    """
+    Traduit une phrase en utilisant une page déjà configurée (version asynchrone).
+
+    Contrairement à scrapping.traduire_texte_dans_page, qui renvoie la traduction seule,
+    renvoie aussi le nombre de tentatives supplémentaires pour les statistiques.
+
+    La réponse de l'API du traducteur est interceptée au moment du clic ; l'analyse du DOM
+    n'est utilisée qu'en repli.
+
+    Args:
+        page: L'instance de page Playwright déjà configurée
+        phrase: La phrase à traduire
+        max_retries: Nombre maximum de tentatives de traduction
+        source_lang: La langue source ('fr' pour français, 'en' pour anglais)
+        url_base: L'URL de base du site
+        motif_url: Fragment d'URL identifiant l'appel à l'API de traduction
+        timeout_reseau: Délai maximum d'attente de la réponse réseau, en millisecondes
+        fichier_session: Fichier de session à mettre à jour en cas de reconnexion
+        verrou_connexion (asyncio.Lock): Verrou partagé entre les pages d'un même contexte
+        delai (int): Pause entre deux actions sur la page, en millisecondes
+        traduction_precedente (str): Dernière traduction de la page, ignorée par le repli DOM
+
+    Returns:
+        tuple: (traduction ou None, nombre de tentatives supplémentaires)
+    """
+    for retry in range(max_retries):
+        try:
+            if retry > 0:
+                if not await reinitialiser_page_traduction(page, source_lang, delai):
+                    if not await configurer_page_traduction(page, url_base, source_lang, fichier_session,
+                                                            verrou_connexion, delai):
+                        continue
+
+            await page.fill(TEXTAREA_SELECTOR, phrase)
+            await page.wait_for_selector("xpath=/html/body/div/div[2]/button", state="visible", timeout=5000)
+
+            reponse = None
+            traduction_arabe = None
+            try:
+                async with page.expect_response(lambda r: est_reponse_traduction(r, motif_url),
+                                                timeout=timeout_reseau) as info_reponse:
+                    await page.evaluate("document.querySelector('button.font-normal.shadow-sm').click()")
+                reponse = await info_reponse.value
+                traduction_arabe = await lire_traduction_reponse(reponse, phrase)
+            except Exception as e:
+                print(f"⚠️ Aucune réponse réseau exploitable ({e}), repli sur le DOM")
+
+            if reponse is not None and not reponse.ok:
+                # Erreur côté serveur : la page n'affichera pas de traduction, inutile d'attendre
+                continue
+            if not traduction_arabe:
+                traduction_arabe = await attendre_traduction_dom(page, traduction_precedente)
+            if traduction_arabe:
+                return traduction_arabe, retry
+        except Exception as e:
+            print(f"Erreur lors de la traduction de '{phrase}' : {e}")
+
+    return None, max_retries - 1
+
+
+async def ecrivain_traductions(file_resultats, stockage):
+    """
+    Tâche d'écriture : consomme les résultats des pages et les ajoute au stockage.
+    L'écriture disque est déportée dans un thread pour ne pas bloquer la boucle.
+
+    Args:
+        file_resultats (asyncio.Queue): File des résultats (None pour terminer)
+        stockage (StockageTraductions): Le stockage append-only des traductions
+
+    Returns:
+        int: Nombre de traductions écrites
+    """
+    ecrites = 0
+    while True:
+        traduction = await file_resultats.get()
+        if traduction is None:
+            file_resultats.task_done()
+            return ecrites
+        if await asyncio.to_thread(stockage.ajouter, traduction):
+            ecrites += 1
+        file_resultats.task_done()
+
+
+async def _travailleur(numero, page, file_phrases, file_resultats, statistiques, **options):
+    """Traduit les phrases de la file partagée avec une page dédiée."""
+    traduction_precedente = None
+    while True:
+        phrase = await file_phrases.get()
+        if phrase is None:
+            file_phrases.task_done()
+            return
+        debut = time.perf_counter()
+        traduction, tentatives = await traduire_texte_avec_tentatives(page, phrase,
+                                                                      traduction_precedente=traduction_precedente,
+                                                                      **options)
+        statistiques["latences"].append(time.perf_counter() - debut)
+        statistiques["tentatives"] += tentatives
+        if traduction:
+            traduction_precedente = traduction
+            print(f"✅ [page {numero}] {phrase} -> {traduction}")
+            await file_resultats.put({
+                "source_lang": options.get("source_lang", "fr"),
+                "source": phrase,
+                "target_lang": "darija",
+                "target": traduction,
+            })
+        else:
+            print(f"❌ [page {numero}] Échec de la traduction pour : {phrase}")
+            statistiques["echecs"] += 1
+        file_phrases.task_done()
+
+
+async def traduire_phrases_async(phrases, stockage, source_lang="fr", nb_pages=4,
+                                 url_base="https://www.learnmoroccan.com/fr", mode_debug=False,
+                                 fichier_session=FICHIER_SESSION, max_retries=3, delai=500):
+    """
+    Traduit une liste de phrases avec plusieurs pages pilotées en parallèle.
+
+    Chaque page est configurée une fois puis consomme une file de phrases commune ;
+    les traductions sont transmises à une tâche d'écriture unique.
+
+    Args:
+        phrases (list): Les phrases à traduire
+        stockage (StockageTraductions): Le stockage où écrire les traductions
+        source_lang (str): La langue source ('fr' pour français, 'en' pour anglais)
+        nb_pages (int): Nombre de pages traduisant en parallèle
+        url_base (str): L'URL de base du site (ou du traducteur local)
+        mode_debug (bool): True pour un navigateur visible chargeant toutes les ressources
+        fichier_session (str): Fichier de session réutilisé entre les exécutions
+        max_retries (int): Nombre maximum de tentatives par phrase
+        delai (int): Pause entre deux actions sur la page, en millisecondes
+
+    Returns:
+        dict: Statistiques d'exécution (traduites, echecs, tentatives, latences, duree)
+    """
+    a_traduire = [phrase for phrase in dict.fromkeys(phrases) if (phrase, source_lang) not in stockage]
+    statistiques = {"traduites": 0, "echecs": 0, "tentatives": 0, "latences": [], "duree": 0.0}
+    if not a_traduire:
+        return statistiques
+
+    debut = time.perf_counter()
+    async with async_playwright() as p:
+        browser, context = await ouvrir_contexte(p, url_base, mode_debug, fichier_session)
+        verrou_connexion = asyncio.Lock()
+
+        pages = []
+        for _ in range(min(nb_pages, len(a_traduire))):
+            page = await context.new_page()
+            pages.append(page)
+        configurations = await asyncio.gather(*(
+            configurer_page_traduction(page, url_base, source_lang, fichier_session, verrou_connexion, delai)
+            for page in pages
+        ))
+        pages = [page for page, ok in zip(pages, configurations) if ok]
+        if not pages:
+            await browser.close()
+            raise Exception("Échec de la configuration des pages")
+        print(f"🚀 {len(pages)} pages prêtes pour {len(a_traduire)} phrases")
+
+        file_phrases = asyncio.Queue()
+        file_resultats = asyncio.Queue()
+        for phrase in a_traduire:
+            file_phrases.put_nowait(phrase)
+        for _ in pages:
+            file_phrases.put_nowait(None)
+
+        ecrivain = asyncio.create_task(ecrivain_traductions(file_resultats, stockage))
+        options = {
+            "max_retries": max_retries, "source_lang": source_lang, "url_base": url_base,
+            "fichier_session": fichier_session, "verrou_connexion": verrou_connexion, "delai": delai,
+        }
+        await asyncio.gather(*(
+            _travailleur(i + 1, page, file_phrases, file_resultats, statistiques, **options)
+            for i, page in enumerate(pages)
+        ))
+        await file_resultats.put(None)
+        statistiques["traduites"] = await ecrivain
+        await browser.close()
+
+    statistiques["duree"] = time.perf_counter() - debut
+    return statistiques
+
+
+if __name__ == "__main__":
+    dossier_script = os.path.dirname(os.path.abspath(__file__))
+    stockage = StockageTraductions(os.path.join(dossier_script, "translations.jsonl"),
+                                   os.path.join(dossier_script, "translations.json"))
+    nb_pages = int(os.getenv("SCRAPER_NB_PAGES", "4"))
+    mode_debug = os.getenv("SCRAPER_DEBUG", "0") == "1"
+
+    for fichier_excel, source_lang in [("../agregation/data_xlsx/questions_fr.xlsx", "fr"),
+                                       ("../agregation/data_xlsx/questions_en.xlsx", "en")]:
+        if not os.path.exists(fichier_excel):
+            print(f"❌ Fichier non trouvé : {fichier_excel}")
+            continue
+        df = pd.read_excel(fichier_excel)
+        phrases = [str(p).strip() for p in df['Questions ou Affirmations'] if str(p).strip()]
+        stats = asyncio.run(traduire_phrases_async(phrases, stockage, source_lang, nb_pages, mode_debug=mode_debug))
+        print(f"📊 {stats['traduites']} traductions, {stats['echecs']} échecs en {stats['duree']:.1f} s")
+
+    stockage.exporter_json(os.path.join(dossier_script, "translations.json"))
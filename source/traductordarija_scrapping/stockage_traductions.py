@@ -0,0 +1,180 @@
+import json
+import os
+
+try:
+    import fcntl  # Verrous inter-processus (Linux / macOS)
+except ImportError:  # Windows : pas de verrou
+    fcntl = None
+
+
+class StockageTraductions:
+    """
+    Stockage append-only des traductions du scraper au format JSONL.
+
+    Chaque traduction est ajoutée sur une ligne, sous verrou exclusif, sans jamais
+    réécrire le fichier. Un index en mémoire (source, source_lang) -> traduction
+    permet de savoir instantanément si une phrase a déjà été traduite. Plusieurs
+    scrapers peuvent écrire dans le même fichier : l'index est rafraîchi en ne
+    lisant que les lignes ajoutées depuis la dernière lecture.
+
+    Le fichier 'translations.json' historique reste disponible via exporter_json().
+    """
+
+    def __init__(self, fichier_jsonl, fichier_json_legacy=None):
+        """
+        Args:
+            fichier_jsonl (str): Chemin du fichier JSONL append-only
+            fichier_json_legacy (str): Ancien 'translations.json' importé une seule fois
+                si le fichier JSONL n'existe pas encore
+        """
+        self.fichier_jsonl = fichier_jsonl
+        self.index = {}
+        self._position = 0
+
+        if fichier_json_legacy and not os.path.exists(fichier_jsonl):
+            self.importer_json(fichier_json_legacy)
+        self.rafraichir()
+
+    @staticmethod
+    def cle(traduction):
+        """Retourne la clé d'index (source, source_lang) d'une traduction."""
+        return traduction["source"], traduction["source_lang"]
+
+    def __contains__(self, cle):
+        return cle in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def _verrouiller(self, f):
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _deverrouiller(self, f):
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def rafraichir(self):
+        """
+        Lit les lignes ajoutées depuis la dernière lecture et met à jour l'index.
+        Une dernière ligne incomplète (écriture en cours) est relue au prochain appel.
+
+        Returns:
+            int: Nombre de nouvelles traductions indexées
+        """
+        if not os.path.exists(self.fichier_jsonl):
+            return 0
+
+        nouvelles = 0
+        with open(self.fichier_jsonl, "rb") as f:
+            f.seek(self._position)
+            for ligne in f:
+                if not ligne.endswith(b"\n"):
+                    break
+                self._position += len(ligne)
+                try:
+                    traduction = json.loads(ligne)
+                except json.JSONDecodeError:
+                    print(f"Ligne ignorée (JSON invalide) dans {self.fichier_jsonl}")
+                    continue
+                cle = self.cle(traduction)
+                if cle not in self.index:
+                    nouvelles += 1
+                self.index[cle] = traduction
+        return nouvelles
+
+    def ajouter(self, traduction):
+        """
+        Ajoute une traduction en fin de fichier de façon atomique.
+
+        Le verrou exclusif garantit qu'une ligne n'est jamais entrelacée avec celle
+        d'un autre processus, et l'index est rafraîchi sous ce même verrou pour ne
+        pas ajouter une phrase déjà écrite par un autre scraper.
+
+        Args:
+            traduction (dict): Traduction au format {source_lang, source, target_lang, target}
+
+        Returns:
+            bool: True si la traduction a été ajoutée, False si elle existait déjà
+        """
+        ligne = (json.dumps(traduction, ensure_ascii=False) + "\n").encode("utf-8")
+        with open(self.fichier_jsonl, "ab") as f:
+            self._verrouiller(f)
+            try:
+                self.rafraichir()
+                if self.cle(traduction) in self.index:
+                    return False
+                f.write(ligne)
+                f.flush()
+                os.fsync(f.fileno())
+                self._position += len(ligne)
+                self.index[self.cle(traduction)] = traduction
+                return True
+            finally:
+                self._deverrouiller(f)
+
+    def traductions(self):
+        """Retourne la liste des traductions dans l'ordre d'ajout."""
+        return list(self.index.values())
+
+    def importer_json(self, fichier_json):
+        """
+        Importe un fichier 'translations.json' historique dans le stockage JSONL.
+
+        Args:
+            fichier_json (str): Chemin du fichier JSON au format {"translations": [...]}
+
+        Returns:
+            int: Nombre de traductions importées
+        """
+        try:
+            with open(fichier_json, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return 0
+
+        self.rafraichir()
+        vues = set(self.index)
+        lignes = []
+        for traduction in data.get("translations", []):
+            cle = self.cle(traduction)
+            if cle in vues:
+                continue
+            vues.add(cle)
+            lignes.append(json.dumps(traduction, ensure_ascii=False) + "\n")
+
+        if lignes:
+            contenu = "".join(lignes).encode("utf-8")
+            with open(self.fichier_jsonl, "ab") as f:
+                self._verrouiller(f)
+                try:
+                    f.write(contenu)
+                    f.flush()
+                    os.fsync(f.fileno())
+                finally:
+                    self._deverrouiller(f)
+            self.rafraichir()
+        print(f"📥 {len(lignes)} traductions importées depuis {fichier_json}")
+        return len(lignes)
+
+    def exporter_json(self, fichier_json):
+        """
+        Exporte le stockage au format 'translations.json' historique.
+        Le fichier est écrit dans un fichier temporaire puis renommé (remplacement atomique).
+
+        Args:
+            fichier_json (str): Chemin du fichier JSON à produire
+        """
+        self.rafraichir()
+        fichier_tmp = f"{fichier_json}.tmp"
+        with open(fichier_tmp, "w", encoding="utf-8") as f:
+            json.dump({"translations": self.traductions()}, f, ensure_ascii=False, indent=2)
+        os.replace(fichier_tmp, fichier_json)
+        print(f"📤 {len(self)} traductions exportées dans {fichier_json}")
+
+
+if __name__ == "__main__":
+    # Export à la demande du fichier historique translations.json
+    dossier_script = os.path.dirname(os.path.abspath(__file__))
+    stockage = StockageTraductions(os.path.join(dossier_script, "translations.jsonl"))
+    stockage.exporter_json(os.path.join(dossier_script, "translations.json"))
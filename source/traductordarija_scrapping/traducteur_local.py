@@ -0,0 +1,268 @@
+'''Réplique locale du traducteur learnmoroccan.com pour tester le scraper hors ligne.
+
+Le serveur reproduit la structure DOM attendue par les sélecteurs de scrapping.py
+(bouton de connexion, formulaire, bouton d'inversion, menu de langue, toggle,
+zone de saisie, bouton de traduction et conteneur de résultat) ainsi que l'appel
+à l'API de traduction intercepté par le scraper.'''
+
+import json
+import os
+import random
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+# Translittération latin -> arabe utilisée pour fabriquer une « traduction » déterministe
+TRANSLITTERATION = {
+    "a": "ا", "b": "ب", "c": "ك", "d": "د", "e": "ي", "f": "ف", "g": "ڭ", "h": "ه",
+    "i": "ي", "j": "ج", "k": "ك", "l": "ل", "m": "م", "n": "ن", "o": "و", "p": "پ",
+    "q": "ق", "r": "ر", "s": "س", "t": "ت", "u": "و", "v": "ڤ", "w": "و", "x": "كس",
+    "y": "ي", "z": "ز", "?": "؟", ",": "،",
+}
+
+ENTETE = """<header><div><div></div><div><div>
+  <a href="/fr">Accueil</a>
+  {bouton}
+</div></div></div></header>"""
+
+PAGE_ACCUEIL = """<!DOCTYPE html>
+<html lang="fr"><head><meta charset="utf-8"><title>Accueil</title></head>
+<body>
+{entete}
+<div><h1>Apprendre le darija</h1></div>
+</body></html>"""
+
+PAGE_CONNEXION = """<!DOCTYPE html>
+<html lang="fr"><head><meta charset="utf-8"><title>Connexion</title></head>
+<body>
+<section><div><form method="post" action="/fr/login">
+  <div><input name="email" type="email"></div>
+  <div><input name="password" type="password"></div>
+  <button type="submit">Valider</button>
+</form></div></section>
+</body></html>"""
+
+PAGE_TRADUCTEUR = """<!DOCTYPE html>
+<html lang="fr"><head><meta charset="utf-8"><title>Traducteur</title>
+<style>.hidden { display: none; }</style></head>
+<body>
+{entete}
+<div>
+  <div><h1>Traducteur</h1></div>
+  <div>
+    <div>Traduire du darija vers le français, l'anglais...</div>
+    <div>
+      <div>
+        <div id="langue-source">Marocain</div>
+        <div id="menu-langues" class="hidden">
+          <div data-lang="fr">Français</div>
+          <div data-lang="en">Anglais</div>
+        </div>
+      </div>
+      <button class="shadow-md shadow-[rgba(0,0,0,0.01)] border border-[#ECECEC] mx-2 p-[17px] rounded-2xl bg-white hover:bg-lighter duration-150"
+              aria-label="échanger les langues" title="échanger les langues">⇄</button>
+      <div id="langue-cible">Français</div>
+    </div>
+    <div>
+      <div><label><div><div id="toggle"></div></div></label></div>
+      <textarea class="pl-1 w-full bg-white outline-none overflow-hidden pt-2 resize-none min-h-28 sm:min-h-48"></textarea>
+    </div>
+    <div>
+      <p>Marocain</p>
+      <p>La traduction devrait apparaître ici</p>
+    </div>
+    <button class="font-normal shadow-sm">Traduire</button>
+  </div>
+</div>
+<script>
+  const DELAI_AFFICHAGE = {delai_affichage};
+  const noms = {fr: "Français", en: "Anglais"};
+  const etat = {source: null, toggle: false};
+  const source = document.getElementById("langue-source");
+  const menu = document.getElementById("menu-langues");
+  const resultat = document.querySelectorAll("body > div > div:nth-of-type(2) > div:nth-of-type(4) > p")[1];
+
+  document.querySelector("button[title='échanger les langues']").addEventListener("click", () => {
+    etat.source = "fr";
+    source.textContent = noms.fr;
+    document.getElementById("langue-cible").textContent = "Marocain";
+  });
+  source.addEventListener("click", () => menu.classList.toggle("hidden"));
+  menu.querySelectorAll("div[data-lang]").forEach(option => option.addEventListener("click", () => {
+    etat.source = option.dataset.lang;
+    source.textContent = noms[etat.source];
+    menu.classList.add("hidden");
+  }));
+  document.getElementById("toggle").addEventListener("click", () => { etat.toggle = !etat.toggle; });
+
+  document.querySelector("button.font-normal.shadow-sm").addEventListener("click", async () => {
+    resultat.textContent = "La traduction devrait apparaître ici";
+    const reponse = await fetch("/api/translate", {
+      method: "POST",
+      headers: {"Content-Type": "application/json"},
+      body: JSON.stringify({text: document.querySelector("textarea").value, source: etat.source})
+    });
+    if (reponse.ok) {
+      const data = await reponse.json();
+      // Le vrai site affiche la traduction avec un temps de rendu
+      setTimeout(() => { resultat.textContent = data.translation; }, DELAI_AFFICHAGE);
+    } else {
+      resultat.textContent = "Une erreur est survenue";
+    }
+  });
+</script>
+</body></html>"""
+
+
+def traduire_localement(texte):
+    """
+    Produit une « traduction » arabe déterministe d'un texte (translittération).
+
+    Args:
+        texte (str): Le texte à traduire
+
+    Returns:
+        str: Le texte translittéré en caractères arabes
+    """
+    return "".join(TRANSLITTERATION.get(c, c) for c in texte.lower())
+
+
+class GestionnaireTraducteur(BaseHTTPRequestHandler):
+    """Gestionnaire HTTP servant les pages du traducteur local et son API."""
+
+    # Surchargés par demarrer_serveur()
+    latence = 0.5
+    gigue = 0.0
+    taux_echec = 0.0
+    delai_affichage = 0
+    aleatoire = random.Random()
+    statistiques = {}
+    verrou = threading.Lock()
+
+    def _compter(self, compteur):
+        with self.verrou:
+            self.statistiques[compteur] = self.statistiques.get(compteur, 0) + 1
+
+    def log_message(self, format, *args):
+        # Pas de journalisation de chaque requête
+        pass
+
+    def _est_connecte(self):
+        cookies = SimpleCookie(self.headers.get("Cookie", ""))
+        return "session" in cookies
+
+    def _entete(self):
+        if self._est_connecte():
+            bouton = '<a href="/fr/compte"><button>Mon compte</button></a>'
+        else:
+            bouton = '<a href="/fr/login"><button>Se connecter</button></a>'
+        return ENTETE.format(bouton=bouton)
+
+    def _envoyer(self, statut, contenu, type_contenu="text/html; charset=utf-8", entetes=None):
+        corps = contenu.encode("utf-8")
+        self.send_response(statut)
+        self.send_header("Content-Type", type_contenu)
+        self.send_header("Content-Length", str(len(corps)))
+        for nom, valeur in (entetes or {}).items():
+            self.send_header(nom, valeur)
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def _envoyer_json(self, statut, data):
+        self._envoyer(statut, json.dumps(data, ensure_ascii=False), "application/json; charset=utf-8")
+
+    def do_GET(self):
+        chemin = self.path.split("?")[0].rstrip("/")
+        if chemin in ("", "/fr"):
+            self._envoyer(200, PAGE_ACCUEIL.format(entete=self._entete()))
+        elif chemin == "/fr/login":
+            self._envoyer(200, PAGE_CONNEXION)
+        elif chemin == "/fr/translator":
+            page = PAGE_TRADUCTEUR.replace("{entete}", self._entete())
+            self._envoyer(200, page.replace("{delai_affichage}", str(int(self.delai_affichage))))
+        else:
+            self._envoyer(404, "Page introuvable", "text/plain; charset=utf-8")
+
+    def do_POST(self):
+        chemin = self.path.split("?")[0].rstrip("/")
+        longueur = int(self.headers.get("Content-Length", 0))
+        corps = self.rfile.read(longueur).decode("utf-8")
+
+        if chemin == "/fr/login":
+            self._compter("connexions")
+            champs = parse_qs(corps)
+            if not champs.get("email") or not champs.get("password"):
+                self._envoyer(200, PAGE_CONNEXION)
+                return
+            self.send_response(303)
+            self.send_header("Set-Cookie", "session=locale; Path=/")
+            self.send_header("Location", "/fr")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif chemin == "/api/translate":
+            if not self._est_connecte():
+                self._envoyer_json(401, {"error": "non connecté"})
+                return
+            self._compter("requetes_traduction")
+            texte = json.loads(corps or "{}").get("text", "")
+            with self.verrou:
+                latence = max(0.0, self.aleatoire.gauss(self.latence, self.gigue))
+                echec = self.aleatoire.random() < self.taux_echec
+            time.sleep(latence)
+            if echec:
+                self._compter("echecs_injectes")
+                self._envoyer_json(500, {"error": "erreur interne simulée"})
+                return
+            self._envoyer_json(200, {"translation": traduire_localement(texte)})
+        else:
+            self._envoyer(404, "Page introuvable", "text/plain; charset=utf-8")
+
+
+def demarrer_serveur(port=0, latence=0.5, gigue=0.0, taux_echec=0.0, delai_affichage=0, graine=None):
+    """
+    Démarre le traducteur local dans un thread d'arrière-plan.
+
+    Args:
+        port (int): Port d'écoute (0 pour un port libre choisi par le système)
+        latence (float): Délai moyen de l'API de traduction, en secondes
+        gigue (float): Écart-type du délai de l'API, en secondes
+        taux_echec (float): Proportion des appels de traduction répondant par une erreur 500
+        delai_affichage (int): Délai d'affichage de la traduction dans la page, en millisecondes
+        graine (int): Graine du générateur aléatoire, pour des exécutions reproductibles
+
+    Returns:
+        tuple: (serveur, url_base) ; serveur.statistiques compte les requêtes reçues,
+            appeler serveur.shutdown() pour l'arrêter
+    """
+    statistiques = {"connexions": 0, "requetes_traduction": 0, "echecs_injectes": 0}
+    gestionnaire = type("GestionnaireConfigure", (GestionnaireTraducteur,), {
+        "latence": latence,
+        "gigue": gigue,
+        "taux_echec": taux_echec,
+        "delai_affichage": delai_affichage,
+        "aleatoire": random.Random(graine),
+        "statistiques": statistiques,
+        "verrou": threading.Lock(),
+    })
+    serveur = ThreadingHTTPServer(("127.0.0.1", port), gestionnaire)
+    serveur.daemon_threads = True
+    serveur.statistiques = statistiques
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    url_base = f"http://127.0.0.1:{serveur.server_address[1]}/fr"
+    print(f"🧪 Traducteur local démarré sur {url_base}")
+    return serveur, url_base
+
+
+if __name__ == "__main__":
+    serveur, url_base = demarrer_serveur(
+        port=int(os.getenv("TRADUCTEUR_LOCAL_PORT", "8765")),
+        latence=float(os.getenv("TRADUCTEUR_LOCAL_LATENCE", "0.5")),
+        taux_echec=float(os.getenv("TRADUCTEUR_LOCAL_TAUX_ECHEC", "0")),
+    )
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        serveur.shutdown()